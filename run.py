@@ -7,12 +7,25 @@ Commands:
   preview             Generate Excel preview with time entries
   preview --no-ai     Generate preview without AI (YAML-based only, faster)
   preview --weeks N   Filter to last N weeks (default: from config)
+  preview --full      Recompute all weeks (default: only weeks whose input changed)
+  preview --workers N Compute weeks in N processes (default: from config)
   upload WEEK         Upload specific week (e.g., "2025-12-07")
   upload --latest     Upload most recent week from preview
   upload --all        Upload all weeks from preview
+  upload ... --concurrency N  Parallel uploads (default: from config)
+  upload ... --batch  Pack up to 20 entries per Graph $batch request
+  upload ... --force  Re-upload rows already recorded in the upload ledger
+  upload ... --sync   Diff against the SharePoint list and send only creates/updates/deletes
+  upload ... --dry-run  With --sync: show the planned operations only
+  sync                Refresh the local mirror of the SharePoint list (delta query)
+  sync --full         Re-read the whole list into the mirror
   status              Show weeks in preview and their upload status
   report              Generate manager report (Weekly Hours + Opportunities)
   report --weeks N    Report for last N weeks (default: from config)
+  report --from-sharepoint  Report from the local list mirror instead of the preview
+  cache stats         Show AI client-detection cache statistics
+  cache prune         Remove expired / least recently used cache entries
+  cache clear         Remove all cached AI detections
 """
 
 import argparse
@@ -20,10 +33,9 @@ import sys
 from pathlib import Path
 
 from src.config import get_settings
-from src.excel_preview import generate_final_preview
-from src.sharepoint import post_week_entries, post_all_weeks
 
-import pandas as pd
+# pandas, requests and the Gemini SDK are imported inside the commands that
+# need them, so 'export', 'status' and --help start fast
 
 
 def cmd_export():
@@ -41,8 +53,15 @@ def cmd_export():
     print()
 
 
-def cmd_preview(use_ai: bool = True, weeks_back: int | None = None):
-    """Generate Excel preview with time entries."""
+def cmd_preview(use_ai: bool = True, weeks_back: int | None = None, full: bool = False, workers: int | None = None):
+    """Generate Excel preview with time entries.
+
+    Args:
+        use_ai: Allow Gemini calls
+        weeks_back: Number of weeks to include (default: from config)
+        full: Recompute every week instead of only weeks whose input changed
+        workers: Processes computing weeks in parallel (default: from config)
+    """
     settings = get_settings()
 
     # Use default from config if not specified
@@ -56,15 +75,21 @@ def cmd_preview(use_ai: bool = True, weeks_back: int | None = None):
     print(f"Generating preview ({mode}, last {weeks_back} weeks)...")
     print()
 
+    from src.excel_preview import generate_final_preview
+
     # Generate preview using the complete workflow in excel_preview
     output_path = settings["paths"]["excel_preview"]
-    df = generate_final_preview(output_path, fill=True, weeks_back=weeks_back)
+    df = generate_final_preview(output_path, fill=True, weeks_back=weeks_back, use_ai=use_ai,
+                                incremental=False if full else None, workers=workers)
 
     # Count entries (excluding summary rows)
     entry_count = len(df[df["category"] != ">>> WEEK TOTAL"])
     week_count = df[df["category"] != ">>> WEEK TOTAL"]["week_beginning"].nunique()
 
     print(f"Generated {entry_count} entries across {week_count} weeks")
+    if df.attrs.get("reused_weeks"):
+        print(f"Recomputed {len(df.attrs['recomputed_weeks'])} changed weeks, "
+              f"reused {len(df.attrs['reused_weeks'])} unchanged weeks")
     print()
     print(f"Preview generated: {output_path}")
     print()
@@ -76,13 +101,19 @@ def cmd_preview(use_ai: bool = True, weeks_back: int | None = None):
 
 
 
-def cmd_upload(week: str = None, latest: bool = False, all_weeks: bool = False):
+def cmd_upload(week: str = None, latest: bool = False, all_weeks: bool = False, concurrency: int | None = None,
+               batch: bool | None = None, force: bool = False, sync: bool = False, dry_run: bool = False):
     """Upload time entries to SharePoint.
 
     Args:
         week: Specific week to upload (e.g., "2025-12-07")
         latest: Upload only the most recent week
         all_weeks: Upload all weeks from preview
+        concurrency: Parallel uploads (default: from config)
+        batch: Use Graph $batch requests (default: from config)
+        force: Re-upload rows already recorded in the upload ledger
+        sync: Diff against the list mirror and send only the needed create/update/delete operations
+        dry_run: With sync, only print the planned operations
     """
     settings = get_settings()
     preview_path = settings["paths"]["excel_preview"]
@@ -92,8 +123,12 @@ def cmd_upload(week: str = None, latest: bool = False, all_weeks: bool = False):
         print("Run 'python run.py preview' first")
         sys.exit(1)
 
-    # Load preview Excel
-    df = pd.read_excel(preview_path)
+    import pandas as pd
+    from src.preview_store import load_preview
+    from src.sharepoint import post_week_entries, post_all_weeks
+
+    # Load preview (binary sidecar unless the workbook was edited)
+    df = load_preview(preview_path)
 
     # Get unique weeks (excluding summary rows)
     weeks = df[df["category"] != ">>> WEEK TOTAL"]["week_beginning"].unique()
@@ -103,13 +138,31 @@ def cmd_upload(week: str = None, latest: bool = False, all_weeks: bool = False):
         print("No weeks found in preview")
         sys.exit(1)
 
+    if sync:
+        if all_weeks:
+            target_weeks = weeks
+        elif latest:
+            target_weeks = weeks[-1:]
+        elif week in weeks:
+            target_weeks = [week]
+        else:
+            print("Error: Specify --all, --latest, or a week date from the preview")
+            sys.exit(1)
+        _upload_sync(df, target_weeks, concurrency, dry_run)
+        return
+
     # Upload all weeks
     if all_weeks:
         print(f"Uploading all {len(weeks)} weeks from preview...")
-        result = post_all_weeks(df)
+        result = post_all_weeks(df, concurrency=concurrency, batch=batch, force=force)
 
         print()
-        print(f"Upload complete: {result['totals']['success']} successful, {result['totals']['failed']} failed")
+        print(f"Upload complete: {result['totals']['success']} successful, {result['totals']['failed']} failed, "
+              f"{result['totals']['skipped']} already uploaded")
+        throttle = result.get('throttle') or {}
+        if throttle.get('retries'):
+            print(f"Retries: {throttle['retries']} ({throttle['throttled']} throttled, "
+                  f"{throttle['wait_seconds']}s waited, concurrency {throttle['min_concurrency']}-{throttle['max_concurrency']})")
 
         if result['totals']['failed'] > 0:
             print("\nFailed entries by week:")
@@ -139,14 +192,15 @@ def cmd_upload(week: str = None, latest: bool = False, all_weeks: bool = False):
 
     # Upload single week
     print()
-    results = post_week_entries(df, target_week)
+    results = post_week_entries(df, target_week, concurrency=concurrency, batch=batch, force=force)
 
     # Summary
-    successful = sum(1 for r in results if r["success"])
-    failed = len(results) - successful
+    skipped = sum(1 for r in results if r["skipped"])
+    successful = sum(1 for r in results if r["success"]) - skipped
+    failed = len(results) - successful - skipped
 
     print()
-    print(f"Upload complete: {successful} successful, {failed} failed")
+    print(f"Upload complete: {successful} successful, {failed} failed, {skipped} already uploaded")
 
     if failed > 0:
         print("\nFailed entries:")
@@ -156,10 +210,47 @@ def cmd_upload(week: str = None, latest: bool = False, all_weeks: bool = False):
         sys.exit(1)
 
 
-def cmd_report(weeks_back: int | None = None):
+def _upload_sync(df, weeks: list[str], concurrency: int | None, dry_run: bool):
+    """Run sync_weeks and print the per-week plan and result."""
+    from src.sharepoint import sync_weeks
+
+    print(f"Syncing {len(weeks)} week(s) with SharePoint{' (dry run)' if dry_run else ''}...")
+    result = sync_weeks(df, weeks, concurrency=concurrency, dry_run=dry_run)
+
+    print()
+    for week_key, plan in result["plans"].items():
+        print(f"  [{week_key}] {len(plan['create'])} create, {len(plan['update'])} update, "
+              f"{len(plan['delete'])} delete, {plan['unchanged']} unchanged")
+
+    totals = result["totals"]
+    print()
+    print(f"{'Planned' if dry_run else 'Sync complete'}: {totals['create']} created, {totals['update']} updated, "
+          f"{totals['delete']} deleted, {totals['unchanged']} unchanged")
+
+    if result["failed"]:
+        print("\nFailed operations:")
+        for r in result["failed"]:
+            print(f"  - {r['category']}: {r.get('error', 'Unknown error')}")
+        sys.exit(1)
+
+
+def cmd_sync(full: bool = False):
+    """Refresh the local mirror of the SharePoint list."""
+    from src.list_mirror import get_list_mirror, sync_mirror
+    from src.sharepoint import Uploader
+
+    mirror = get_list_mirror()
+    print(f"{'Full' if full or not mirror.synced else 'Delta'} sync of SharePoint list...")
+    with Uploader() as uploader:
+        stats = sync_mirror(mirror, uploader, full=full)
+    print(f"Mirror updated: {stats['upserted']} changed, {stats['deleted']} deleted ({stats['pages']} pages)")
+    print(f"Mirror: {mirror.path}")
+
+
+def cmd_report(weeks_back: int | None = None, from_sharepoint: bool = False):
     """Generate manager report (Weekly Hours + Opportunities)."""
     from scripts.manager_report import generate_manager_report
-    generate_manager_report(weeks_back=weeks_back)
+    generate_manager_report(weeks_back=weeks_back, source="sharepoint" if from_sharepoint else "preview")
 
 
 def cmd_status():
@@ -172,27 +263,38 @@ def cmd_status():
         print("Run 'python run.py preview' first")
         return
 
-    # Load preview Excel
-    df = pd.read_excel(preview_path)
+    # Plain rows from the binary sidecar - status does not need pandas
+    from src.preview_store import load_preview_rows
+    from src.upload_ledger import get_upload_ledger, entry_fingerprints
+    from src.list_mirror import get_mirror_path, get_list_mirror
+
+    rows_by_week = {}
+    for row in load_preview_rows(preview_path):
+        if isinstance(row.get("week_beginning"), str):
+            rows_by_week.setdefault(row["week_beginning"], []).append(row)
+
+    ledger = get_upload_ledger()
+    mirror = get_list_mirror() if get_mirror_path().exists() else None
+    sharepoint_weeks = mirror.week_summary(owner=mirror.get_state("owner")) if mirror is not None else {}
 
     # Get weeks and summaries
     weeks_data = []
-    for week in df["week_beginning"].unique():
-        if pd.isna(week):
-            continue
+    for week, week_rows in rows_by_week.items():
+        total_row = [r for r in week_rows if r["category"] == ">>> WEEK TOTAL"]
+        entries = [r for r in week_rows if r["category"] != ">>> WEEK TOTAL"]
 
-        week_df = df[df["week_beginning"] == week]
-        total_row = week_df[week_df["category"] == ">>> WEEK TOTAL"]
-
-        if len(total_row) > 0:
-            total_hours = total_row.iloc[0]["hours"]
+        if total_row:
+            total_hours = total_row[0]["hours"] or 0
         else:
-            total_hours = week_df[week_df["category"] != ">>> WEEK TOTAL"]["hours"].sum()
+            total_hours = sum(e["hours"] or 0 for e in entries)
+
+        uploaded = len(ledger.confirmed(entry_fingerprints(entries))) if ledger is not None else 0
 
         weeks_data.append({
             "week": week,
             "hours": total_hours,
-            "entries": len(week_df[week_df["category"] != ">>> WEEK TOTAL"])
+            "entries": len(entries),
+            "uploaded": uploaded
         })
 
     # Sort by week
@@ -205,11 +307,66 @@ def cmd_status():
     print()
 
     for w in weeks_data:
-        status = "✓ Ready" if w["hours"] >= 40 else f"⚠ {w['hours']}h (target: 40h)"
-        print(f"{w['week']:>12} | {w['entries']:>2} entries | {w['hours']:>5.1f}h | {status}")
+        if w["entries"] and w["uploaded"] == w["entries"]:
+            status = "✓ Uploaded"
+        elif w["uploaded"]:
+            status = f"◐ Partially uploaded ({w['uploaded']}/{w['entries']})"
+        elif w["hours"] >= 40:
+            status = "✓ Ready"
+        else:
+            status = f"⚠ {w['hours']}h (target: 40h)"
+        line = f"{w['week']:>12} | {w['entries']:>2} entries | {w['hours']:>5.1f}h | {status}"
+        if mirror is not None:
+            sp = sharepoint_weeks.get(w["week"], {"items": 0, "hours": 0.0})
+            line += f" | SharePoint: {sp['items']} items, {sp['hours']:.1f}h"
+        print(line)
 
     print()
     print(f"Total weeks: {len(weeks_data)}")
+    if ledger is not None:
+        print(f"Upload state from ledger: {ledger.path}")
+    if mirror is not None:
+        print(f"SharePoint state from mirror (run 'python run.py sync' to refresh): {mirror.path}")
+    print()
+
+
+def cmd_cache(action: str):
+    """Show or maintain the AI client-detection cache."""
+    from datetime import datetime
+    from src.ai_cache import get_detection_cache
+
+    cache = get_detection_cache()
+    if cache is None:
+        print("AI detection cache is disabled (ai.cache_enabled: false)")
+        return
+
+    if action == "prune":
+        deleted = cache.prune()
+        print(f"Pruned {deleted} cache entries")
+    elif action == "clear":
+        deleted = cache.clear()
+        print(f"Cleared {deleted} cache entries")
+
+    stats = cache.stats()
+    oldest = datetime.fromtimestamp(stats["oldest"]).strftime("%Y-%m-%d") if stats["oldest"] else "-"
+
+    print()
+    print("=" * 60)
+    print("AI DETECTION CACHE")
+    print("=" * 60)
+    print()
+    print(f"  Path:        {stats['path']}")
+    print(f"  Entries:     {stats['entries']} ({stats['with_client']} with client)")
+    print(f"  Expired:     {stats['expired']}")
+    print(f"  Oldest:      {oldest}")
+    print(f"  Size:        {stats['size_bytes'] / 1024:.1f} KB")
+    for model, count in stats["models"].items():
+        print(f"  Model:       {model} ({count} entries)")
+
+    from src.domain_index import get_domain_index
+    domain_index = get_domain_index()
+    if domain_index is not None:
+        print(f"  Domains:     {len(domain_index)} resolved without AI")
     print()
 
 
@@ -228,12 +385,26 @@ def main():
     preview_parser = subparsers.add_parser("preview", help="Generate Excel preview")
     preview_parser.add_argument("--no-ai", action="store_true", help="Disable AI (faster, YAML-based only)")
     preview_parser.add_argument("--weeks", type=int, default=None, help="Number of weeks back to include (default: from config)")
+    preview_parser.add_argument("--full", action="store_true", help="Recompute all weeks, not only weeks whose input changed")
+    preview_parser.add_argument("--workers", type=int, default=None, help="Compute weeks in N processes (default: from config)")
 
     # upload command
     upload_parser = subparsers.add_parser("upload", help="Upload time entries to SharePoint")
     upload_parser.add_argument("week", nargs="?", help="Week to upload (YYYY-MM-DD)")
     upload_parser.add_argument("--latest", action="store_true", help="Upload most recent week")
     upload_parser.add_argument("--all", action="store_true", help="Upload all weeks from preview")
+    upload_parser.add_argument("--concurrency", type=int, default=None, help="Parallel uploads (default: from config)")
+    upload_parser.add_argument("--batch", action="store_true", default=None,
+                               help="Send up to 20 entries per Graph $batch request")
+    upload_parser.add_argument("--force", action="store_true",
+                               help="Re-upload rows already recorded in the upload ledger")
+    upload_parser.add_argument("--sync", action="store_true",
+                               help="Send only the create/update/delete operations needed to match the preview")
+    upload_parser.add_argument("--dry-run", action="store_true", help="With --sync: only show planned operations")
+
+    # sync command
+    sync_parser = subparsers.add_parser("sync", help="Refresh local mirror of the SharePoint list")
+    sync_parser.add_argument("--full", action="store_true", help="Re-read the whole list")
 
     # status command
     subparsers.add_parser("status", help="Show weeks in preview")
@@ -241,6 +412,12 @@ def main():
     # report command
     report_parser = subparsers.add_parser("report", help="Generate manager report (Weekly Hours + Opportunities)")
     report_parser.add_argument("--weeks", type=int, default=None, help="Number of weeks back to include (default: from config)")
+    report_parser.add_argument("--from-sharepoint", action="store_true",
+                               help="Read hours from the local SharePoint list mirror (run 'sync' first)")
+
+    # cache command
+    cache_parser = subparsers.add_parser("cache", help="Manage AI client-detection cache")
+    cache_parser.add_argument("action", choices=["stats", "prune", "clear"], help="Cache action")
 
     args = parser.parse_args()
 
@@ -252,13 +429,19 @@ def main():
         if args.command == "export":
             cmd_export()
         elif args.command == "preview":
-            cmd_preview(use_ai=not args.no_ai, weeks_back=args.weeks)
+            cmd_preview(use_ai=not args.no_ai, weeks_back=args.weeks, full=args.full, workers=args.workers)
         elif args.command == "upload":
-            cmd_upload(week=args.week, latest=args.latest, all_weeks=getattr(args, 'all', False))
+            cmd_upload(week=args.week, latest=args.latest, all_weeks=getattr(args, 'all', False),
+                       concurrency=args.concurrency, batch=args.batch, force=args.force,
+                       sync=args.sync, dry_run=args.dry_run)
+        elif args.command == "sync":
+            cmd_sync(full=args.full)
         elif args.command == "status":
             cmd_status()
         elif args.command == "report":
-            cmd_report(weeks_back=args.weeks)
+            cmd_report(weeks_back=args.weeks, from_sharepoint=args.from_sharepoint)
+        elif args.command == "cache":
+            cmd_cache(args.action)
         else:
             parser.print_help()
             sys.exit(1)
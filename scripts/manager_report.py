@@ -10,6 +10,8 @@ from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 
 from src.config import get_settings
+from src.project_codes import get_repository, get_project_codes_path
+from src.preview_store import load_preview
 
 
 # Map detailed categories to simplified manager categories
@@ -43,11 +45,11 @@ WEEKLY_HOURS_COLUMNS = [
 
 
 def load_project_codes_full() -> pd.DataFrame:
-    """Load project codes with all columns from Excel."""
-    settings = get_settings()
-    path = Path(settings['paths']['project_codes'])
+    """Load project codes with all columns from Excel.
 
-    df = pd.read_excel(path)
+    Shares the cached workbook with src.project_codes (no second read).
+    """
+    df = get_repository().raw(get_project_codes_path()).copy()
 
     # Detect format and normalize
     if 'JDA OpptyID' in df.columns:
@@ -284,7 +286,7 @@ def write_manager_report(weekly_df: pd.DataFrame, opps_df: pd.DataFrame, output_
     wb.save(output_path)
 
 
-def generate_manager_report(weeks_back: int | None = None):
+def generate_manager_report(weeks_back: int | None = None, source: str = "preview"):
     """Main entry point: generate manager report Excel file.
 
     Reads from existing time_entries_preview.xlsx (generated by 'python run.py preview').
@@ -292,6 +294,7 @@ def generate_manager_report(weeks_back: int | None = None):
 
     Args:
         weeks_back: Number of weeks to include. If None, uses config default.
+        source: "preview" or "sharepoint" (local list mirror, see 'python run.py sync')
     """
     settings = get_settings()
     if weeks_back is None:
@@ -301,8 +304,22 @@ def generate_manager_report(weeks_back: int | None = None):
     output_path = Path("data/output/manager_report.xlsx")
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
+    if source == "sharepoint":
+        from src.list_mirror import get_mirror_path, get_list_mirror
+
+        if not get_mirror_path().exists():
+            print("Error: SharePoint list mirror not found.")
+            print("Run 'python run.py sync' first.")
+            return
+        mirror = get_list_mirror()
+        print(f"Generating manager report from SharePoint mirror (last {weeks_back} weeks)...")
+        print()
+        time_df = pd.DataFrame(
+            mirror.time_entries(owner=mirror.get_state("owner")),
+            columns=["week_beginning", "category", "hours", "client", "opportunity_id", "comments"]
+        )
     # Check that preview file exists
-    if not input_path.exists():
+    elif not input_path.exists():
         print(f"Error: {input_path} not found.")
         print()
         print("Please generate the preview file first:")
@@ -310,13 +327,13 @@ def generate_manager_report(weeks_back: int | None = None):
         print()
         print("Then review/edit the Excel file, and run this report again.")
         return
+    else:
+        print(f"Generating manager report (last {weeks_back} weeks)...")
+        print()
 
-    print(f"Generating manager report (last {weeks_back} weeks)...")
-    print()
-
-    # Read from existing preview file (fast, no AI)
-    print(f"Reading from {input_path}...")
-    time_df = pd.read_excel(input_path)
+        # Read from existing preview (binary sidecar unless edited, no AI)
+        print(f"Reading from {input_path}...")
+        time_df = load_preview(input_path)
 
     # Generate Weekly Hours sheet
     print("Building Weekly Hours summary...")
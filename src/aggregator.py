@@ -2,6 +2,7 @@
 Keep each calendar event as separate row. No aggregation by category.
 """
 
+import numpy as np
 import pandas as pd
 
 def aggregate_entries(df: pd.DataFrame) -> pd.DataFrame:
@@ -48,34 +49,42 @@ def aggregate_entries(df: pd.DataFrame) -> pd.DataFrame:
 def add_week_summaries(df: pd.DataFrame) -> pd.DataFrame:
     """
     Add WEEK TOTAL summary row after each week with total hours.
+
+    Rows keep their order within a week; weeks are sorted. Totals come from
+    one groupby pass and the summary rows are interleaved by position, so
+    cost is linear in the number of rows.
     """
-    rows = []
-
-    # Sort weeks to ensure consistent ordering
-    for week in sorted(df["week_beginning"].unique()):
-        week_data = df[df["week_beginning"] == week]
-
-        # Add all events for this week
-        for _, row in week_data.iterrows():
-            rows.append(row.to_dict())
-
-        # Add WEEK TOTAL summary row
-        total_hours = week_data["hours"].sum()
-        summary_row = {
-            "week_beginning": week,
-            "category": ">>> WEEK TOTAL",
-            "client": "",
-            "hours": total_hours,
-            "opportunity_id": "",
-            "comments": f"Total: {total_hours}h / 40h = {total_hours/40*100:.0f}%",
-            "external_domains": "",
-            "needs_review": False,
-            "is_autofilled": False,
-            "status": "---"
-        }
-        rows.append(summary_row)
-
-    result_df = pd.DataFrame(rows)
+    if df.empty:
+        return pd.DataFrame()
+
+    # Stable sort keeps the original row order within each week
+    data = df.sort_values("week_beginning", kind="stable").reset_index(drop=True)
+    totals = data.groupby("week_beginning", sort=True)["hours"].sum()
+
+    summary = pd.DataFrame({
+        "week_beginning": totals.index,
+        "category": ">>> WEEK TOTAL",
+        "client": "",
+        "hours": totals.values,
+        "opportunity_id": "",
+        "comments": [f"Total: {total}h / 40h = {total/40*100:.0f}%" for total in totals],
+        "external_domains": "",
+        "needs_review": False,
+        "is_autofilled": False,
+        "status": "---"
+    })
+
+    # Row i of week w lands at i + w; the total of week w after its last row
+    week_codes = totals.index.get_indexer(data["week_beginning"])
+    week_ends = np.bincount(week_codes, minlength=len(totals)).cumsum()
+    positions = np.concatenate([
+        np.arange(len(data)) + week_codes,
+        week_ends + np.arange(len(totals)),
+    ])
+
+    result_df = pd.concat([data, summary], ignore_index=True)
+    result_df.index = positions
+    result_df = result_df.sort_index().reset_index(drop=True).infer_objects()
 
     # Reorder columns to match standard order
     column_order = [
@@ -95,4 +104,4 @@ def add_week_summaries(df: pd.DataFrame) -> pd.DataFrame:
     final_columns = [col for col in column_order if col in result_df.columns]
     result_df = result_df[final_columns]
 
-    return result_df
\ No newline at end of file
+    return result_df
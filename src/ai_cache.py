@@ -0,0 +1,273 @@
+"""
+Persistent SQLite cache of AI client-detection results.
+
+Entries are keyed on (normalized title, sorted external domains, model).
+Each entry also records the hash of the company list it was answered
+against. When the company list changes, an entry stays valid unless its
+answer is affected:
+- a detected client is no longer in the list, or
+- the answer was 'no client' and new companies were added since.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.config import get_settings
+from src.text_utils import normalize_text
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS client_detections (
+    title TEXT NOT NULL,
+    domains TEXT NOT NULL,
+    model TEXT NOT NULL,
+    client TEXT NOT NULL,
+    companies_hash TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (title, domains, model)
+);
+CREATE INDEX IF NOT EXISTS idx_client_detections_last_used ON client_detections (last_used);
+CREATE TABLE IF NOT EXISTS company_lists (
+    companies_hash TEXT PRIMARY KEY,
+    names TEXT NOT NULL
+);
+"""
+
+
+def normalize_title(title: str) -> str:
+    """Normalize title for cache keys (lowercase, umlauts, whitespace)."""
+    return " ".join(normalize_text(title or "").split())
+
+
+def normalize_domains(external_domains: str) -> str:
+    """Return sorted, de-duplicated, lowercase domain list as a string."""
+    domains = {d.strip().lower() for d in (external_domains or "").replace(";", ",").split(",")}
+    return ",".join(sorted(d for d in domains if d))
+
+
+def cache_key(title: str, external_domains: str, model: str) -> tuple[str, str, str]:
+    """Build cache key for an event."""
+    return normalize_title(title), normalize_domains(external_domains), model
+
+
+_hash_cache = {"names": None, "hash": None}
+
+
+def companies_hash(company_names: list[str]) -> str:
+    """Hash of the company list (memoized for the last list object)."""
+    if _hash_cache["names"] is not company_names:
+        payload = json.dumps(sorted(str(n) for n in company_names), ensure_ascii=False)
+        _hash_cache["hash"] = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        _hash_cache["names"] = company_names
+    return _hash_cache["hash"]
+
+
+class DetectionCache:
+    """SQLite-backed cache with TTL and size-bounded LRU eviction."""
+
+    def __init__(self, path: str | Path, ttl_days: float = 180, max_entries: int = 20000):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._diffs = {}
+        # Upper bound of stored entries (counted on first write), so writes only prune when over max_entries
+        self._entries = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def _store_company_list(self, current_hash: str, company_names: list[str]) -> None:
+        self._conn.execute(
+            "INSERT OR IGNORE INTO company_lists (companies_hash, names) VALUES (?, ?)",
+            (current_hash, json.dumps(sorted(str(n) for n in company_names), ensure_ascii=False))
+        )
+
+    def _company_diff(self, old_hash: str, company_names: list[str]) -> tuple[set, set] | None:
+        """Return (added, removed) between an old list and company_names."""
+        current_hash = companies_hash(company_names)
+        key = (old_hash, current_hash)
+        if key not in self._diffs:
+            row = self._conn.execute(
+                "SELECT names FROM company_lists WHERE companies_hash = ?", (old_hash,)
+            ).fetchone()
+            if row is None:
+                self._diffs[key] = None
+            else:
+                old = set(json.loads(row[0]))
+                current = {str(n) for n in company_names}
+                self._diffs[key] = (current - old, old - current)
+        return self._diffs[key]
+
+    def _is_valid(self, client: str, old_hash: str, company_names: list[str]) -> bool:
+        if old_hash == companies_hash(company_names):
+            return True
+        diff = self._company_diff(old_hash, company_names)
+        if diff is None:
+            return False
+        added, removed = diff
+        if client:
+            return client not in removed
+        return not added
+
+    def get_many(self, keys: list[tuple], company_names: list[str]) -> dict[tuple, str]:
+        """Return {key: client} for valid cached entries ('' = no client)."""
+        now = time.time()
+        current_hash = companies_hash(company_names)
+        found = {}
+
+        with self._lock:
+            revalidated = []
+            for key in dict.fromkeys(keys):
+                row = self._conn.execute(
+                    "SELECT client, companies_hash, created_at FROM client_detections "
+                    "WHERE title = ? AND domains = ? AND model = ?", key
+                ).fetchone()
+                if row is None or now - row[2] > self.ttl_seconds:
+                    self.misses += 1
+                    continue
+                client, old_hash, _ = row
+                if not self._is_valid(client, old_hash, company_names):
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                found[key] = client
+                revalidated.append((current_hash, now) + key)
+
+            if revalidated:
+                self._store_company_list(current_hash, company_names)
+                self._conn.executemany(
+                    "UPDATE client_detections SET companies_hash = ?, last_used = ? "
+                    "WHERE title = ? AND domains = ? AND model = ?", revalidated
+                )
+                self._conn.commit()
+
+        return found
+
+    def put_many(self, entries: dict[tuple, str], company_names: list[str]) -> None:
+        """Store detection results answered against company_names (prunes once over max_entries)."""
+        if not entries:
+            return
+        now = time.time()
+        current_hash = companies_hash(company_names)
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._conn.execute("SELECT COUNT(*) FROM client_detections").fetchone()[0]
+            self._store_company_list(current_hash, company_names)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO client_detections "
+                "(title, domains, model, client, companies_hash, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [key + (client, current_hash, now, now) for key, client in entries.items()]
+            )
+            self._conn.commit()
+            # Replaced keys are counted too - at worst this prunes a little early
+            self._entries += len(entries)
+            over_limit = self._entries > self.max_entries
+        if over_limit:
+            self.prune()
+
+    def prune(self, expired_only: bool = False) -> int:
+        """Delete expired entries and evict least recently used beyond max_entries."""
+        with self._lock:
+            cutoff = time.time() - self.ttl_seconds
+            deleted = self._conn.execute(
+                "DELETE FROM client_detections WHERE created_at < ?", (cutoff,)
+            ).rowcount
+
+            count = self._conn.execute("SELECT COUNT(*) FROM client_detections").fetchone()[0]
+            if not expired_only:
+                excess = count - self.max_entries
+                if excess > 0:
+                    deleted += self._conn.execute(
+                        "DELETE FROM client_detections WHERE rowid IN ("
+                        "SELECT rowid FROM client_detections ORDER BY last_used ASC LIMIT ?)", (excess,)
+                    ).rowcount
+                    count -= excess
+            self._entries = count
+
+            # Drop company lists no entry refers to anymore
+            self._conn.execute(
+                "DELETE FROM company_lists WHERE companies_hash NOT IN "
+                "(SELECT DISTINCT companies_hash FROM client_detections)"
+            )
+            self._conn.commit()
+        return deleted
+
+    def domain_pairs(self) -> list[tuple[str, str]]:
+        """Return (domains, client) of unexpired entries that have domains."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT domains, client FROM client_detections WHERE domains != '' AND created_at >= ?",
+                (time.time() - self.ttl_seconds,)
+            ).fetchall()
+
+    def clear(self) -> int:
+        """Delete all entries."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM client_detections").rowcount
+            self._conn.execute("DELETE FROM company_lists")
+            self._conn.commit()
+            self._diffs.clear()
+        return deleted
+
+    def stats(self) -> dict:
+        """Return entry counts and hit/miss counters for this process."""
+        with self._lock:
+            total, with_client, oldest = self._conn.execute(
+                "SELECT COUNT(*), SUM(client != ''), MIN(created_at) FROM client_detections"
+            ).fetchone()
+            expired = self._conn.execute(
+                "SELECT COUNT(*) FROM client_detections WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,)
+            ).fetchone()[0]
+            models = dict(self._conn.execute(
+                "SELECT model, COUNT(*) FROM client_detections GROUP BY model"
+            ).fetchall())
+        return {
+            "path": str(self.path),
+            "entries": total,
+            "with_client": with_client or 0,
+            "expired": expired,
+            "oldest": oldest,
+            "models": models,
+            "size_bytes": self.path.stat().st_size if self.path.exists() else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache = {"instance": None}
+
+
+def get_detection_cache() -> DetectionCache | None:
+    """Return process-wide detection cache, or None if disabled in settings."""
+    from src.project_codes import get_cache_dir
+
+    ai_settings = get_settings()["ai"]
+    if not ai_settings.get("cache_enabled", True):
+        return None
+    if _cache["instance"] is None:
+        _cache["instance"] = DetectionCache(
+            get_cache_dir() / "ai_cache.sqlite",
+            ttl_days=ai_settings.get("cache_ttl_days", 180),
+            max_entries=ai_settings.get("cache_max_entries", 20000),
+        )
+    return _cache["instance"]
+
+
+def reset_after_fork() -> None:
+    """Forget the cache connection inherited from a parent process (the next call opens its own)."""
+    _cache["instance"] = None
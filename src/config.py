@@ -1,9 +1,15 @@
 """
 Configuration loader for SCA Time Automation.
 Loads settings from YAML files and environment variables.
+
+YAML files are parsed once into read-only objects and cached by the
+config registry. A file is re-parsed only when its mtime or size changes.
 """
 
+import hashlib
 import os
+import pickle
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 import yaml
@@ -20,35 +26,168 @@ def get_project_root() -> Path:
     return Path(__file__).parent.parent  # było parent.parent.parent
 
 
-def load_yaml(filename: str) -> dict:
-    """Load YAML config file from config/ directory."""
-    config_path = get_project_root() / "config" / filename
-    with open(config_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+def file_hash(path: Path) -> str:
+    """Return sha256 of file content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
 
-def get_settings() -> dict:
-    """Load settings with path expansion."""
-    settings = load_yaml("settings.yaml")
-    
-    # Expand environment variables in paths
+def read_snapshot(path: Path, format_version: int) -> dict | None:
+    """Load a pickled snapshot dict; None if missing, unreadable or written in another format."""
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != format_version:
+        return None
+    return snapshot
+
+
+def write_snapshot(path: Path, snapshot: dict) -> None:
+    """Pickle snapshot to path atomically (temp file + rename); write errors are ignored."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(path)
+    except OSError:
+        # Snapshot is only an accelerator - never fail the run because of it
+        pass
+
+
+class FrozenDict(dict):
+    """Read-only dict returned by the config registry."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Config objects are read-only - use dict(...) for a mutable copy")
+
+    __setitem__ = _readonly
+    __delitem__ = _readonly
+    __ior__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value):
+    """Recursively convert dicts to FrozenDict and lists to tuples."""
+    if isinstance(value, dict):
+        return FrozenDict({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class ConfigRegistry:
+    """
+    Cache of parsed YAML config files, invalidated by file mtime/size.
+
+    Each entry is keyed by (filename, transform) so that post-processed
+    views (e.g. settings with expanded paths) are cached separately.
+    """
+
+    def __init__(self, config_dir: Path):
+        self.config_dir = Path(config_dir)
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _signature(self, path: Path) -> tuple[int, int]:
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, filename: str, transform=None):
+        """Return the frozen contents of a config file, parsing only if changed."""
+        path = self.config_dir / filename
+        signature = self._signature(path)
+        key = (filename, transform)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        if transform is not None:
+            data = transform(data)
+        value = freeze(data)
+
+        with self._lock:
+            self._entries[key] = (signature, value)
+        return value
+
+    def version(self, filename: str) -> tuple[int, int]:
+        """Return the (mtime_ns, size) signature of a config file."""
+        return self._signature(self.config_dir / filename)
+
+    def stats(self) -> dict:
+        """Return cache hit/miss counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        """Drop all cached entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_registry = ConfigRegistry(get_project_root() / "config")
+
+
+def get_registry() -> ConfigRegistry:
+    """Return the process-wide config registry."""
+    return _registry
+
+
+def load_yaml(filename: str):
+    """Load YAML config file from config/ directory (cached, read-only)."""
+    return _registry.load(filename)
+
+
+def _expand_settings_paths(settings: dict) -> dict:
+    """Expand environment variables in settings paths."""
     if "paths" in settings:
         for key, value in settings["paths"].items():
             if isinstance(value, str):
                 settings["paths"][key] = os.path.expandvars(value)
-    
     return settings
 
-def get_category_mapping() -> dict:
+
+def get_settings():
+    """Load settings with path expansion."""
+    return _registry.load("settings.yaml", _expand_settings_paths)
+
+def get_category_mapping():
     """Load category_mapping.yaml."""
     return load_yaml("category_mapping.yaml")
 
 
-def get_excluded() -> dict:
+def get_excluded():
     """Load excluded.yaml."""
     return load_yaml("excluded.yaml")
 
 
+def get_config_stats() -> dict:
+    """Return hit/miss counters of the config registry."""
+    return _registry.stats()
+
+
 def get_env(key: str, default: str = "") -> str:
     """Get environment variable."""
     return os.getenv(key, default)
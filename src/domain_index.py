@@ -0,0 +1,144 @@
+"""
+Learned external-domain -> client index.
+
+A domain like michelin.com maps to the same client almost every time, so
+events whose external domains point to a single known client can skip the
+AI call. The index is built from:
+- seeds in settings.yaml (client_domains)
+- client detections stored in the AI cache
+
+Preview rows are not counted: their clients came from this index or the
+cache in the first place, so they would only reinforce earlier guesses.
+"""
+
+from collections import Counter
+
+from src.config import get_settings
+from src.ai_cache import normalize_domains
+
+
+class DomainIndex:
+    """Domain -> client counts with support/confidence thresholds."""
+
+    def __init__(self, min_support: int = 2, min_confidence: float = 0.9):
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self.counts = {}
+        self.seeds = {}
+        self._best = None
+
+    def add(self, external_domains: str, client: str, weight: int = 1) -> None:
+        """Record that a meeting with these domains belonged to client ('' = none)."""
+        for domain in normalize_domains(external_domains).split(","):
+            if domain:
+                self.counts.setdefault(domain, Counter())[client or ""] += weight
+        self._best = None
+
+    def add_seed(self, domain: str, client: str) -> None:
+        """Configured mapping - always wins over learned counts."""
+        domain = domain.strip().lower()
+        if domain and client:
+            self.seeds[domain] = client
+            self._best = None
+
+    def _finalize(self) -> dict:
+        best = {}
+        for domain, counter in self.counts.items():
+            client, support = counter.most_common(1)[0]
+            total = sum(counter.values())
+            confidence = support / total
+            if client and support >= self.min_support and confidence >= self.min_confidence:
+                best[domain] = (client, support, confidence)
+        for domain, client in self.seeds.items():
+            best[domain] = (client, None, 1.0)
+        return best
+
+    def lookup(self, domain: str) -> tuple[str, int | None, float] | None:
+        """Return (client, support, confidence) for a domain, or None if not confident."""
+        if self._best is None:
+            self._best = self._finalize()
+        return self._best.get(domain.strip().lower())
+
+    def disputed(self, domain: str) -> bool:
+        """True if a domain was seen with several clients and none is confident."""
+        domain = domain.strip().lower()
+        if self.lookup(domain) is not None:
+            return False
+        counter = self.counts.get(domain)
+        return counter is not None and sum(1 for client in counter if client) > 1
+
+    def resolve(self, external_domains: str, company_names: list[str] | None = None) -> str | None:
+        """
+        Return the client if the known domains of a meeting agree on one client.
+
+        Returns None when no domain is known, when any domain is disputed,
+        when known domains point to different clients, or when the client
+        is not in company_names.
+        """
+        if not external_domains:
+            return None
+
+        clients = set()
+        for domain in normalize_domains(external_domains).split(","):
+            if domain:
+                if self.disputed(domain):
+                    return None
+                entry = self.lookup(domain)
+                if entry is not None:
+                    clients.add(entry[0])
+
+        if len(clients) != 1:
+            return None
+        client = clients.pop()
+        if company_names is not None and client not in _company_set(company_names):
+            return None
+        return client
+
+    def __len__(self) -> int:
+        if self._best is None:
+            self._best = self._finalize()
+        return len(self._best)
+
+
+_company_sets = {"names": None, "set": None}
+
+
+def _company_set(company_names: list[str]) -> set:
+    if _company_sets["names"] is not company_names:
+        _company_sets["set"] = set(company_names)
+        _company_sets["names"] = company_names
+    return _company_sets["set"]
+
+
+def build_domain_index() -> DomainIndex:
+    """Build domain index from config seeds and the AI cache."""
+    from src.ai_cache import get_detection_cache
+
+    settings = get_settings()
+    index_settings = settings["ai"].get("domain_index", {})
+    index = DomainIndex(
+        min_support=index_settings.get("min_support", 2),
+        min_confidence=index_settings.get("min_confidence", 0.9),
+    )
+
+    for domain, client in (settings.get("client_domains") or {}).items():
+        index.add_seed(domain, client)
+
+    cache = get_detection_cache()
+    if cache is not None:
+        for domains, client in cache.domain_pairs():
+            index.add(domains, client)
+
+    return index
+
+
+_index = {"instance": None}
+
+
+def get_domain_index() -> DomainIndex | None:
+    """Return process-wide domain index, or None if disabled in settings."""
+    if not get_settings()["ai"].get("domain_index", {}).get("enabled", True):
+        return None
+    if _index["instance"] is None:
+        _index["instance"] = build_domain_index()
+    return _index["instance"]
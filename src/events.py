@@ -0,0 +1,178 @@
+"""
+Compact calendar event representation.
+
+Events are parsed once at load time into Event objects:
+- start/end as integer minutes since 1970-01-01 (naive local time)
+- interned category, pre-split lowercase domain tuple
+- precomputed week key (Sunday, YYYY-MM-DD)
+
+Event supports read-only dict-style access (event["title"], event.get(...))
+so code and tests that work with plain export dicts keep working.
+"""
+
+import sys
+from datetime import date
+
+MINUTES_PER_DAY = 1440
+
+# 1970-01-01 is day 0 (a Thursday)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_week_keys = {}
+
+
+def parse_minutes(value: str) -> int:
+    """'YYYY-MM-DD HH:MM' (or date only) -> minutes since 1970-01-01."""
+    day = date(int(value[0:4]), int(value[5:7]), int(value[8:10])).toordinal() - _EPOCH_ORDINAL
+    minutes = day * MINUTES_PER_DAY
+    if len(value) >= 16:
+        minutes += int(value[11:13]) * 60 + int(value[14:16])
+    return minutes
+
+
+def format_minutes(minutes: int) -> str:
+    """Minutes since 1970-01-01 -> 'YYYY-MM-DD HH:MM'."""
+    day, rest = divmod(minutes, MINUTES_PER_DAY)
+    return f"{day_key(day)} {rest // 60:02d}:{rest % 60:02d}"
+
+
+def day_number(value: date) -> int:
+    """date/datetime -> day number (days since 1970-01-01)."""
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def day_key(day: int) -> str:
+    """Day number -> 'YYYY-MM-DD'."""
+    return date.fromordinal(day + _EPOCH_ORDINAL).isoformat()
+
+
+def weekday(day: int) -> int:
+    """Day number -> weekday (Monday = 0), like date.weekday()."""
+    return (day + 3) % 7
+
+
+def week_key(day: int) -> str:
+    """Sunday of the week containing day number, as 'YYYY-MM-DD' (memoized)."""
+    sunday = day - (weekday(day) + 1) % 7
+    key = _week_keys.get(sunday)
+    if key is None:
+        key = _week_keys[sunday] = sys.intern(day_key(sunday))
+    return key
+
+
+def split_domains(external_domains: str) -> tuple[str, ...]:
+    """'a.com; B.com' -> ('a.com', 'b.com')."""
+    if not external_domains:
+        return ()
+    return tuple(d for d in (p.strip().lower() for p in external_domains.replace(";", ",").split(",")) if d)
+
+
+class Event:
+    """One calendar event, parsed once."""
+
+    __slots__ = (
+        "start_min", "end_min", "category", "title", "minutes", "all_day",
+        "external_domains", "domains", "location", "recipients", "busy_status", "week",
+    )
+
+    def __init__(self, start_min: int, end_min: int, category: str, title: str = "", minutes: int = 0,
+                 all_day: bool = False, external_domains: str = "", location: str = "",
+                 recipients: int = 0, busy_status: int = 0):
+        self.start_min = start_min
+        self.end_min = end_min
+        self.category = sys.intern(category or "")
+        self.title = title or ""
+        self.minutes = minutes
+        self.all_day = bool(all_day)
+        self.external_domains = external_domains or ""
+        self.domains = split_domains(self.external_domains)
+        self.location = location or ""
+        self.recipients = recipients or 0
+        self.busy_status = busy_status or 0
+        self.week = week_key(start_min // MINUTES_PER_DAY)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Event":
+        """Build from an export dict (CalendarEvent)."""
+        return cls(
+            parse_minutes(data["start"]),
+            parse_minutes(data["end"]),
+            data.get("category", ""),
+            data.get("title", ""),
+            data.get("minutes", 0),
+            data.get("all_day", False),
+            data.get("external_domains", ""),
+            data.get("location", ""),
+            data.get("recipients", 0),
+            data.get("busy_status", 0),
+        )
+
+    @property
+    def start(self) -> str:
+        return format_minutes(self.start_min)
+
+    @property
+    def end(self) -> str:
+        return format_minutes(self.end_min)
+
+    @property
+    def day(self) -> int:
+        """Day number of the start."""
+        return self.start_min // MINUTES_PER_DAY
+
+    def replace(self, **changes) -> "Event":
+        """Copy with some fields changed (week and domains are recomputed)."""
+        values = {name: getattr(self, name) for name in _INIT_FIELDS}
+        values.update(changes)
+        return Event(**values)
+
+    def copy(self) -> "Event":
+        return self.replace()
+
+    def astuple(self) -> tuple:
+        """Constructor field values (identity of the event, e.g. for fingerprints)."""
+        return tuple(getattr(self, name) for name in _INIT_FIELDS)
+
+    def to_dict(self) -> dict:
+        """Export-style dict (CalendarEvent)."""
+        return {name: self[name] for name in DICT_KEYS}
+
+    def __getitem__(self, key: str):
+        if key not in _KEY_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default) if key in _KEY_SET else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in _KEY_SET
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Event):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Event({self.start!r}, {self.category!r}, {self.title!r}, minutes={self.minutes})"
+
+
+_INIT_FIELDS = (
+    "start_min", "end_min", "category", "title", "minutes", "all_day",
+    "external_domains", "location", "recipients", "busy_status",
+)
+
+# Keys of the export format, available via event[key]
+DICT_KEYS = (
+    "start", "end", "category", "title", "minutes", "all_day",
+    "external_domains", "location", "recipients", "busy_status",
+)
+
+_KEY_SET = frozenset(DICT_KEYS) | {"start_min", "end_min", "domains", "week"}
+
+
+def as_event(event) -> Event:
+    """Return event as Event (export dicts are parsed)."""
+    return event if isinstance(event, Event) else Event.from_dict(event)
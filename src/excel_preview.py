@@ -3,23 +3,18 @@ Generate Excel preview for approval before SharePoint submission.
 """
 
 import pandas as pd
-from datetime import datetime, timedelta
 from pathlib import Path
 
-from src.config import get_settings, get_category_mapping
-from src.loader import load_and_filter
-from src.mapper import map_category, detect_client
-from src.project_codes import load_project_codes, match_opportunity_id
-from src.overlap import resolve_overlaps_by_hour, get_priority
+from src.events import MINUTES_PER_DAY, as_event, parse_minutes, week_key, weekday
+from src.mapper import map_category, detect_clients
+from src.pipeline import PipelineContext
+from src.overlap import resolve_overlaps, get_overlap_granularity, get_priority
 from src.gap_filler import fill_gaps_with_new_entries
 
 
 def get_week_beginning(date_str: str) -> str:
     """Get Sunday of the week for given date."""
-    dt = datetime.strptime(date_str[:10], "%Y-%m-%d")
-    days_since_sunday = (dt.weekday() + 1) % 7
-    sunday = dt - timedelta(days=days_since_sunday)
-    return sunday.strftime("%Y-%m-%d")
+    return week_key(parse_minutes(date_str[:10]) // MINUTES_PER_DAY)
 
 
 def round_hours(hours: float, precision: float = 0.5) -> float:
@@ -32,28 +27,26 @@ def split_multiday_events(events: list) -> list:
     result = []
     
     for event in events:
-        if not event.get("all_day") or event["minutes"] <= 480:
+        event = as_event(event)
+        if not event.all_day or event.minutes <= 480:
             result.append(event)
             continue
         
-        start = datetime.strptime(event["start"][:10], "%Y-%m-%d")
-        end = datetime.strptime(event["end"][:10], "%Y-%m-%d")
-        
-        current = start
-        while current < end:
-            if current.weekday() < 5:  # Skip weekends
-                daily_event = event.copy()
-                daily_event["start"] = current.strftime("%Y-%m-%d 09:00")
-                daily_event["end"] = current.strftime("%Y-%m-%d 17:00")
-                daily_event["minutes"] = 480
-                daily_event["all_day"] = False
-                result.append(daily_event)
-            current += timedelta(days=1)
+        for day in range(event.start_min // MINUTES_PER_DAY, event.end_min // MINUTES_PER_DAY):
+            if weekday(day) < 5:  # Skip weekends
+                day_start = day * MINUTES_PER_DAY
+                result.append(event.replace(
+                    start_min=day_start + 9 * 60,
+                    end_min=day_start + 17 * 60,
+                    minutes=480,
+                    all_day=False,
+                ))
     
     return result
 
 
-def generate_preview(output_path: str | Path | None = None, weeks_back: int | None = None) -> pd.DataFrame:
+def generate_preview(output_path: str | Path | None = None, weeks_back: int | None = None,
+                     context: PipelineContext | None = None, weeks: set[str] | None = None) -> pd.DataFrame:
     """Generate Excel preview from calendar events.
 
     Uses project_codes.xlsx as single source of truth for client detection.
@@ -61,8 +54,11 @@ def generate_preview(output_path: str | Path | None = None, weeks_back: int | No
     Args:
         output_path: Path to output Excel file
         weeks_back: If specified, filter to last N weeks
+        context: Shared run inputs (created from weeks_back if not given)
+        weeks: If specified, only rows of these weeks are computed
     """
-    from src.overlap import resolve_overlaps_by_hour
+    if context is None:
+        context = PipelineContext(weeks_back=weeks_back)
 
     # Categories that should NEVER have opportunity_id or client
     NO_OPPORTUNITY_ID_CATEGORIES = {
@@ -73,35 +69,41 @@ def generate_preview(output_path: str | Path | None = None, weeks_back: int | No
         'Time Off',
     }
 
-    settings = get_settings()
-    category_mapping = get_category_mapping()
-    sales_categories = set(category_mapping.get("sales_categories", []))
+    sales_categories = set(context.category_mapping.get("sales_categories", []))
 
-    events = load_and_filter(weeks_back=weeks_back)
+    # Overlaps of a week's rows only involve events of its input weeks
+    events = context.events if weeks is None else context.events_for_weeks(weeks)
     events = split_multiday_events(events)
 
-    # Resolve overlaps - only highest priority per hour
-    events = resolve_overlaps_by_hour(events, lambda e: map_category(e["category"]))
+    # Resolve overlaps - only highest priority per slot (default: per hour)
+    events = resolve_overlaps(events, lambda e: map_category(e.category), get_overlap_granularity())
 
-    project_codes = load_project_codes()
     rows = []
 
+    mapped_events = []
     for event in events:
-        sp_category = map_category(event["category"])
-        if not sp_category:
+        if weeks is not None and event.week not in weeks:
             continue
+        sp_category = map_category(event.category)
+        if sp_category:
+            mapped_events.append((event, sp_category))
+
+    # Detect clients in batches - skip categories whose client is cleared anyway
+    client_events = [e for e, cat in mapped_events if cat not in NO_OPPORTUNITY_ID_CATEGORIES]
+    detected_clients = iter(detect_clients(client_events, use_ai=context.use_ai,
+                                          project_codes_df=context.project_codes))
 
-        # detect_client now uses project_codes.xlsx directly
-        client = detect_client(event)
+    for event, sp_category in mapped_events:
+        client = next(detected_clients) if sp_category not in NO_OPPORTUNITY_ID_CATEGORIES else None
 
-        week = get_week_beginning(event["start"])
-        hours = round_hours(event["minutes"] / 60)
+        week = event.week
+        hours = round_hours(event.minutes / 60)
         needs_opp_id = sp_category in sales_categories
 
         # Match opportunity ID for ANY row with client
         opp_id, needs_review = "", False
         if client:
-            opp_id, needs_review = match_opportunity_id(client, event["title"], project_codes)
+            opp_id, needs_review = context.opportunity_index.match(client, event.title)
 
         # Clear client and opportunity_id for non-sales categories
         if sp_category in NO_OPPORTUNITY_ID_CATEGORIES:
@@ -115,8 +117,8 @@ def generate_preview(output_path: str | Path | None = None, weeks_back: int | No
             "client": client or "",
             "hours": hours,
             "opportunity_id": opp_id,
-            "title": event["title"],
-            "external_domains": event.get("external_domains", ""),
+            "title": event.title,
+            "external_domains": event.external_domains,
             "needs_review": needs_review,
             "is_autofilled": False,
             "status": "NEW"
@@ -126,7 +128,21 @@ def generate_preview(output_path: str | Path | None = None, weeks_back: int | No
     return df
 
 
-def generate_aggregated_preview(output_path: str | Path | None = None, weeks_back: int | None = None) -> pd.DataFrame:
+def _aggregate(context: PipelineContext, weeks: set[str] | None = None) -> pd.DataFrame:
+    """Preview rows (optionally of some weeks only), sorted, with WEEK TOTAL summaries."""
+    from src.aggregator import aggregate_entries, add_week_summaries
+
+    df = generate_preview(context=context, weeks=weeks)
+    if df.empty:
+        return df
+    # aggregate_entries now just sorts and prepares data (no aggregation)
+    sorted_df = aggregate_entries(df)
+    # Add WEEK TOTAL summary rows
+    return add_week_summaries(sorted_df)
+
+
+def generate_aggregated_preview(output_path: str | Path | None = None, weeks_back: int | None = None,
+                                context: PipelineContext | None = None) -> pd.DataFrame:
     """
     Generate Excel preview with WEEK TOTAL summaries.
     Each calendar event is a separate row (no aggregation by category).
@@ -134,18 +150,14 @@ def generate_aggregated_preview(output_path: str | Path | None = None, weeks_bac
     Args:
         output_path: Path to output Excel file
         weeks_back: If specified, filter to last N weeks
+        context: Shared run inputs (created from weeks_back if not given)
     """
-    from src.aggregator import aggregate_entries, add_week_summaries
-
-    settings = get_settings()
+    if context is None:
+        context = PipelineContext(weeks_back=weeks_back)
     if output_path is None:
-        output_path = Path(settings["paths"]["excel_preview"])
+        output_path = Path(context.settings["paths"]["excel_preview"])
 
-    df = generate_preview(output_path=None, weeks_back=weeks_back)
-    # aggregate_entries now just sorts and prepares data (no aggregation)
-    sorted_df = aggregate_entries(df)
-    # Add WEEK TOTAL summary rows
-    df_with_summary = add_week_summaries(sorted_df)
+    df_with_summary = _aggregate(context)
 
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -153,28 +165,159 @@ def generate_aggregated_preview(output_path: str | Path | None = None, weeks_bac
 
     return df_with_summary
 
-def generate_final_preview(output_path: str | Path | None = None, fill: bool = True, weeks_back: int | None = None) -> pd.DataFrame:
+
+def _compute_weeks(context: PipelineContext, weeks: set[str] | None, fill: bool) -> pd.DataFrame:
+    """Preview rows of weeks (None = all), gap-filled, with WEEK TOTAL summaries."""
+    df = _aggregate(context, weeks=weeks)
+    if fill and not df.empty:
+        df = fill_gaps_with_new_entries(df, context=context)
+    return df
+
+
+# Run inputs of a pool worker, set by _init_week_worker
+_worker = {"context": None}
+
+
+def _init_week_worker(context: PipelineContext, pool_size: int) -> None:
+    import sys
+
+    # Connections inherited through fork belong to the parent process
+    if "src.ai_cache" in sys.modules:
+        sys.modules["src.ai_cache"].reset_after_fork()
+    if context.use_ai:
+        from src.gemini_client import reset_after_fork
+        reset_after_fork(pool_size)
+    _worker["context"] = context
+
+
+def _compute_week(week: str, fill: bool) -> pd.DataFrame:
+    return _compute_weeks(_worker["context"], {week}, fill)
+
+
+def _compute_weeks_in_pool(context: PipelineContext, weeks: list[str], fill: bool, workers: int) -> pd.DataFrame:
+    """
+    Compute weeks in a process pool, one task per week, merged in week order.
+
+    After overlap resolution weeks are independent (generate_preview only
+    needs the events of a week's input weeks, including the next week when
+    an event crosses Saturday midnight). Calendar, project codes and the
+    compiled matchers are loaded before the pool starts, so forked workers
+    share them copy-on-write; with spawn the context is pickled once per
+    worker.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from src.aggregator import add_week_summaries
+    from src.mapper import get_client_matcher
+
+    # Load shared read-only inputs (and the Gemini SDK) once, before forking
+    context.events_by_week
+    context.opportunity_index
+    get_client_matcher(context.company_names)
+    if context.use_ai:
+        import src.gemini_client  # noqa: F401
+
+    # Gemini budgets are split by the processes actually started, not the requested workers
+    pool_size = min(workers, len(weeks))
+    methods = multiprocessing.get_all_start_methods()
+    mp_context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(max_workers=pool_size, mp_context=mp_context,
+                             initializer=_init_week_worker, initargs=(context, pool_size)) as pool:
+        parts = list(pool.map(_compute_week, weeks, [fill] * len(weeks)))
+
+    rows = [part[part["category"] != ">>> WEEK TOTAL"] for part in parts if not part.empty]
+    if not rows:
+        return pd.DataFrame()
+    return add_week_summaries(pd.concat(rows, ignore_index=True))
+
+
+def get_preview_workers() -> int:
+    """Worker processes for preview generation (from config, 1 = serial)."""
+    from src.config import get_settings
+    return max(1, int(get_settings()["processing"].get("preview_workers", 1)))
+
+
+def _reusable_rows(output_path: Path, fingerprints: dict[str, str], context: PipelineContext):
+    """
+    Rows of the previous preview for weeks whose input is unchanged.
+
+    Returns:
+        (rows without WEEK TOTAL, set of weeks to recompute); rows is None
+        when nothing can be reused
+    """
+    from src.preview_store import load_preview, load_week_fingerprints, to_preview_rows
+
+    stored = load_week_fingerprints(output_path)
+    if not stored or not output_path.exists():
+        return None, set(fingerprints)
+
+    dirty = context.dirty_weeks(fingerprints, stored)
+    clean = set(fingerprints) - dirty
+    if not clean:
+        return None, dirty
+
+    # From the workbook (or its snapshot), so manual edits of clean weeks are kept
+    try:
+        previous = to_preview_rows(load_preview(output_path))
+    except (ValueError, OSError, KeyError):
+        return None, set(fingerprints)
+    previous = previous[previous["week_beginning"].isin(clean) & (previous["category"] != ">>> WEEK TOTAL")]
+    return previous, dirty
+
+
+def generate_final_preview(output_path: str | Path | None = None, fill: bool = True, weeks_back: int | None = None,
+                           use_ai: bool = True, incremental: bool | None = None,
+                           workers: int | None = None) -> pd.DataFrame:
     """Generate final Excel preview with gap filling and colors.
 
     Args:
         output_path: Path to output Excel file
         fill: If True, fill gaps to reach 40h target
         weeks_back: If specified, filter to last N weeks
+        use_ai: If False, no Gemini calls (client detection and autofill comments)
+        incremental: Reuse rows of weeks whose input did not change since the
+            last run (default: processing.incremental_preview)
+        workers: Compute weeks in this many processes (default: processing.preview_workers)
+
+    Returns:
+        Preview rows; df.attrs["recomputed_weeks"] / ["reused_weeks"] list the weeks
     """
+    from src.aggregator import add_week_summaries
     from src.excel_writer import write_excel_with_formatting
+    from src.preview_store import save_preview_snapshot
 
-    settings = get_settings()
+    # Calendar, config and project codes are loaded once for all stages
+    context = PipelineContext(weeks_back=weeks_back, use_ai=use_ai)
     if output_path is None:
-        output_path = Path(settings["paths"]["excel_preview"])
-
-    df = generate_aggregated_preview(output_path=None, weeks_back=weeks_back)
-
-    if fill:
-        df = fill_gaps_with_new_entries(df)
-
+        output_path = Path(context.settings["paths"]["excel_preview"])
     output_path = Path(output_path)
+    if incremental is None:
+        incremental = context.settings["processing"].get("incremental_preview", True)
+    if workers is None:
+        workers = get_preview_workers()
+
+    fingerprints = context.week_fingerprints(fill)
+    previous, dirty = _reusable_rows(output_path, fingerprints, context) if incremental else (None, None)
+
+    todo = dirty if previous is not None else None
+    todo_list = sorted(todo if todo is not None else context.events_by_week)
+    if workers > 1 and len(todo_list) > 1:
+        df = _compute_weeks_in_pool(context, todo_list, fill, workers)
+    else:
+        df = _compute_weeks(context, todo, fill)
+
+    if previous is not None:
+        # Week order is kept by add_week_summaries; rows keep their order within a week
+        fresh = df[df["category"] != ">>> WEEK TOTAL"] if not df.empty else df
+        df = add_week_summaries(pd.concat([previous, fresh], ignore_index=True))
+
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     write_excel_with_formatting(df, output_path)
+    # Binary sidecar so status/upload/report can skip parsing the workbook
+    save_preview_snapshot(df, output_path, week_fingerprints=fingerprints)
 
-    return df
\ No newline at end of file
+    weeks = sorted(w for w in df["week_beginning"].unique() if isinstance(w, str)) if not df.empty else []
+    df.attrs["recomputed_weeks"] = [w for w in weeks if previous is None or w in dirty]
+    df.attrs["reused_weeks"] = [w for w in weeks if previous is not None and w not in dirty]
+    return df
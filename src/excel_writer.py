@@ -1,75 +1,104 @@
 """
 Excel writer with formatting, colors and table.
+
+The workbook is written in one streaming pass (openpyxl write-only mode).
+Row colors are conditional-formatting rules over the table range rather
+than per-cell fills, and column widths are computed from the DataFrame.
 """
 
 import pandas as pd
 from pathlib import Path
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill, Font
-from openpyxl.worksheet.table import Table, TableStyleInfo
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import PatternFill, Font, Border, Side, Alignment
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+SHEET_NAME = "Time Entries"
+MAX_COLUMN_WIDTH = 50
+
+# Row colors
+GREEN = "90EE90"   # Original
+YELLOW = "FFFF00"  # Autofilled
+RED = "FF6B6B"     # Week total
+
+
+def _fill(color: str) -> PatternFill:
+    # Conditional formats (dxf) take the fill color from bgColor
+    return PatternFill(start_color=color, end_color=color, bgColor=color, fill_type="solid")
+
+
+def _column_widths(df: pd.DataFrame) -> list[float]:
+    """Width per column: longest non-empty value or header + 2, capped at MAX_COLUMN_WIDTH."""
+    widths = []
+    for name in df.columns:
+        values = df[name]
+        # Same cells the per-cell scan skipped: empty, "", 0 and False
+        present = values[values.notna() & (values != "") & (values != 0)]
+        longest = present.astype(str).str.len().max() if len(present) else 0
+        widths.append(min(max(longest, len(str(name))) + 2, MAX_COLUMN_WIDTH))
+    return widths
+
+
+def _row_rules(df: pd.DataFrame, cell_range: str) -> list[tuple[str, FormulaRule]]:
+    """Conditional formats coloring WEEK TOTAL, autofilled and original rows (first match wins)."""
+    columns = list(df.columns)
+    rules = []
+    if "category" in columns:
+        letter = get_column_letter(columns.index("category") + 1)
+        rules.append(FormulaRule(formula=[f'${letter}2=">>> WEEK TOTAL"'], fill=_fill(RED), stopIfTrue=True))
+    if "is_autofilled" in columns:
+        letter = get_column_letter(columns.index("is_autofilled") + 1)
+        rules.append(FormulaRule(formula=[f"${letter}2=TRUE"], fill=_fill(YELLOW), stopIfTrue=True))
+    rules.append(FormulaRule(formula=["TRUE"], fill=_fill(GREEN), stopIfTrue=True))
+    return [(cell_range, rule) for rule in rules]
 
 
 def write_excel_with_formatting(df: pd.DataFrame, output_path: Path) -> None:
     """Write DataFrame to Excel with colors and table formatting."""
-    
-    # Save basic Excel first
-    df.to_excel(output_path, index=False, sheet_name="Time Entries")
-    
-    # Load and format
-    wb = load_workbook(output_path)
-    ws = wb.active
-    
-    # Define colors
-    green_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")  # Original
-    yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")  # Autofilled
-    red_fill = PatternFill(start_color="FF6B6B", end_color="FF6B6B", fill_type="solid")  # Week total
-    
-    # Find column indices
-    columns = {cell.value: cell.column for cell in ws[1]}
-    category_col = columns.get("category")
-    autofill_col = columns.get("is_autofilled")
-    
-    # Apply colors to data rows
-    for row_idx in range(2, ws.max_row + 1):
-        category_value = ws.cell(row=row_idx, column=category_col).value if category_col else None
-        is_autofilled = ws.cell(row=row_idx, column=autofill_col).value if autofill_col else False
-        
-        # Determine fill color
-        if category_value == ">>> WEEK TOTAL":
-            fill = red_fill
-        elif is_autofilled:
-            fill = yellow_fill
-        else:
-            fill = green_fill
-        
-        # Apply to all cells in row
-        for col_idx in range(1, ws.max_column + 1):
-            ws.cell(row=row_idx, column=col_idx).fill = fill
-    
-    # Create table
-    table_range = f"A1:{chr(64 + ws.max_column)}{ws.max_row}"
-    table = Table(displayName="TimeEntries", ref=table_range)
-    
-    style = TableStyleInfo(
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_NAME)
+
+    n_rows, n_cols = len(df) + 1, max(len(df.columns), 1)
+    last_col = get_column_letter(n_cols)
+
+    # Column widths and conditional formats must be set before rows are streamed
+    for idx, width in enumerate(_column_widths(df), start=1):
+        ws.column_dimensions[get_column_letter(idx)].width = width
+    if len(df):
+        for cell_range, rule in _row_rules(df, f"A2:{last_col}{n_rows}"):
+            ws.conditional_formatting.add(cell_range, rule)
+
+    # Header in the pandas to_excel style
+    thin = Side(style="thin")
+    header_font = Font(bold=True)
+    header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_alignment = Alignment(horizontal="center", vertical="top")
+    header = []
+    for name in df.columns:
+        cell = WriteOnlyCell(ws, value=str(name))
+        cell.font = header_font
+        cell.border = header_border
+        cell.alignment = header_alignment
+        header.append(cell)
+    ws.append(header)
+
+    # Python scalars, NaN as empty cells
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        ws.append(row)
+
+    table = Table(displayName="TimeEntries", ref=f"A1:{last_col}{n_rows}")
+    # Write-only sheets cannot read the header back, so name the columns here
+    table.tableColumns = [TableColumn(id=idx, name=str(name)) for idx, name in enumerate(df.columns, start=1)]
+    table.tableStyleInfo = TableStyleInfo(
         name="TableStyleMedium9",
         showFirstColumn=False,
         showLastColumn=False,
         showRowStripes=True,
         showColumnStripes=False
     )
-    table.tableStyleInfo = style
-    ws.add_table(table)
-    
-    # Auto-adjust column widths
-    for column_cells in ws.columns:
-        max_length = 0
-        column = column_cells[0].column_letter
-        for cell in column_cells:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        ws.column_dimensions[column].width = min(max_length + 2, 50)
-    
-    wb.save(output_path)
\ No newline at end of file
+    ws.tables.add(table)  # add_table() only warns in write-only mode
+
+    wb.save(output_path)
@@ -2,10 +2,13 @@
 Fill empty time slots (9:00-17:00) with generated entries.
 """
 
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import defaultdict
 
+from src.events import MINUTES_PER_DAY, as_event, day_number, parse_minutes, weekday
+
 # Categories that can be autofilled
 AUTOFILL_CATEGORIES = {
     "Prep - Demo/ Presentation",
@@ -25,39 +28,94 @@ NEVER_AUTOFILL = {
     "Time Off",
 }
 
-WORK_START = 9  # 9:00
-WORK_END = 17   # 17:00
+WORK_START = 9  # 9:00 (default, see processing.work_start_hour)
+WORK_END = 17   # 17:00 (default, see processing.work_end_hour)
+
+# Occupancy resolution in minutes (default, see processing.gap_slot_minutes)
+SLOT_MINUTES = 15
+
+
+def get_work_hours() -> tuple[int, int]:
+    """Return (work_start_hour, work_end_hour) from config."""
+    from src.config import get_settings
+    processing = get_settings()["processing"]
+    return int(processing.get("work_start_hour", WORK_START)), int(processing.get("work_end_hour", WORK_END))
+
+
+def build_occupancy(events: list, first_day: int, n_days: int, slot_minutes: int = SLOT_MINUTES) -> np.ndarray:
+    """
+    Boolean (days x slots) matrix, True where any event covers the slot.
+
+    All events are painted at once: +1/-1 at each event's first/past-last
+    slot (clipped to the horizon), then a cumulative sum marks covered slots.
+    Slots an event only partly covers count as occupied.
+    """
+    slots_per_day = MINUTES_PER_DAY // slot_minutes
+    n_slots = n_days * slots_per_day
+    if not events or n_days <= 0:
+        return np.zeros((max(n_days, 0), slots_per_day), dtype=bool)
+
+    offset = first_day * MINUTES_PER_DAY
+    bounds = np.array([(e.start_min, e.end_min) for e in map(as_event, events)], dtype=np.int64) - offset
+    starts = np.clip(bounds[:, 0] // slot_minutes, 0, n_slots)
+    ends = np.clip(-(-bounds[:, 1] // slot_minutes), 0, n_slots)
+    painted = ends > starts
+
+    diff = np.zeros(n_slots + 1, dtype=np.int32)
+    np.add.at(diff, starts[painted], 1)
+    np.add.at(diff, ends[painted], -1)
+    return (np.cumsum(diff[:-1]) > 0).reshape(n_days, slots_per_day)
+
+
+def empty_hours_per_day(occupancy: np.ndarray, work_start: int = WORK_START, work_end: int = WORK_END,
+                        slot_minutes: int = SLOT_MINUTES) -> np.ndarray:
+    """Free hours within working hours for every row (day) of an occupancy matrix."""
+    slots_per_hour = 60 // slot_minutes
+    work = occupancy[:, work_start * slots_per_hour:work_end * slots_per_hour]
+    return (~work).sum(axis=1) * (slot_minutes / 60)
+
+
+def weekly_empty_hours(events: list, weeks: list[str], slot_minutes: int | None = None) -> dict[str, float]:
+    """
+    Free working hours (Mon-Fri) per week for the whole horizon in one pass.
+
+    Args:
+        events: Calendar events
+        weeks: Week keys (Sunday, YYYY-MM-DD)
+        slot_minutes: Occupancy resolution (default: processing.gap_slot_minutes)
+    """
+    from src.config import get_settings
+
+    if not weeks:
+        return {}
+    if slot_minutes is None:
+        slot_minutes = int(get_settings()["processing"].get("gap_slot_minutes", SLOT_MINUTES))
+    work_start, work_end = get_work_hours()
+
+    week_days = {week: parse_minutes(week) // MINUTES_PER_DAY for week in weeks}
+    first_day = min(week_days.values())
+    n_days = max(week_days.values()) - first_day + 7
+
+    occupancy = build_occupancy(events, first_day, n_days, slot_minutes)
+    per_day = empty_hours_per_day(occupancy, work_start, work_end, slot_minutes)
+    workdays = np.array([weekday(first_day + i) < 5 for i in range(n_days)])
+    per_day = np.where(workdays, per_day, 0.0)
+
+    return {week: float(per_day[day - first_day:day - first_day + 7].sum()) for week, day in week_days.items()}
 
 
 def find_empty_slots(events: list, date: datetime) -> list[tuple[int, int]]:
     """
-    Find empty time slots between 9:00-17:00 for a given date.
+    Find empty whole-hour slots within working hours for a given date.
     Returns list of (start_hour, end_hour) tuples.
     """
-    date_str = date.strftime("%Y-%m-%d")
-    
-    # Get events for this day
-    day_events = []
-    for e in events:
-        if e["start"].startswith(date_str):
-            start_hour = int(e["start"][11:13])
-            end_hour = int(e["end"][11:13])
-            end_min = int(e["end"][14:16])
-            if end_min > 0:
-                end_hour += 1
-            day_events.append((max(start_hour, WORK_START), min(end_hour, WORK_END)))
-    
-    # Find empty slots
-    occupied = [False] * 24
-    for start, end in day_events:
-        for h in range(start, end):
-            if 0 <= h < 24:
-                occupied[h] = True
-    
+    work_start, work_end = get_work_hours()
+    occupied = build_occupancy(events, day_number(date), 1, slot_minutes=60)[0]
+
     empty_slots = []
     slot_start = None
     
-    for hour in range(WORK_START, WORK_END):
+    for hour in range(work_start, work_end):
         if not occupied[hour]:
             if slot_start is None:
                 slot_start = hour
@@ -67,39 +125,63 @@ def find_empty_slots(events: list, date: datetime) -> list[tuple[int, int]]:
                 slot_start = None
     
     if slot_start is not None:
-        empty_slots.append((slot_start, WORK_END))
+        empty_slots.append((slot_start, work_end))
     
     return empty_slots
 
 
+DEFAULT_DISTRIBUTION = {("Prep - Demo/ Presentation", "", ""): 1.0}
+
+
+def category_distributions(df: pd.DataFrame) -> dict[str, dict]:
+    """
+    Distribution of autofillable categories for every week in one groupby pass.
+
+    Returns:
+        {week: {(category, client, opp_id): proportion}}; keys keep the order
+        of first appearance. Weeks without autofillable hours are omitted.
+    """
+    data = df[df["category"].isin(AUTOFILL_CATEGORIES) & (df["is_autofilled"] == False)]
+    if data.empty:
+        return {}
+
+    keys = pd.DataFrame({
+        "week_beginning": data["week_beginning"],
+        "category": data["category"],
+        "client": data["client"] if "client" in data.columns else "",
+        "opportunity_id": data["opportunity_id"] if "opportunity_id" in data.columns else "",
+    })
+    week_totals = data.groupby("week_beginning", sort=False)["hours"].transform("sum")
+    shares = (data["hours"] / week_totals).where(week_totals != 0)
+    proportions = shares.groupby(
+        [keys[col] for col in keys.columns], sort=False, dropna=False
+    ).sum(min_count=1)
+
+    distributions = {}
+    for (week, cat, client, opp_id), proportion in proportions.items():
+        if pd.isna(proportion):
+            continue  # Week with zero hours
+        distributions.setdefault(week, {})[(cat, client, opp_id)] = proportion
+    return distributions
+
+
 def calculate_category_distribution(df: pd.DataFrame, week: str) -> dict[str, float]:
     """
     Calculate percentage distribution of autofillable categories for a week.
     Works with individual calendar events (non-aggregated data).
     Returns dict of {(category, client, opp_id): proportion}.
     """
-    week_data = df[
-        (df["week_beginning"] == week) &
-        (df["category"].isin(AUTOFILL_CATEGORIES)) &
-        (df["is_autofilled"] == False)
-    ]
+    distribution = category_distributions(df[df["week_beginning"] == week]).get(week)
+    return distribution or dict(DEFAULT_DISTRIBUTION)
 
-    if week_data.empty:
-        return {("Prep - Demo/ Presentation", "", ""): 1.0}
 
-    total = week_data["hours"].sum()
-    if total == 0:
-        return {("Prep - Demo/ Presentation", "", ""): 1.0}
-
-    distribution = {}
-    for _, row in week_data.iterrows():
-        cat = row["category"]
-        client = row.get("client", "")
-        opp_id = row.get("opportunity_id", "")
-        key = (cat, client, opp_id)
-        distribution[key] = distribution.get(key, 0) + row["hours"] / total
-
-    return distribution
+def week_contexts(df: pd.DataFrame) -> dict[str, str]:
+    """First three comments of every week joined with '; ' (Gemini context), in one pass."""
+    data = df[df["category"] != ">>> WEEK TOTAL"]
+    if "comments" not in data.columns or data.empty:
+        return {}
+    first = data.groupby("week_beginning", sort=False).head(3)
+    return first.groupby("week_beginning", sort=False)["comments"].agg("; ".join).to_dict()
 
 
 def generate_autofill_entries(
@@ -107,7 +189,9 @@ def generate_autofill_entries(
     aggregated_df: pd.DataFrame,
     week: str,
     empty_hours: float,
-    use_ai: bool = True
+    use_ai: bool = True,
+    distribution: dict | None = None,
+    week_context: str | None = None
 ) -> list[dict]:
     """
     Generate new entries to fill empty hours, distributed by category proportion.
@@ -119,8 +203,9 @@ def generate_autofill_entries(
         week: Week beginning date (YYYY-MM-DD)
         empty_hours: Number of hours to fill
         use_ai: If True, use Gemini AI for comment generation
+        distribution: Precomputed category distribution of the week (see category_distributions)
+        week_context: Precomputed Gemini context of the week (see week_contexts)
     """
-    from src.gemini_client import generate_autofill_comment
     from src.config import get_settings
 
     # Categories that should NEVER have opportunity_id or client
@@ -132,14 +217,15 @@ def generate_autofill_entries(
         'Time Off',
     }
 
-    distribution = calculate_category_distribution(aggregated_df, week)
+    if distribution is None:
+        distribution = calculate_category_distribution(aggregated_df, week)
 
     # Build context for Gemini from week activities
-    week_data = aggregated_df[
-        (aggregated_df["week_beginning"] == week) &
-        (aggregated_df["category"] != ">>> WEEK TOTAL")
-    ]
-    week_context = "; ".join(week_data.get("comments", ["General work"]).head(3).tolist())
+    if week_context is None:
+        week_context = week_contexts(aggregated_df[aggregated_df["week_beginning"] == week]).get(week, "")
+
+    settings = get_settings()
+    ai_enabled = settings["ai"]["enabled"] and use_ai
 
     # Calculate hours with rounding
     new_entries = []
@@ -153,27 +239,13 @@ def generate_autofill_entries(
                 client = ""
                 opp_id = ""
 
-            # Generate comment for autofilled entry
-            settings = get_settings()
-            ai_enabled = settings["ai"]["enabled"] and use_ai
-
-            if ai_enabled:
-                comment = generate_autofill_comment(cat, client, week_context)
-
-            if not ai_enabled or not comment:
-                # Fallback to simple comment
-                if client:
-                    comment = f"{cat} work for {client}"
-                else:
-                    comment = f"{cat} work"
-
             new_entries.append({
                 "week_beginning": week,
                 "category": cat,
                 "client": client,
                 "hours": hours,
                 "opportunity_id": opp_id,
-                "comments": comment,
+                "comments": "",
                 "external_domains": "",
                 "needs_review": True,
                 "is_autofilled": True,
@@ -181,6 +253,25 @@ def generate_autofill_entries(
             })
             total_allocated += hours
 
+    # Generate comments for autofilled entries (AI calls run concurrently)
+    if ai_enabled:
+        from src.gemini_client import generate_autofill_comment, run_concurrently
+
+        comments = run_concurrently(
+            lambda e: generate_autofill_comment(e["category"], e["client"], week_context),
+            new_entries
+        )
+        for entry, comment in zip(new_entries, comments):
+            entry["comments"] = comment
+
+    for entry in new_entries:
+        if not entry["comments"]:
+            # Fallback to simple comment
+            if entry["client"]:
+                entry["comments"] = f"{entry['category']} work for {entry['client']}"
+            else:
+                entry["comments"] = f"{entry['category']} work"
+
     # Fix rounding errors - ensure total equals exactly empty_hours
     if new_entries and abs(total_allocated - empty_hours) > 0.01:
         difference = empty_hours - total_allocated
@@ -197,7 +288,8 @@ def generate_autofill_entries(
 def fill_gaps_with_new_entries(
     aggregated_df: pd.DataFrame,
     use_ai: bool = True,
-    target_hours: float = 40.0
+    target_hours: float = 40.0,
+    context=None
 ) -> pd.DataFrame:
     """
     Find actual empty time slots and create new autofilled entries.
@@ -207,10 +299,16 @@ def fill_gaps_with_new_entries(
         aggregated_df: Aggregated DataFrame with events
         use_ai: If True, use Gemini AI for comment generation
         target_hours: Target hours per week (default 40.0)
+        context: PipelineContext of the run - its events and AI setting are reused
     """
-    from src.loader import load_and_filter
-
-    events = load_and_filter()
+    weeks = [w for w in aggregated_df["week_beginning"].unique() if isinstance(w, str)]
+    if context is not None:
+        events = context.events
+        use_ai = use_ai and context.use_ai
+    else:
+        from src.loader import load_and_filter
+        events = load_and_filter(since=min(weeks) if weeks else None)
+    empty_by_week = weekly_empty_hours(events, weeks)
     df = aggregated_df.copy()
 
     # Ensure is_autofilled column exists and is False for original entries
@@ -220,33 +318,25 @@ def fill_gaps_with_new_entries(
 
     all_new_entries = []
 
+    # Per-week inputs in single passes over the frame
+    time_off_weeks = set(df.loc[df["category"] == "Time Off", "week_beginning"])
+    # Skip WEEK TOTAL rows
+    hours_by_week = df[df["category"] != ">>> WEEK TOTAL"].groupby("week_beginning")["hours"].sum()
+    distributions = category_distributions(df)
+    contexts = week_contexts(df)
+
     for week in df["week_beginning"].unique():
         # Skip Time Off weeks
-        has_time_off = ((df["week_beginning"] == week) & (df["category"] == "Time Off")).any()
-        if has_time_off:
+        if week in time_off_weeks:
             continue
 
-        # Skip WEEK TOTAL rows
-        week_data = df[
-            (df["week_beginning"] == week) &
-            (df["category"] != ">>> WEEK TOTAL")
-        ]
-
-        current_hours = week_data["hours"].sum()
+        current_hours = hours_by_week.get(week, 0)
 
         if current_hours >= target_hours:
             continue
 
-        # Find ACTUAL empty slots in the calendar for this week
-        week_date = datetime.strptime(week, "%Y-%m-%d")
-        total_empty_hours = 0
-
-        for day_offset in range(7):
-            day = week_date + timedelta(days=day_offset)
-            if day.weekday() < 5:  # Weekdays only
-                empty_slots = find_empty_slots(events, day)
-                for start_h, end_h in empty_slots:
-                    total_empty_hours += (end_h - start_h)
+        # ACTUAL empty working time in the calendar for this week
+        total_empty_hours = empty_by_week.get(week, 0)
 
         # Only autofill if there are actual empty slots
         if total_empty_hours > 0:
@@ -254,7 +344,11 @@ def fill_gaps_with_new_entries(
             empty_hours = min(total_empty_hours, target_hours - current_hours)
 
             if empty_hours > 0:
-                new_entries = generate_autofill_entries(events, df, week, empty_hours, use_ai)
+                new_entries = generate_autofill_entries(
+                    events, df, week, empty_hours, use_ai,
+                    distribution=distributions.get(week) or dict(DEFAULT_DISTRIBUTION),
+                    week_context=contexts.get(week, "")
+                )
                 all_new_entries.extend(new_entries)
 
     # Add new entries to dataframe
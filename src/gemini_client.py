@@ -2,35 +2,315 @@
 Gemini Flash API client for intelligent text generation.
 """
 
+import atexit
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from google import genai
+from google.genai import types
 from src.config import get_env, get_settings
 
+# Rough chars-per-token ratio used to keep batch prompts under the limit
+CHARS_PER_TOKEN = 4
+
+
+class GeminiClientHolder:
+    """
+    Process-wide, lazily created Gemini client.
+
+    The client (and its pooled keep-alive HTTP connections) is created on
+    first use and reused by every call - from worker threads via
+    generate(), or from asyncio code via generate_async(). The model name
+    and timeouts are read once, when the client is created.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _create(self):
+        api_key = get_env("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not set in .env")
+
+        import httpx
+
+        ai_settings = get_settings()["ai"]
+        _, pool_size = get_ai_limits()
+        limits = httpx.Limits(
+            max_connections=pool_size * 2,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=float(ai_settings.get("keepalive_seconds", 60)),
+        )
+        http_options = types.HttpOptions(
+            timeout=int(float(ai_settings.get("timeout_seconds", 60)) * 1000),
+            client_args={"limits": limits},
+            async_client_args={"limits": limits},
+        )
+
+        self._model = ai_settings["model"]
+        return genai.Client(api_key=api_key, http_options=http_options)
+
+    def get(self):
+        """Return the shared client, creating it on first use."""
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create()
+                client = self._client
+        return client
+
+    @property
+    def model(self) -> str:
+        self.get()
+        return self._model
+
+    def generate(self, prompt: str, config=None) -> str:
+        """Blocking generate_content call (thread-safe)."""
+        response = self.get().models.generate_content(model=self.model, contents=prompt, config=config)
+        return (response.text or "").strip()
+
+    async def generate_async(self, prompt: str, config=None) -> str:
+        """asyncio generate_content call sharing the same client."""
+        response = await self.get().aio.models.generate_content(model=self.model, contents=prompt, config=config)
+        return (response.text or "").strip()
+
+    def close(self) -> None:
+        """Close pooled connections. The next call creates a fresh client."""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    async def aclose(self) -> None:
+        """Close pooled connections from asyncio code."""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            try:
+                await client.aio.aclose()
+                client.close()
+            except Exception:
+                pass
+
+
+_holder = GeminiClientHolder()
+atexit.register(_holder.close)
+
 
 def get_client():
-    """Initialize and return Gemini client."""
-    api_key = get_env("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("GEMINI_API_KEY not set in .env")
+    """Return the shared Gemini client (created on first use)."""
+    return _holder.get()
+
+
+def close_client() -> None:
+    """Close the shared Gemini client and its connections."""
+    _holder.close()
+
+
+# Processes sharing the configured Gemini budget (set in preview pool workers)
+_process_share = {"workers": 1}
+
 
-    return genai.Client(api_key=api_key)
+def get_ai_limits() -> tuple[float, int]:
+    """
+    (requests_per_minute, max_concurrency) of this process.
+
+    Both are the configured ai settings divided by the number of processes
+    sharing the API key, floored at 1 (a rate of 0 stays 0 = unlimited).
+    """
+    ai_settings = get_settings()["ai"]
+    workers = _process_share["workers"]
+    rpm = float(ai_settings.get("requests_per_minute", 60))
+    if rpm > 0:
+        rpm = max(1.0, rpm / workers)
+    return rpm, max(1, int(ai_settings.get("max_concurrency", 4)) // workers)
+
+
+def reset_after_fork(workers: int = 1) -> None:
+    """
+    Drop the client and rate limiter inherited from a parent process.
+
+    The inherited connections belong to the parent, so they are forgotten
+    rather than closed. The requests-per-minute and in-flight budgets are
+    split across the `workers` processes sharing the API key.
+    """
+    global _holder
+    _holder = GeminiClientHolder()
+    _process_share["workers"] = max(1, workers)
+    _limiter.update({"instance": None, "key": None})
+
+
+class RateLimiter:
+    """
+    Token bucket limiting requests per minute across threads.
+
+    Up to `burst` requests may start immediately; after that tokens refill
+    at requests_per_minute / 60 per second. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiter = {"instance": None, "key": None}
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return process-wide rate limiter configured from settings (see get_ai_limits)."""
+    key = get_ai_limits()
+    if _limiter["key"] != key:
+        _limiter["instance"] = RateLimiter(key[0], burst=key[1])
+        _limiter["key"] = key
+    return _limiter["instance"]
+
+
+def run_concurrently(func, items: list, max_in_flight: int | None = None, limiter: RateLimiter | None = None) -> list:
+    """
+    Call func(item) for every item with bounded concurrency and rate limiting.
+
+    Args:
+        func: Function called once per item
+        items: Items to process
+        max_in_flight: Max concurrent calls (default: this process's share of ai.max_concurrency)
+        limiter: Rate limiter (default: shared limiter from ai.requests_per_minute)
+
+    Returns:
+        Results in the original item order
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    if max_in_flight is None:
+        _, max_in_flight = get_ai_limits()
+    if limiter is None:
+        limiter = get_rate_limiter()
+
+    def limited(item):
+        limiter.acquire()
+        return func(item)
+
+    workers = max(1, min(int(max_in_flight), len(items)))
+    if workers == 1:
+        return [limited(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini") as executor:
+        return list(executor.map(limited, items))
+
+
+def _generate(prompt: str, response_mime_type: str | None = None) -> str:
+    """Call Gemini and return response text. Raises on API errors."""
+    config = None
+    if response_mime_type:
+        config = types.GenerateContentConfig(response_mime_type=response_mime_type)
+
+    return _holder.generate(prompt, config=config)
 
 
 def call_gemini(prompt: str) -> str:
     """Call Gemini Flash API with prompt."""
     try:
-        settings = get_settings()
-        model = settings["ai"]["model"]
+        return _generate(prompt)
+    except Exception as e:
+        print(f"Gemini API error: {e}")
+        return ""
 
-        client = get_client()
-        response = client.models.generate_content(
-            model=model,
-            contents=prompt
-        )
-        return response.text.strip()
+
+def call_gemini_json(prompt: str):
+    """Call Gemini with JSON response mode. Returns parsed JSON or None."""
+    try:
+        text = _generate(prompt, response_mime_type="application/json")
+        return json.loads(text)
     except Exception as e:
         print(f"Gemini API error: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for prompt budgeting."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def event_id(title: str, external_domains: str) -> str:
+    """Stable ID for a (title, external_domains) pair."""
+    key = f"{title}\x1f{external_domains or ''}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def _match_company(result: str, company_names: list[str]) -> str:
+    """Return the company from the list matching result (case-insensitive), or ''."""
+    result_lower = result.strip().lower()
+    for client in company_names:
+        if isinstance(client, str) and client.lower() == result_lower:
+            return client
+    return ""
+
+
+def _single_prompt(title: str, external_domains: str, company_names: list[str]) -> str:
+    """Build prompt classifying one meeting."""
+    # Build prompt with external domains as hint
+    domain_hint = ""
+    if external_domains:
+        domain_hint = f"\nExternal attendee domains: {external_domains}"
+
+    return f"""Meeting title: '{title}'{domain_hint}
+Known clients: {', '.join(company_names)}
+
+Which client is this meeting most likely about? Consider:
+- Domain names often contain client name (e.g., michelin.com -> Michelin, veronesi.it -> Veronesi)
+- Language hints in title (Italian words -> Italian clients, German words -> German clients)
+- Company name mentions or abbreviations in title
+- Context clues in the meeting title
+
+Reply with ONLY the client name from the list, or 'Unknown' if not clear.
+No explanation, just the name."""
+
+
+def classify_client(title: str, external_domains: str, company_names: list[str]) -> str | None:
+    """
+    Classify one meeting. Like detect_client_with_context, but returns None
+    when the API call fails so callers can tell failures from 'no client'.
+    """
+    if not title or not company_names:
         return ""
 
+    try:
+        result = _generate(_single_prompt(title, external_domains, company_names))
+    except Exception as e:
+        print(f"Gemini API error: {e}")
+        return None
+
+    # Validate result is in the list (case-insensitive)
+    return _match_company(result, company_names)
+
 
 def detect_client_with_context(title: str, external_domains: str, company_names: list[str]) -> str:
     """
@@ -46,35 +326,119 @@ def detect_client_with_context(title: str, external_domains: str, company_names:
     Returns:
         Client name from the list, or empty string if no match
     """
-    if not title or not company_names:
-        return ""
+    return classify_client(title, external_domains, company_names) or ""
 
-    # Build prompt with external domains as hint
-    domain_hint = ""
-    if external_domains:
-        domain_hint = f"\nExternal attendee domains: {external_domains}"
 
-    prompt = f"""Meeting title: '{title}'{domain_hint}
-Known clients: {', '.join(company_names)}
+def _batch_prompt(items: list[dict], company_names: list[str]) -> str:
+    """Build a JSON-mode prompt classifying several meetings at once."""
+    meetings = json.dumps(
+        [{"id": item["id"], "title": item["title"], "domains": item.get("external_domains") or ""} for item in items],
+        ensure_ascii=False
+    )
 
-Which client is this meeting most likely about? Consider:
+    return f"""Known clients: {', '.join(company_names)}
+
+Meetings (JSON): {meetings}
+
+For each meeting, which client is it most likely about? Consider:
 - Domain names often contain client name (e.g., michelin.com -> Michelin, veronesi.it -> Veronesi)
 - Language hints in title (Italian words -> Italian clients, German words -> German clients)
 - Company name mentions or abbreviations in title
 - Context clues in the meeting title
 
-Reply with ONLY the client name from the list, or 'Unknown' if not clear.
-No explanation, just the name."""
+Reply with a JSON array with one object per meeting: {{"id": "<meeting id>", "client": "<client name from the list or Unknown>"}}.
+Use ONLY names from the known clients list, or 'Unknown' if not clear."""
 
-    result = call_gemini(prompt)
 
-    # Validate result is in the list (case-insensitive)
-    result_lower = result.strip().lower()
-    for client in company_names:
-        if client.lower() == result_lower:
-            return client
+def _chunk_items(items: list[dict], company_names: list[str], batch_size: int, max_prompt_tokens: int) -> list[list[dict]]:
+    """Split items into batches bounded by count and estimated prompt tokens."""
+    base_tokens = estimate_tokens(_batch_prompt([], company_names))
+    chunks = []
+    current = []
+    current_tokens = base_tokens
 
-    return ""
+    for item in items:
+        item_tokens = estimate_tokens(json.dumps(item, ensure_ascii=False))
+        if current and (len(current) >= batch_size or current_tokens + item_tokens > max_prompt_tokens):
+            chunks.append(current)
+            current = []
+            current_tokens = base_tokens
+        current.append(item)
+        current_tokens += item_tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _classify_batch(items: list[dict], company_names: list[str]) -> dict[str, str]:
+    """
+    Classify one batch. Returns {id: client} for valid answers only
+    ('' for Unknown). Missing, duplicate or invalid answers are left out.
+    """
+    response = call_gemini_json(_batch_prompt(items, company_names))
+    if isinstance(response, dict):
+        # Some models wrap the array, e.g. {"results": [...]}
+        response = next((v for v in response.values() if isinstance(v, list)), None)
+    if not isinstance(response, list):
+        return {}
+
+    expected = {item["id"] for item in items}
+    results = {}
+    for answer in response:
+        if not isinstance(answer, dict):
+            continue
+        item_id = str(answer.get("id", ""))
+        client = answer.get("client")
+        if item_id not in expected or item_id in results or not isinstance(client, str):
+            continue
+        if client.strip().lower() == "unknown":
+            results[item_id] = ""
+            continue
+        matched = _match_company(client, company_names)
+        if matched:
+            results[item_id] = matched
+    return results
+
+
+def detect_clients_batch(items: list[dict], company_names: list[str]) -> dict[str, str]:
+    """
+    Classify many meetings with one structured request per batch.
+
+    Items whose batch answer is missing or not in company_names are retried
+    with single-event calls.
+
+    Args:
+        items: List of {"id", "title", "external_domains"} dicts (ids unique)
+        company_names: List of company names from project_codes.xlsx
+
+    Returns:
+        Dict of {id: client name or ''}. Items whose API call failed are
+        left out, so callers can avoid caching failures.
+    """
+    if not items or not company_names:
+        return {item["id"]: "" for item in items}
+
+    ai_settings = get_settings()["ai"]
+    batch_size = max(1, int(ai_settings.get("batch_size", 40)))
+    max_prompt_tokens = int(ai_settings.get("max_prompt_tokens", 24000))
+
+    results = {}
+    chunks = [c for c in _chunk_items(items, company_names, batch_size, max_prompt_tokens) if len(c) > 1]
+    for batch_results in run_concurrently(lambda chunk: _classify_batch(chunk, company_names), chunks):
+        results.update(batch_results)
+
+    # Fall back to single-event calls for failed/invalid items
+    pending = [item for item in items if item["id"] not in results]
+    answers = run_concurrently(
+        lambda item: classify_client(item["title"], item.get("external_domains", ""), company_names),
+        pending
+    )
+    for item, client in zip(pending, answers):
+        if client is not None:
+            results[item["id"]] = client
+
+    return results
 
 
 def detect_client_from_comment(comment: str, project_codes: list[str]) -> str:
@@ -103,4 +467,4 @@ def generate_autofill_comment(category: str, client: str, week_context: str) ->
 Reply with ONLY a short comment (5-15 words) describing typical work.
 No quotes, no explanation."""
 
-    return call_gemini(prompt) or f"{category} work"
\ No newline at end of file
+    return call_gemini(prompt) or f"{category} work"
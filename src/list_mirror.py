@@ -0,0 +1,256 @@
+"""
+Local SQLite mirror of the SharePoint time-tracker list.
+
+The mirror is kept current with Graph delta queries: the first sync pages
+through the whole list, later syncs only fetch items changed since the
+stored delta link. Status, report and upload planning can then read the
+list without calling Graph.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.config import get_settings, get_project_root
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS list_items (
+    id TEXT PRIMARY KEY,
+    week TEXT NOT NULL,
+    category TEXT NOT NULL,
+    hours REAL NOT NULL,
+    comments TEXT NOT NULL,
+    opportunity_id TEXT NOT NULL,
+    account_name TEXT NOT NULL,
+    created_by TEXT NOT NULL,
+    modified TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_list_items_week ON list_items (week);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+COLUMNS = ("id", "week", "category", "hours", "comments", "opportunity_id", "account_name", "created_by", "modified")
+
+
+def field_text(value) -> str:
+    """Stable text form of a field value (None -> '', 42.0 -> '42')."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def item_row(item: dict) -> dict:
+    """Flatten a Graph list item (with expanded fields) into a mirror row."""
+    fields = item.get("fields") or {}
+    created_by = ((item.get("createdBy") or {}).get("user") or {}).get("id")
+    return {
+        "id": str(item["id"]),
+        "week": field_text(fields.get("WeekBeginning"))[:10],
+        "category": field_text(fields.get("Category")),
+        "hours": float(fields.get("Hours") or 0),
+        "comments": field_text(fields.get("Comments")),
+        "opportunity_id": field_text(fields.get("OpportunityID")),
+        "account_name": field_text(fields.get("AccountName")),
+        "created_by": field_text(created_by),
+        "modified": field_text(item.get("lastModifiedDateTime")),
+    }
+
+
+def is_removed(item: dict) -> bool:
+    """True for delta entries that report a deleted item."""
+    return "@removed" in item or bool(item.get("deleted"))
+
+
+class ListMirror:
+    """SQLite copy of the list plus the delta link of the last sync."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def get_state(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+            self._conn.commit()
+
+    @property
+    def synced(self) -> bool:
+        """True once a sync has completed."""
+        return self.get_state("delta_link") is not None
+
+    def apply_page(self, items: list[dict]) -> tuple[int, int]:
+        """Apply one delta page; returns (upserted, deleted)."""
+        upserts = [item_row(item) for item in items if not is_removed(item)]
+        deletes = [(str(item["id"]),) for item in items if is_removed(item)]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO list_items ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                [tuple(row[c] for c in COLUMNS) for row in upserts]
+            )
+            self._conn.executemany("DELETE FROM list_items WHERE id = ?", deletes)
+            self._conn.commit()
+        return len(upserts), len(deletes)
+
+    def remove(self, item_id: str) -> None:
+        self.apply_page([{"id": item_id, "@removed": {"reason": "deleted"}}])
+
+    def reset(self) -> None:
+        """Drop all items and the delta link (next sync is a full sync)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM list_items")
+            self._conn.execute("DELETE FROM sync_state WHERE key = 'delta_link'")
+            self._conn.commit()
+
+    def items(self, weeks: list[str] | None = None, owner: str | None = None) -> list[dict]:
+        """Return mirrored items, optionally only of some weeks and one creator."""
+        query = f"SELECT {', '.join(COLUMNS)} FROM list_items WHERE 1 = 1"
+        params = []
+        if weeks is not None:
+            query += f" AND week IN ({', '.join('?' for _ in weeks)})"
+            params.extend(weeks)
+        if owner is not None:
+            query += " AND created_by = ?"
+            params.append(owner)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY week, id", params).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def week_summary(self, owner: str | None = None) -> dict[str, dict]:
+        """Return {week: {'items': n, 'hours': h}} from the mirror."""
+        summary = {}
+        for item in self.items(owner=owner):
+            week = summary.setdefault(item["week"], {"items": 0, "hours": 0.0})
+            week["items"] += 1
+            week["hours"] += item["hours"]
+        return summary
+
+    def time_entries(self, owner: str | None = None) -> list[dict]:
+        """Mirrored items as preview-style rows (week_beginning, category, hours, ...)."""
+        from src.sharepoint import CATEGORY_MAP
+
+        categories = {sp: ours for ours, sp in CATEGORY_MAP.items()}
+        return [
+            {
+                "week_beginning": item["week"],
+                "category": categories.get(item["category"], item["category"]),
+                "hours": item["hours"],
+                "client": item["account_name"],
+                "opportunity_id": item["opportunity_id"],
+                "comments": item["comments"],
+            }
+            for item in self.items(owner=owner)
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def resolve_owner(mirror: "ListMirror", uploader) -> str:
+    """
+    Graph id of the signed-in user (stored in the mirror after the first call).
+
+    Raises:
+        RuntimeError: If /me fails or returns no id - without an owner every
+            user's items on the shared list would look like ours
+    """
+    from src.sharepoint import get_graph_me_url
+
+    owner = mirror.get_state("owner")
+    if owner:
+        return owner
+
+    response = uploader.scheduler.execute(lambda: uploader.session.get(get_graph_me_url()))
+    owner = field_text(response.json().get("id")) if response.status_code == 200 else ""
+    if not owner:
+        raise RuntimeError(f"Could not determine the signed-in user ({response.status_code}): {response.text}")
+    mirror.set_state("owner", owner)
+    return owner
+
+
+def sync_mirror(mirror: "ListMirror", uploader, full: bool = False) -> dict:
+    """
+    Bring the mirror up to date with Graph delta queries.
+
+    Delta pages are linked (each page names the next one), so they are
+    fetched in order and written to SQLite page by page; the delta link is
+    only stored after the last page. An expired delta link (410) falls back
+    to a full sync.
+
+    Args:
+        mirror: Target mirror
+        uploader: sharepoint.Uploader providing the session and throttling
+        full: Ignore the stored delta link and re-read the whole list
+
+    Returns:
+        dict with 'pages', 'upserted', 'deleted' and 'full'
+
+    Raises:
+        RuntimeError: If the signed-in user cannot be determined (see resolve_owner)
+    """
+    resolve_owner(mirror, uploader)
+
+    url = None if full else mirror.get_state("delta_link")
+    if url is None:
+        mirror.reset()
+        full = True
+        url = f"{uploader.url}/delta?$expand=fields"
+
+    stats = {"pages": 0, "upserted": 0, "deleted": 0, "full": full}
+    started = time.time()
+    while url:
+        response = uploader.scheduler.execute(lambda: uploader.session.get(url))
+        if response.status_code == 410 and not full:
+            return sync_mirror(mirror, uploader, full=True)
+        if response.status_code != 200:
+            raise RuntimeError(f"Delta sync failed ({response.status_code}): {response.text}")
+
+        page = response.json()
+        upserted, deleted = mirror.apply_page(page.get("value", []))
+        stats["pages"] += 1
+        stats["upserted"] += upserted
+        stats["deleted"] += deleted
+
+        url = page.get("@odata.nextLink")
+        if url is None and page.get("@odata.deltaLink"):
+            mirror.set_state("delta_link", page["@odata.deltaLink"])
+            mirror.set_state("synced_at", str(started))
+
+    return stats
+
+
+_mirror = {"instance": None, "path": None}
+
+
+def get_mirror_path() -> Path:
+    """Mirror location from config (relative paths are resolved against the project root)."""
+    path = Path(get_settings()["paths"].get("list_mirror", "data/output/list_mirror.sqlite"))
+    if not path.is_absolute():
+        path = get_project_root() / path
+    return path
+
+
+def get_list_mirror() -> ListMirror:
+    """Return process-wide list mirror."""
+    path = get_mirror_path()
+    if _mirror["instance"] is None or _mirror["path"] != path:
+        _mirror["instance"] = ListMirror(path)
+        _mirror["path"] = path
+    return _mirror["instance"]
@@ -1,12 +1,23 @@
 """
 Calendar JSON loader.
+
+The export is read incrementally: events are decoded one at a time from
+the "events" array and filtered (date window, excluded categories) while
+parsing, so memory scales with the selected window rather than the file.
+Gzipped exports (.json.gz) are detected and read transparently. Kept
+events are converted to compact Event objects (see src/events.py).
 """
 
+import gzip
+import io
 import json
+import re
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import TypedDict
+from typing import Iterator, TypedDict
 
 from src.config import get_settings, get_excluded
+from src.events import Event, as_event, parse_minutes
 
 class CalendarEvent(TypedDict):
     start: str
@@ -21,19 +32,152 @@ class CalendarEvent(TypedDict):
     busy_status: int
 
 
-def load_calendar(path: str | Path | None = None) -> list[CalendarEvent]:
-    """Load calendar events from JSON export."""
+# Characters read per refill of the parse buffer
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _JsonStream:
+    """Minimal pull parser over a text stream, decoding one value at a time."""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> None:
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character ('' at end of input)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Invalid calendar export: expected '{char}', found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            if end == len(self.buf) and not self.eof:
+                # A number may continue in the next chunk
+                self._fill()
+                continue
+            self.pos = end
+            return obj
+
+    def iter_array(self) -> Iterator:
+        """Yield the items of the array at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+
+def _open_text(path: Path):
+    """Open export as text; gzip is detected by its magic bytes."""
+    with open(path, "rb") as f:
+        compressed = f.read(2) == b"\x1f\x8b"
+    raw = gzip.open(path, "rb") if compressed else open(path, "rb")
+    return io.TextIOWrapper(raw, encoding="utf-8-sig")
+
+
+def _iter_export_events(path: Path) -> Iterator[CalendarEvent]:
+    """Yield the raw events of an export without loading the whole file."""
+    with _open_text(path) as f:
+        stream = _JsonStream(f)
+        stream.expect("{")
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key == "events":
+                yield from stream.iter_array()
+            else:
+                stream.value()
+            if stream.peek() == ",":
+                stream.pos += 1
+
+
+def week_cutoff(weeks_back: int) -> str:
+    """
+    First start date (YYYY-MM-DD) inside a weeks_back window.
+
+    Events are kept when midnight of their start day is not before
+    now - weeks_back, so the cutoff day is the next day unless that
+    moment is exactly midnight.
+    """
+    cutoff = datetime.now() - timedelta(weeks=weeks_back)
+    day = cutoff.date()
+    if cutoff.time() != datetime.min.time():
+        day += timedelta(days=1)
+    return day.isoformat()
+
+
+def iter_events(path: str | Path | None = None, weeks_back: int | None = None, since: str | None = None,
+                exclude: bool = False) -> Iterator[Event]:
+    """Yield calendar events from the JSON export, filtering while parsing.
+
+    Args:
+        path: Path to calendar JSON (or .json.gz) file
+        weeks_back: If specified, only events of the last N weeks
+        since: If specified, only events starting on or after this date (YYYY-MM-DD)
+        exclude: Drop events with excluded categories
+    """
     if path is None:
         settings = get_settings()
         path = Path(settings["paths"]["calendar_input"])
 
-    with open(path, "r", encoding="utf-8-sig") as f:
-        data = json.load(f)
+    # Start dates are ISO strings, so the window is a plain string compare
+    cutoff = since or ""
+    if weeks_back is not None:
+        cutoff = max(cutoff, week_cutoff(weeks_back))
+
+    excluded_cats = {c.upper() for c in get_excluded()["categories"]} if exclude else set()
+
+    for event in _iter_export_events(Path(path)):
+        if cutoff and event["start"][:10] < cutoff:
+            continue
+        if excluded_cats and event["category"].upper() in excluded_cats:
+            continue
+        yield Event.from_dict(event)
+
 
-    return data["events"]
+def load_calendar(path: str | Path | None = None) -> list[Event]:
+    """Load calendar events from JSON export."""
+    return list(iter_events(path))
 
 
-def filter_excluded(events: list[CalendarEvent]) -> list[CalendarEvent]:
+def filter_excluded(events: list[Event]) -> list[Event]:
     """Remove events with excluded categories."""
     excluded = get_excluded()
     excluded_cats = {c.upper() for c in excluded["categories"]}
@@ -41,24 +185,19 @@ def filter_excluded(events: list[CalendarEvent]) -> list[CalendarEvent]:
     return [e for e in events if e["category"].upper() not in excluded_cats]
 
 
-def filter_by_weeks(events: list[CalendarEvent], weeks_back: int) -> list[CalendarEvent]:
+def filter_by_weeks(events: list[Event], weeks_back: int) -> list[Event]:
     """Filter events to last N weeks."""
-    from datetime import datetime, timedelta
-    cutoff = datetime.now() - timedelta(weeks=weeks_back)
-    return [e for e in events if datetime.strptime(e['start'][:10], '%Y-%m-%d') >= cutoff]
+    cutoff = parse_minutes(week_cutoff(weeks_back))
+    return [e for e in events if as_event(e).start_min >= cutoff]
 
 
-def load_and_filter(path: str | Path | None = None, weeks_back: int | None = None) -> list[CalendarEvent]:
+def load_and_filter(path: str | Path | None = None, weeks_back: int | None = None,
+                    since: str | None = None) -> list[Event]:
     """Load calendar and filter excluded categories.
 
     Args:
         path: Path to calendar JSON file
         weeks_back: If specified, filter to last N weeks
+        since: If specified, only events starting on or after this date (YYYY-MM-DD)
     """
-    events = load_calendar(path)
-    events = filter_excluded(events)
-
-    if weeks_back is not None:
-        events = filter_by_weeks(events, weeks_back)
-
-    return events
+    return list(iter_events(path, weeks_back=weeks_back, since=since, exclude=True))
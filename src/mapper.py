@@ -6,7 +6,7 @@ Client detection uses Gemini AI with fallback to simple keyword matching.
 """
 
 from src.config import get_category_mapping
-from src.text_utils import normalize_text
+from src.text_utils import normalize_text, PatternAutomaton
 
 
 def map_category(outlook_category: str) -> str | None:
@@ -15,6 +15,66 @@ def map_category(outlook_category: str) -> str | None:
     return mapping.get(outlook_category.upper())
 
 
+class ClientMatcher:
+    """
+    Compiled keyword matcher over company names.
+
+    Patterns are the normalized full name of each company plus its
+    significant words (>3 chars). When several companies match a title,
+    the one listed first wins - same precedence as the original nested loop.
+    """
+
+    def __init__(self, company_names: list[str]):
+        self.company_names = tuple(company_names)
+        self._automaton = PatternAutomaton()
+
+        for idx, company in enumerate(self.company_names):
+            if not isinstance(company, str):
+                continue
+            company_normalized = normalize_text(company)
+            self._automaton.add(company_normalized, idx)
+            for word in company_normalized.split():
+                if len(word) > 3:
+                    self._automaton.add(word, idx)
+
+        self._automaton.build()
+
+    def candidates(self, title: str) -> list[str]:
+        """Return all companies matching title, in precedence order."""
+        found = self._automaton.search(normalize_text(title))
+        return [self.company_names[idx] for idx in sorted(found)]
+
+    def match(self, title: str) -> str | None:
+        """Return the highest-precedence company matching title."""
+        found = self._automaton.search(normalize_text(title))
+        if not found:
+            return None
+        return self.company_names[min(found)]
+
+
+_matcher_cache = {"names": None, "matcher": None}
+_company_names_cache = {"df": None, "names": None}
+
+
+def get_client_matcher(company_names: list[str]) -> ClientMatcher:
+    """Return compiled matcher for company_names, rebuilding only on change."""
+    cached = _matcher_cache["names"]
+    if cached is not company_names and (
+        cached is None or len(cached) != len(company_names) or tuple(cached) != tuple(company_names)
+    ):
+        _matcher_cache["matcher"] = ClientMatcher(company_names)
+    _matcher_cache["names"] = company_names
+    return _matcher_cache["matcher"]
+
+
+def get_company_names(project_codes_df) -> list[str]:
+    """Return unique company names, computed once per project codes frame."""
+    if _company_names_cache["df"] is not project_codes_df:
+        _company_names_cache["names"] = project_codes_df["company"].unique().tolist()
+        _company_names_cache["df"] = project_codes_df
+    return _company_names_cache["names"]
+
+
 def extract_client_from_title_keywords(title: str, company_names: list[str]) -> str | None:
     """
     Extract client name from event title using simple keyword matching.
@@ -27,19 +87,7 @@ def extract_client_from_title_keywords(title: str, company_names: list[str]) ->
     Returns:
         Matched company name or None
     """
-    title_normalized = normalize_text(title)
-
-    for company in company_names:
-        company_normalized = normalize_text(company)
-        # Check if company name (or significant part) appears in title
-        if company_normalized in title_normalized:
-            return company
-        # Also check individual words for partial matches (e.g., "Wurth" in "Wurthindustry")
-        for word in company_normalized.split():
-            if len(word) > 3 and word in title_normalized:
-                return company
-
-    return None
+    return get_client_matcher(company_names).match(title)
 
 
 def detect_client(event: dict, use_ai: bool = True) -> str | None:
@@ -56,45 +104,123 @@ def detect_client(event: dict, use_ai: bool = True) -> str | None:
     Returns:
         Client name or None
     """
-    from src.gemini_client import detect_client_with_context
-    from src.project_codes import load_project_codes
+    return detect_clients([event], use_ai=use_ai)[0]
+
+
+def resolve_ai_clients(pairs: list[tuple[str, str]], company_names: list[str]) -> dict[tuple[str, str], str]:
+    """
+    Ask Gemini for the client of each (title, external_domains) pair.
+
+    Answers are looked up in / stored to the persistent detection cache;
+    only cache misses are sent to Gemini (in batches).
+
+    Returns:
+        Dict of {(title, external_domains): client or ''}. Pairs whose API
+        call failed are left out.
+    """
+    from src.gemini_client import detect_clients_batch, event_id
+    from src.ai_cache import get_detection_cache, cache_key
     from src.config import get_settings
 
-    title = event.get("title", "")
-    external_domains = event.get("external_domains", "")
+    model = get_settings()["ai"]["model"]
+    pairs = list(dict.fromkeys(pairs))
+    keys = {pair: cache_key(pair[0], pair[1], model) for pair in pairs}
+
+    cache = get_detection_cache()
+    cached = cache.get_many(list(keys.values()), company_names) if cache else {}
+
+    results = {}
+    items = {}
+    for pair in pairs:
+        if keys[pair] in cached:
+            results[pair] = cached[keys[pair]]
+        else:
+            item_id = event_id(*pair)
+            items[item_id] = (pair, {"id": item_id, "title": pair[0], "external_domains": pair[1]})
+
+    if items:
+        answers = detect_clients_batch([item for _, item in items.values()], company_names)
+        fresh = {}
+        for item_id, client in answers.items():
+            pair = items[item_id][0]
+            results[pair] = client
+            fresh[keys[pair]] = client
+        if cache:
+            cache.put_many(fresh, company_names)
+
+    return results
 
-    if not title:
-        return None
+
+def detect_clients(events: list[dict], use_ai: bool = True, project_codes_df=None) -> list[str | None]:
+    """
+    Detect clients for many events at once (batched AI + keyword fallback).
+
+    Same rules as detect_client, but AI classification is done in batches:
+    identical (title, external_domains) pairs are classified once, cached
+    answers are reused and many pairs share one structured request.
+
+    Args:
+        events: Calendar events with title and external_domains
+        use_ai: If True, try Gemini AI first. If False, use keyword matching only.
+        project_codes_df: Already loaded project codes (default: load_project_codes())
+
+    Returns:
+        List of client names (or None), aligned with events
+    """
+    from src.project_codes import load_project_codes
+    from src.config import get_settings
+
+    results = [None] * len(events)
+    pairs = [(event.get("title", ""), event.get("external_domains", "") or "") for event in events]
 
     try:
         # Load project codes and extract company names
-        project_codes_df = load_project_codes()
-        company_names = project_codes_df["company"].unique().tolist()
+        if project_codes_df is None:
+            project_codes_df = load_project_codes()
+        company_names = get_company_names(project_codes_df)
 
         if not company_names:
-            return None
+            return results
 
         # Check if AI is enabled in config and requested
         settings = get_settings()
         ai_enabled = settings["ai"]["enabled"] and use_ai
 
         # Try Gemini AI first if enabled (with external_domains as hint)
+        ai_clients = {}
         if ai_enabled:
+            # Known single-client domains resolve without any AI call
+            from src.domain_index import get_domain_index
+
+            domain_index = get_domain_index()
+            if domain_index is not None:
+                for pair in dict.fromkeys(pairs):
+                    if pair[0] and pair[1]:
+                        domain_client = domain_index.resolve(pair[1], company_names)
+                        if domain_client:
+                            ai_clients[pair] = domain_client
+
             try:
-                ai_client = detect_client_with_context(title, external_domains, company_names)
-                if ai_client:
-                    return ai_client
+                ai_clients.update(resolve_ai_clients(
+                    [p for p in pairs if p[0] and p not in ai_clients], company_names
+                ))
             except Exception:
                 # Gemini not available, fall through to keyword matching
                 pass
 
-        # Fallback to simple keyword matching from company names
-        keyword_client = extract_client_from_title_keywords(title, company_names)
-        if keyword_client:
-            return keyword_client
+        matcher = get_client_matcher(company_names)
+        for i, pair in enumerate(pairs):
+            if not pair[0]:
+                continue
+            ai_client = ai_clients.get(pair)
+            if ai_client:
+                results[i] = ai_client
+                continue
+            # Fallback to simple keyword matching from company names
+            results[i] = matcher.match(pair[0])
 
     except Exception:
         # Silently fail if project codes cannot be loaded
         pass
 
-    return None
\ No newline at end of file
+    return results
@@ -2,9 +2,12 @@
 Handle overlapping calendar events - select highest priority per time slot.
 """
 
-from datetime import datetime, timedelta
+import heapq
+from datetime import datetime
 from collections import defaultdict
 
+from src.events import as_event
+
 CATEGORY_PRIORITY = {
     "Customer - Demo/ Presentation": 100,
     "Discovery": 90,
@@ -28,42 +31,71 @@ def get_priority(category: str) -> int:
     return CATEGORY_PRIORITY.get(category, 0)
 
 
-def resolve_overlaps_by_hour(events: list, get_category_func) -> list:
+def resolve_overlaps(events: list, get_category_func, granularity: int = 60) -> list:
     """
-    For each hour slot, keep only the highest priority event.
-    Adjusts event minutes based on hours won.
+    For each time slot, keep only the highest priority event.
+    Adjusts event minutes based on slots won.
+
+    Sweep line over sorted interval endpoints with a priority heap, so cost
+    is O(n log n) regardless of event length. Each event is widened to whole
+    slots of `granularity` minutes (60 = legacy per-hour behaviour, 15 or 1
+    for finer allocation). Ties go to the earlier event.
     """
-    hour_map = defaultdict(list)
-    
+    if granularity < 1:
+        raise ValueError("granularity must be at least 1 minute")
+
+    events = [as_event(e) for e in events]
+
+    # (slot, kind, idx): kind 0 = end, 1 = start, so ends are processed first
+    boundaries = []
+    priorities = {}
     for idx, event in enumerate(events):
         sp_category = get_category_func(event)
         if not sp_category:
             continue
-            
-        priority = get_priority(sp_category)
-        start = parse_datetime(event["start"])
-        end = parse_datetime(event["end"])
-        
-        current = start.replace(minute=0, second=0)
-        while current < end:
-            hour_key = (current.date(), current.hour)
-            hour_map[hour_key].append((idx, priority, sp_category))
-            current += timedelta(hours=1)
-    
-    selected_hours = defaultdict(int)
-    
-    for hour_key, candidates in hour_map.items():
-        if candidates:
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            winner_idx = candidates[0][0]
-            selected_hours[winner_idx] += 1
-    
+        start = event.start_min // granularity
+        end = -(-event.end_min // granularity)
+        if end > start:
+            priorities[idx] = get_priority(sp_category)
+            boundaries.append((start, 1, idx))
+            boundaries.append((end, 0, idx))
+    boundaries.sort()
+
+    won_slots = defaultdict(int)
+    active = []
+    ended = set()
+    previous = None
+    for slot, kind, idx in boundaries:
+        # Drop finished events from the top of the heap (lazy deletion)
+        while active and active[0][1] in ended:
+            heapq.heappop(active)
+        if active and slot > previous:
+            won_slots[active[0][1]] += slot - previous
+        previous = slot
+
+        if kind == 1:
+            heapq.heappush(active, (-priorities[idx], idx))
+        else:
+            ended.add(idx)
+
     result = []
     for idx, event in enumerate(events):
-        won_hours = selected_hours.get(idx, 0)
-        if won_hours > 0:
-            new_event = event.copy()
-            new_event["minutes"] = won_hours * 60
-            result.append(new_event)
-    
-    return result
\ No newline at end of file
+        slots = won_slots.get(idx, 0)
+        if slots > 0:
+            result.append(event.replace(minutes=slots * granularity))
+
+    return result
+
+
+def resolve_overlaps_by_hour(events: list, get_category_func) -> list:
+    """
+    For each hour slot, keep only the highest priority event.
+    Adjusts event minutes based on hours won.
+    """
+    return resolve_overlaps(events, get_category_func, granularity=60)
+
+
+def get_overlap_granularity() -> int:
+    """Slot size in minutes for overlap resolution (from config)."""
+    from src.config import get_settings
+    return int(get_settings()["processing"].get("overlap_granularity_minutes", 60))
@@ -0,0 +1,159 @@
+"""
+Shared inputs of one preview run.
+
+A PipelineContext is created once per run (see generate_final_preview) and
+passed to every stage, so the calendar export, config and project codes
+are read and parsed exactly once.
+
+It also fingerprints the input of every week (the events its rows depend
+on plus config and project codes), so an incremental run only recomputes
+weeks whose input changed.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from pathlib import Path
+
+from src.config import get_settings, get_category_mapping, get_excluded
+from src.events import MINUTES_PER_DAY, week_key, weekday
+
+# Bump when preview logic changes so stored week fingerprints no longer match
+PIPELINE_VERSION = 2
+
+# Settings sections that do not influence preview rows
+_NON_PREVIEW_SETTINGS = {"sharepoint"}
+
+
+def event_weeks(event) -> list[str]:
+    """Weeks (Sunday keys) whose time range the event touches."""
+    first = event.start_min // MINUTES_PER_DAY
+    last = max(event.end_min - 1, event.start_min) // MINUTES_PER_DAY
+    sunday = first - (weekday(first) + 1) % 7
+    return [week_key(day) for day in range(sunday, last + 1, 7)]
+
+
+class PipelineContext:
+    """
+    Lazily loaded inputs shared by preview, aggregation and gap filling.
+
+    Args:
+        weeks_back: If specified, only events of the last N weeks
+        use_ai: Allow Gemini calls (still requires ai.enabled in settings)
+        calendar_path: Calendar export (default: paths.calendar_input)
+    """
+
+    def __init__(self, weeks_back: int | None = None, use_ai: bool = True, calendar_path: str | Path | None = None):
+        self.settings = get_settings()
+        self.category_mapping = get_category_mapping()
+        self.weeks_back = weeks_back
+        self.use_ai = bool(use_ai and self.settings["ai"]["enabled"])
+        self.calendar_path = calendar_path
+        self._events = None
+        self._project_codes = None
+        self._events_by_week = None
+        self._event_order = None
+        self._input_weeks = {}
+
+    @property
+    def events(self) -> list:
+        """Calendar events in the weeks_back window, excluded categories removed."""
+        if self._events is None:
+            from src.loader import load_and_filter
+            self._events = load_and_filter(self.calendar_path, weeks_back=self.weeks_back)
+        return self._events
+
+    @property
+    def project_codes(self):
+        """Normalized project codes DataFrame (shared; copy before mutating)."""
+        if self._project_codes is None:
+            from src.project_codes import load_project_codes
+            self._project_codes = load_project_codes()
+        return self._project_codes
+
+    @property
+    def opportunity_index(self):
+        from src.project_codes import get_opportunity_index
+        return get_opportunity_index(self.project_codes)
+
+    @property
+    def company_names(self) -> list[str]:
+        from src.mapper import get_company_names
+        return get_company_names(self.project_codes)
+
+    @property
+    def events_by_week(self) -> dict[str, list]:
+        """Events per week they touch (an event crossing midnight on Saturday is in both weeks)."""
+        if self._events_by_week is None:
+            by_week = defaultdict(list)
+            order = {}
+            for i, event in enumerate(self.events):
+                order[id(event)] = i
+                for week in event_weeks(event):
+                    by_week[week].append(event)
+            self._events_by_week = dict(by_week)
+            self._event_order = order
+        return self._events_by_week
+
+    def input_weeks(self, week: str) -> list[str]:
+        """
+        Weeks whose events can change the rows of week: the week itself plus
+        the weeks its own events (those starting in it) reach into, since
+        overlaps there decide how many minutes those events keep.
+        """
+        weeks = self._input_weeks.get(week)
+        if weeks is None:
+            reach = {week}
+            for event in self.events_by_week.get(week, ()):
+                if event.week == week:
+                    reach.update(event_weeks(event))
+            weeks = self._input_weeks[week] = sorted(reach)
+        return weeks
+
+    def events_for_weeks(self, weeks) -> list:
+        """Events the rows of weeks depend on (see input_weeks), in export order."""
+        by_week = self.events_by_week
+        found = {}
+        for week in set(weeks):
+            for input_week in self.input_weeks(week):
+                for event in by_week.get(input_week, ()):
+                    found[id(event)] = event
+        return [found[key] for key in sorted(found, key=self._event_order.__getitem__)]
+
+    def input_version(self, *extra) -> str:
+        """Hash of everything besides events that preview rows depend on."""
+        from pandas.util import hash_pandas_object
+
+        settings = {k: v for k, v in self.settings.items() if k not in _NON_PREVIEW_SETTINGS}
+        config = json.dumps([settings, self.category_mapping, get_excluded()], sort_keys=True, default=str)
+        codes = int(hash_pandas_object(self.project_codes, index=False).sum())
+        digest = hashlib.sha256(f"{PIPELINE_VERSION}|{config}|{codes}|{self.use_ai}|{extra}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def week_fingerprints(self, *extra) -> dict[str, str]:
+        """
+        Fingerprint of each week's input.
+
+        Args:
+            extra: Run options that change the rows (e.g. gap filling on/off)
+
+        Returns:
+            {week: sha256 of input version + the events the week's rows
+            depend on (events_for_weeks), the same set a per-week run computes from}
+        """
+        version = self.input_version(*extra)
+        event_hashes = {}
+        fingerprints = {}
+        for week in sorted(self.events_by_week):
+            digest = hashlib.sha256(version.encode("utf-8"))
+            for event in self.events_for_weeks([week]):
+                event_hash = event_hashes.get(id(event))
+                if event_hash is None:
+                    event_hash = event_hashes[id(event)] = hashlib.sha256(repr(event.astuple()).encode("utf-8")).digest()
+                digest.update(event_hash)
+            fingerprints[week] = digest.hexdigest()
+        return fingerprints
+
+    def dirty_weeks(self, fingerprints: dict[str, str], stored: dict[str, str]) -> set[str]:
+        """Weeks to recompute: those whose fingerprint changed (or is new)."""
+        return {week for week, fingerprint in fingerprints.items() if stored.get(week) != fingerprint}
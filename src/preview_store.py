@@ -0,0 +1,252 @@
+"""
+Binary sidecar snapshot of the Excel preview.
+
+generate_final_preview writes the preview workbook plus a pickled snapshot
+next to it (time_entries_preview.snapshot.pkl) holding the content hash of
+the workbook, its cells exactly as the pandas Excel reader sees them, and
+the parsed frame. upload and report read the preview through
+load_preview, status through the pandas-free load_preview_rows: while the
+hash matches the snapshot is used as is; after the workbook was edited it
+is parsed once more and the snapshot is refreshed.
+
+The snapshot also keeps the input fingerprint of every week, which the
+incremental preview uses to decide which weeks to recompute.
+
+pandas is only imported where a DataFrame is built, so status can run
+without it.
+"""
+
+import math
+import pickle
+from pathlib import Path
+
+from src.config import get_settings, file_hash, read_snapshot, write_snapshot
+
+SNAPSHOT_FORMAT = 2
+
+# Columns readers need from the preview (others, e.g. added by hand, are ignored)
+PREVIEW_COLUMNS = (
+    "week_beginning",
+    "category",
+    "client",
+    "hours",
+    "opportunity_id",
+    "comments",
+    "external_domains",
+    "needs_review",
+    "is_autofilled",
+    "status",
+)
+
+stats = {"snapshot_hits": 0, "workbook_reads": 0}
+
+
+def get_preview_path() -> Path:
+    """Configured path of the Excel preview."""
+    return Path(get_settings()["paths"]["excel_preview"])
+
+
+def get_snapshot_path(preview_path: str | Path) -> Path:
+    """Sidecar location: <preview stem>.snapshot.pkl in the same directory."""
+    preview_path = Path(preview_path)
+    return preview_path.with_name(f"{preview_path.stem}.snapshot.pkl")
+
+
+def _excel_value(value):
+    """Cell value as pandas reads it back (empty -> '', integral float -> int)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _frame_cells(df) -> list[list]:
+    """Header + rows of the workbook write_excel_with_formatting(df) produces, as read back."""
+    columns = [str(c) for c in df.columns]
+    values = df.astype(object).values.tolist()
+    return [columns] + [[_excel_value(v) for v in row] for row in values]
+
+
+def _parse_cells(cells: list[list]):
+    """DataFrame from cells with the type inference of pd.read_excel (TextParser)."""
+    import pandas as pd
+    from pandas.io.parsers import TextParser
+
+    if not cells:
+        return pd.DataFrame()
+    return TextParser(cells, header=0, skip_blank_lines=False).read()
+
+
+def as_read_back(df):
+    """
+    Frame as pd.read_excel returns it after write_excel_with_formatting(df).
+
+    Cells are converted the way the openpyxl reader of pandas converts them
+    and then go through the same type inference (TextParser), so readers see
+    identical data whether they hit the snapshot or the workbook.
+    """
+    return _parse_cells(_frame_cells(df))
+
+
+def read_workbook_cells(preview_path: str | Path) -> list[list]:
+    """
+    Parse the workbook itself (read-only, preview columns only).
+
+    Cells are converted like the pandas openpyxl reader does (empty -> '',
+    errors -> NaN, integral numbers -> int); trailing empty rows are dropped.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    def convert(cell):
+        if cell.value is None:
+            return ""
+        if cell.data_type == TYPE_ERROR:
+            return math.nan
+        if cell.data_type == TYPE_NUMERIC:
+            number = int(cell.value)
+            return number if number == cell.value else float(cell.value)
+        return cell.value
+
+    wb = load_workbook(preview_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        ws.reset_dimensions()
+        rows = ws.iter_rows()
+        header = next(rows, ())
+        keep = [i for i, cell in enumerate(header) if cell.value in PREVIEW_COLUMNS]
+
+        cells = [[header[i].value for i in keep]]
+        for row in rows:
+            cells.append([convert(row[i]) if i < len(row) else "" for i in keep])
+    finally:
+        wb.close()
+
+    while len(cells) > 1 and all(v == "" for v in cells[-1]):
+        cells.pop()
+    return cells
+
+
+def read_preview_workbook(preview_path: str | Path):
+    """Parse the workbook into a DataFrame as pd.read_excel does (preview columns only)."""
+    return _parse_cells(read_workbook_cells(preview_path))
+
+
+def _write_snapshot(snapshot_path: Path, content_hash: str, cells: list[list], frame, weeks: dict) -> None:
+    """
+    Store the snapshot. The frame is pickled separately (None = parse cells
+    on next load_preview), so reading the cells never imports pandas.
+    """
+    write_snapshot(snapshot_path, {
+        "format": SNAPSHOT_FORMAT,
+        "content_hash": content_hash,
+        "cells": cells,
+        "frame": pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL) if frame is not None else None,
+        "weeks": weeks,
+    })
+
+
+def save_preview_snapshot(df, preview_path: str | Path, week_fingerprints: dict | None = None) -> None:
+    """Write the sidecar for a workbook just written from df.
+
+    Args:
+        df: Frame the workbook was written from
+        preview_path: The workbook
+        week_fingerprints: {week: input fingerprint} of the run (see PipelineContext.week_fingerprints)
+    """
+    preview_path = Path(preview_path)
+    cells = _frame_cells(df)
+    _write_snapshot(get_snapshot_path(preview_path), file_hash(preview_path), cells, _parse_cells(cells),
+                    dict(week_fingerprints or {}))
+
+
+def load_week_fingerprints(preview_path: str | Path) -> dict[str, str]:
+    """Week fingerprints stored with the preview ({} without a usable snapshot)."""
+    snapshot = read_snapshot(get_snapshot_path(preview_path), SNAPSHOT_FORMAT)
+    return dict(snapshot.get("weeks") or {}) if snapshot is not None else {}
+
+
+def _current_snapshot(preview_path: Path, with_frame: bool = False) -> tuple[dict, object]:
+    """
+    Snapshot matching the workbook; the workbook is re-parsed and the
+    snapshot rewritten (once) if needed.
+
+    Args:
+        preview_path: The workbook
+        with_frame: Also return the parsed DataFrame (imports pandas)
+
+    Returns:
+        (snapshot, frame) - frame is None unless with_frame
+    """
+    snapshot_path = get_snapshot_path(preview_path)
+    content_hash = file_hash(preview_path)
+
+    snapshot = read_snapshot(snapshot_path, SNAPSHOT_FORMAT)
+    if snapshot is not None and snapshot["content_hash"] == content_hash:
+        stats["snapshot_hits"] += 1
+        if not with_frame:
+            return snapshot, None
+        if snapshot["frame"] is not None:
+            return snapshot, pickle.loads(snapshot["frame"])
+        # Written by a pandas-free reader - add the frame
+        cells = snapshot["cells"]
+    else:
+        # Edited by hand (or no sidecar yet) - parse once and refresh the sidecar
+        stats["workbook_reads"] += 1
+        cells = read_workbook_cells(preview_path)
+
+    weeks = snapshot.get("weeks", {}) if snapshot is not None else {}
+    frame = _parse_cells(cells) if with_frame else None
+    _write_snapshot(snapshot_path, content_hash, cells, frame, weeks)
+    return {"content_hash": content_hash, "cells": cells, "weeks": weeks}, frame
+
+
+def load_preview(preview_path: str | Path | None = None):
+    """
+    Load the Excel preview, from the sidecar when it matches the workbook.
+
+    Args:
+        preview_path: Preview workbook (default: paths.excel_preview)
+
+    Returns:
+        DataFrame as returned by pd.read_excel (preview columns only)
+    """
+    preview_path = Path(preview_path) if preview_path is not None else get_preview_path()
+    _, frame = _current_snapshot(preview_path, with_frame=True)
+    return frame[[c for c in frame.columns if c in PREVIEW_COLUMNS]].copy()
+
+
+def load_preview_rows(preview_path: str | Path | None = None) -> list[dict]:
+    """
+    Preview rows as plain dicts, without pandas.
+
+    Values are the workbook cells (empty cells -> None), not type-inferred
+    like load_preview - enough for status and fingerprints.
+    """
+    preview_path = Path(preview_path) if preview_path is not None else get_preview_path()
+    snapshot, _ = _current_snapshot(preview_path)
+    header, *rows = snapshot["cells"] or [[]]
+    columns = [(i, name) for i, name in enumerate(header) if name in PREVIEW_COLUMNS]
+    return [{name: (row[i] if row[i] != "" else None) for i, name in columns} for row in rows]
+
+
+def to_preview_rows(frame):
+    """
+    Read-back preview rows in the form the pipeline produces them.
+
+    Empty text cells become '' (not NaN), opportunity IDs read as numbers
+    become text again, flags become bool and hours float.
+    """
+    import pandas as pd
+    from src.list_mirror import field_text
+
+    rows = frame.copy()
+    for column in rows.columns:
+        if column == "hours":
+            rows[column] = rows[column].fillna(0).astype(float)
+        elif column in ("needs_review", "is_autofilled"):
+            rows[column] = rows[column].fillna(False).astype(bool)
+        else:
+            rows[column] = [field_text(v) if not pd.isna(v) else "" for v in rows[column].astype(object)]
+    return rows
@@ -1,18 +1,34 @@
 """
 Load and match project codes (Opportunity IDs).
+
+The workbook is read through ProjectCodesRepository, which parses it once
+per process and keeps a pickled snapshot under the cache directory so that
+warm runs skip openpyxl parsing entirely.
 """
 
+import hashlib
+import threading
+
 import pandas as pd
 from pathlib import Path
-from src.config import get_settings
+from src.config import get_settings, get_project_root, file_hash, read_snapshot, write_snapshot
+from src.text_utils import PatternAutomaton
 
-def load_project_codes(path: str | Path | None = None) -> pd.DataFrame:
-    """Load project codes from Excel - supports old and new format."""
-    if path is None:
-        settings = get_settings()
-        path = Path(settings["paths"]["project_codes"])
+SNAPSHOT_FORMAT = 1
 
-    df = pd.read_excel(path)
+
+def get_cache_dir() -> Path:
+    """Return the directory for on-disk caches (created on demand)."""
+    settings = get_settings()
+    cache_dir = Path(settings["paths"].get("cache_dir", "data/cache"))
+    if not cache_dir.is_absolute():
+        cache_dir = get_project_root() / cache_dir
+    return cache_dir
+
+
+def normalize_project_codes(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize raw workbook columns to company/description/code."""
+    df = df.copy()
 
     # Detect format and normalize column names
     if 'JDA OpptyID' in df.columns:
@@ -38,35 +54,246 @@ def load_project_codes(path: str | Path | None = None) -> pd.DataFrame:
 
     return df
 
+
+class ProjectCodesRepository:
+    """
+    Process-wide cache of project_codes.xlsx.
+
+    Lookup order:
+    1. In-memory entry, valid while path + mtime + size are unchanged
+    2. On-disk snapshot, valid when path + mtime + size match, or when the
+       file was touched but its content hash is unchanged
+    3. pd.read_excel (and the snapshot is rewritten)
+    """
+
+    def __init__(self, cache_dir: Path | None = None):
+        self._cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "snapshot_hits": 0, "workbook_reads": 0}
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._cache_dir if self._cache_dir is not None else get_cache_dir()
+
+    def _snapshot_path(self, path: Path) -> Path:
+        key = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"project_codes_{key}.pkl"
+
+    def _load_entry(self, path: Path) -> dict:
+        stat = path.stat()
+        signature = (str(path), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(str(path))
+            if entry is not None and entry["signature"] == signature:
+                self.stats["memory_hits"] += 1
+                return entry
+
+        snapshot_path = self._snapshot_path(path)
+        snapshot = read_snapshot(snapshot_path, SNAPSHOT_FORMAT)
+        raw = None
+        content_hash = None
+
+        if snapshot is not None:
+            if snapshot["signature"] == signature:
+                raw, content_hash = snapshot["frame"], snapshot["content_hash"]
+            else:
+                content_hash = file_hash(path)
+                if snapshot["content_hash"] == content_hash:
+                    # File touched (e.g. OneDrive sync) but content unchanged
+                    raw = snapshot["frame"]
+                    write_snapshot(snapshot_path, {**snapshot, "signature": signature})
+
+        if raw is not None:
+            self.stats["snapshot_hits"] += 1
+        else:
+            self.stats["workbook_reads"] += 1
+            if content_hash is None:
+                content_hash = file_hash(path)
+            raw = pd.read_excel(path)
+            write_snapshot(snapshot_path, {
+                "format": SNAPSHOT_FORMAT,
+                "signature": signature,
+                "content_hash": content_hash,
+                "frame": raw,
+            })
+
+        entry = {
+            "signature": signature,
+            "version": content_hash,
+            "raw": raw,
+            "normalized": normalize_project_codes(raw),
+        }
+        with self._lock:
+            self._entries[str(path)] = entry
+        return entry
+
+    def raw(self, path: str | Path) -> pd.DataFrame:
+        """Return workbook as read by pd.read_excel (shared - do not mutate)."""
+        return self._load_entry(Path(path))["raw"]
+
+    def normalized(self, path: str | Path) -> pd.DataFrame:
+        """Return normalized project codes (shared - do not mutate)."""
+        return self._load_entry(Path(path))["normalized"]
+
+    def version(self, path: str | Path) -> str:
+        """Return content hash of the workbook."""
+        return self._load_entry(Path(path))["version"]
+
+    def clear(self) -> None:
+        """Drop in-memory entries (on-disk snapshots are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+
+_repository = ProjectCodesRepository()
+
+
+def get_repository() -> ProjectCodesRepository:
+    """Return the process-wide project codes repository."""
+    return _repository
+
+
+def get_project_codes_path() -> Path:
+    """Return configured path of project_codes.xlsx."""
+    settings = get_settings()
+    return Path(settings["paths"]["project_codes"])
+
+
+def load_project_codes(path: str | Path | None = None) -> pd.DataFrame:
+    """Load project codes from Excel - supports old and new format.
+
+    The returned DataFrame is shared across calls; copy before mutating.
+    """
+    if path is None:
+        path = get_project_codes_path()
+
+    return _repository.normalized(path)
+
+
+class OpportunityIndex:
+    """
+    Prebuilt lookup structures for match_opportunity_id.
+
+    - company_rows: exact company_lower -> row positions
+    - substring fallback: trigram -> companies, so "client is contained in
+      company name" only checks a handful of candidates
+    - token_rows: description word (>3 chars) -> row positions, compiled into
+      an automaton so a title is scanned once for all description words
+    - results are memoized on (client, lowercased title)
+    """
+
+    def __init__(self, project_codes: pd.DataFrame, memo_size: int = 8192):
+        self.codes = project_codes["code"].tolist()
+        self.company_rows = {}
+        self.token_rows = {}
+        self._trigrams = {}
+        self._client_rows = {}
+        self._memo = {}
+        self._memo_size = memo_size
+
+        for pos, company in enumerate(project_codes["company_lower"].tolist()):
+            if isinstance(company, str):
+                self.company_rows.setdefault(company, []).append(pos)
+
+        for company in self.company_rows:
+            for i in range(len(company) - 2):
+                self._trigrams.setdefault(company[i:i + 3], set()).add(company)
+
+        self._automaton = PatternAutomaton()
+        for pos, description in enumerate(project_codes["description_lower"].tolist()):
+            if not isinstance(description, str):
+                continue
+            for word in description.split():
+                if len(word) > 3:
+                    self.token_rows.setdefault(word, []).append(pos)
+        for word, rows in self.token_rows.items():
+            for pos in rows:
+                self._automaton.add(word, pos)
+        self._automaton.build()
+
+    def rows_for_client(self, client_lower: str) -> list[int]:
+        """Return row positions whose company contains client_lower."""
+        rows = self._client_rows.get(client_lower)
+        if rows is not None:
+            return rows
+
+        if len(client_lower) >= 3:
+            postings = [
+                self._trigrams.get(client_lower[i:i + 3], set())
+                for i in range(len(client_lower) - 2)
+            ]
+            postings.sort(key=len)
+            # Intersect smallest posting lists first; verification below is exact
+            candidates = postings[0]
+            for companies in postings[1:]:
+                if len(candidates) <= 8:
+                    break
+                candidates = candidates & companies
+        else:
+            candidates = self.company_rows.keys()
+
+        rows = sorted(
+            pos
+            for company in candidates
+            if client_lower in company
+            for pos in self.company_rows[company]
+        )
+        self._client_rows[client_lower] = rows
+        return rows
+
+    def match(self, client: str, event_title: str) -> tuple[str, bool]:
+        """Resolve (code, needs_review) - same rules as match_opportunity_id."""
+        if not client:
+            return "", False
+
+        client_lower = client.lower().strip()
+        title_lower = event_title.lower() if event_title else ""
+        key = (client_lower, title_lower)
+        result = self._memo.get(key)
+        if result is not None:
+            return result
+
+        rows = self.rows_for_client(client_lower)
+
+        if not rows:
+            result = ("", False)
+        elif len(rows) == 1:
+            result = (self.codes[rows[0]], False)
+        else:
+            result = None
+            # Multiple - first row (in file order) with a description word in title
+            if title_lower:
+                hits = self._automaton.search(title_lower)
+                if hits:
+                    matched = [pos for pos in rows if pos in hits]
+                    if matched:
+                        result = (self.codes[matched[0]], False)
+            if result is None:
+                # Return first, flag for review
+                result = (self.codes[rows[0]], True)
+
+        if len(self._memo) >= self._memo_size:
+            self._memo.clear()
+        self._memo[key] = result
+        return result
+
+
+_index_cache = {"df": None, "index": None}
+
+
+def get_opportunity_index(project_codes: pd.DataFrame) -> OpportunityIndex:
+    """Return OpportunityIndex for project_codes, built once per frame."""
+    if _index_cache["df"] is not project_codes:
+        _index_cache["index"] = OpportunityIndex(project_codes)
+        _index_cache["df"] = project_codes
+    return _index_cache["index"]
+
+
 def match_opportunity_id(client: str, event_title: str, project_codes: pd.DataFrame) -> tuple[str, bool]:
     """
     Find Opportunity ID for client + event context.
     Returns: (code, needs_review)
     """
-    if not client:
-        return "", False
-    
-    client_lower = client.lower().strip()
-    
-    # Find projects for this client - exact or contains
-    matches = project_codes[
-        project_codes["company_lower"].str.contains(client_lower, case=False, na=False)
-    ]
-    
-    if matches.empty:
-        return "", False
-    
-    if len(matches) == 1:
-        return matches.iloc[0]["code"], False
-    
-    # Multiple - try match description in title
-    if event_title:
-        title_lower = event_title.lower()
-        for _, row in matches.iterrows():
-            desc_words = [w for w in row["description_lower"].split() if len(w) > 3]
-            for word in desc_words:
-                if word in title_lower:
-                    return row["code"], False
-    
-    # Return first, flag for review
-    return matches.iloc[0]["code"], True
\ No newline at end of file
+    return get_opportunity_index(project_codes).match(client, event_title)
@@ -2,8 +2,14 @@
 SharePoint Graph API connector for SCA Time Tracker.
 """
 
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 from src.config import get_env, get_settings
+from src.throttle import UploadScheduler, NOT_PROCESSED_STATUSES, parse_retry_after
 
 
 def get_graph_url() -> str:
@@ -17,7 +23,7 @@ def get_graph_url() -> str:
 # Map our categories to SharePoint valid values
 CATEGORY_MAP = {
     "Prep - Demo/ Presentation": "Prep – Demo/ Presentation",
-    "Customer - Demo/ Presentation": "Customer – Demo/ Presentation", 
+    "Customer - Demo/ Presentation": "Customer – Demo/ Presentation",
     "Time Off": "Time Off",
     "Admin": "Admin",
     "Support": "Support",
@@ -30,6 +36,28 @@ CATEGORY_MAP = {
 }
 
 
+# Graph accepts at most 20 sub-requests per $batch call
+GRAPH_BATCH_LIMIT = 20
+
+
+def get_graph_batch_url() -> str:
+    """Build Graph $batch URL from config."""
+    return f"{get_settings()['sharepoint']['graph_base_url']}/$batch"
+
+
+def get_graph_me_url() -> str:
+    """Graph URL of the signed-in user."""
+    return f"{get_settings()['sharepoint']['graph_base_url']}/me"
+
+
+def get_list_items_path() -> str:
+    """List items path relative to the Graph base URL (for $batch sub-requests)."""
+    settings = get_settings()
+    site_id = settings["sharepoint"]["site_id"]
+    list_id = settings["sharepoint"]["list_id"]
+    return f"/sites/{site_id}/lists/{list_id}/items"
+
+
 def get_access_token() -> str:
     """Get access token from environment or interactive login."""
     token = get_env("GRAPH_ACCESS_TOKEN")
@@ -38,110 +66,563 @@ def get_access_token() -> str:
     return token
 
 
-def post_time_entry(entry: dict, access_token: str = None) -> dict:
-    """Post single time entry to SharePoint."""
-    import math
-    
-    if access_token is None:
-        access_token = get_access_token()
-    
+def get_upload_concurrency() -> int:
+    """Default number of parallel uploads from config."""
+    return int(get_settings()["sharepoint"].get("upload_concurrency", 4))
+
+
+def get_request_timeout() -> float:
+    """Per-request timeout in seconds from config."""
+    return float(get_settings()["sharepoint"].get("request_timeout", 30))
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter applying a default timeout to requests sent without one."""
+
+    def __init__(self, *args, timeout: float | None = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(access_token: str, pool_size: int = 4, timeout: float | None = None) -> requests.Session:
+    """Create keep-alive HTTP session with auth headers, a sized connection pool and a request timeout."""
+    if timeout is None:
+        timeout = get_request_timeout()
+    session = requests.Session()
+    adapter = TimeoutHTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size), timeout=timeout)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Authorization": f"Bearer {access_token}",
+        "Content-Type": "application/json"
+    })
+    return session
+
+
+def _clean_value(val):
+    """Return None for None/NaN values."""
+    if val is None:
+        return None
+    if isinstance(val, float) and math.isnan(val):
+        return None
+    return val
+
+
+def build_fields(entry: dict) -> dict:
+    """Build SharePoint list item fields for a time entry."""
     # Map category to SharePoint format
     sp_category = CATEGORY_MAP.get(entry.get("category"), entry.get("category"))
-    
-    # Clean NaN values
-    def clean_value(val):
-        if val is None:
-            return None
-        if isinstance(val, float) and math.isnan(val):
-            return None
-        return val
-    
+
     fields = {
         "WeekBeginning": entry["week_beginning"],
         "Category": sp_category,
         "Hours": float(entry["hours"]),
     }
-    
+
     # Add optional fields only if not NaN/None
-    comments = clean_value(entry.get("comments"))
+    comments = _clean_value(entry.get("comments"))
     if comments:
         fields["Comments"] = str(comments)
-    
-    opp_id = clean_value(entry.get("opportunity_id"))
+
+    opp_id = _clean_value(entry.get("opportunity_id"))
+    if isinstance(opp_id, float) and opp_id.is_integer():
+        # Numeric ids read back from Excel as 12345.0
+        opp_id = int(opp_id)
     if opp_id:
         fields["OpportunityID"] = str(opp_id)
-    
-    client = clean_value(entry.get("client"))
+
+    client = _clean_value(entry.get("client"))
     if client:
         fields["AccountName"] = str(client)
-    
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
 
-    response = requests.post(get_graph_url(), headers=headers, json={"fields": fields})
-    
+    return fields
+
+
+def post_time_entry(entry: dict, access_token: str = None, session: requests.Session | None = None) -> dict:
+    """Post single time entry to SharePoint.
+
+    Args:
+        entry: Preview row as dict
+        access_token: Graph token (default: from .env)
+        session: Optional pooled session (see create_session)
+    """
+    if session is None:
+        if access_token is None:
+            access_token = get_access_token()
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        response = requests.post(get_graph_url(), headers=headers, json={"fields": build_fields(entry)},
+                                 timeout=get_request_timeout())
+    else:
+        response = session.post(get_graph_url(), json={"fields": build_fields(entry)})
+
     if response.status_code == 201:
         return {"success": True, "data": response.json()}
     else:
         return {"success": False, "error": response.text, "status": response.status_code}
 
-def post_week_entries(df, week: str, access_token: str = None) -> list:
-    """Post all entries for a specific week."""
-    if access_token is None:
-        access_token = get_access_token()
 
+class Uploader:
+    """
+    Posts time entries over one pooled keep-alive session with a bounded
+    worker pool. Results are always returned in input order.
+
+    Requests go through an UploadScheduler: throttled (429/503) and other
+    transient responses are retried with Retry-After / jittered backoff,
+    and the number of requests in flight adapts to the throttling rate.
+    Creating items is not idempotent, so POSTs are only retried when the
+    server did not process them (429/503); a 5xx or timeout is reported as
+    a failure instead of risking a duplicate entry.
+    """
+
+    def __init__(self, access_token: str = None, concurrency: int | None = None, batch: bool | None = None):
+        sp_settings = get_settings()["sharepoint"]
+        if access_token is None:
+            access_token = get_access_token()
+        if concurrency is None:
+            concurrency = get_upload_concurrency()
+        if batch is None:
+            batch = bool(sp_settings.get("batch_uploads", False))
+        self.concurrency = max(1, int(concurrency))
+        self.batch = batch
+        self.batch_retries = int(sp_settings.get("batch_retries", 3))
+        self.scheduler = UploadScheduler(
+            self.concurrency,
+            max_retries=int(sp_settings.get("max_retries", 5)),
+            base_delay=float(sp_settings.get("retry_base_delay", 1.0)),
+            max_delay=float(sp_settings.get("retry_max_delay", 60.0)),
+        )
+        self.session = create_session(access_token, pool_size=self.concurrency)
+        self.url = get_graph_url()
+        self.batch_url = get_graph_batch_url()
+        self.items_path = get_list_items_path()
+
+    @property
+    def stats(self) -> dict:
+        """Throttle statistics of this run."""
+        return self.scheduler.stats.as_dict()
+
+    def post(self, entry: dict) -> dict:
+        """Post one entry (thread-safe)."""
+        fields = build_fields(entry)
+        try:
+            response = self.scheduler.execute(lambda: self.session.post(self.url, json={"fields": fields}),
+                                              idempotent=False)
+        except requests.RequestException as e:
+            return {"success": False, "error": str(e), "status": None}
+        if response.status_code == 201:
+            return {"success": True, "data": response.json()}
+        return {"success": False, "error": response.text, "status": response.status_code}
+
+    def update(self, item_id: str, entry: dict) -> dict:
+        """Overwrite the fields of an existing list item (thread-safe)."""
+        fields = build_fields(entry)
+        try:
+            response = self.scheduler.execute(
+                lambda: self.session.patch(f"{self.url}/{item_id}/fields", json=fields)
+            )
+        except requests.RequestException as e:
+            return {"success": False, "error": str(e), "status": None}
+        if response.status_code == 200:
+            return {"success": True, "data": {"id": item_id, "fields": response.json()}}
+        return {"success": False, "error": response.text, "status": response.status_code}
+
+    def delete(self, item_id: str) -> dict:
+        """Delete a list item (thread-safe); an already deleted item counts as success."""
+        try:
+            response = self.scheduler.execute(lambda: self.session.delete(f"{self.url}/{item_id}"))
+        except requests.RequestException as e:
+            return {"success": False, "error": str(e), "status": None}
+        if response.status_code in (204, 404):
+            return {"success": True, "data": {"id": item_id}}
+        return {"success": False, "error": response.text, "status": response.status_code}
+
+    def _send_batch(self, entries: list[dict]) -> list[dict]:
+        """
+        Send up to 20 entries in one $batch call and map sub-responses back
+        to entries. Sub-requests rejected unprocessed (429/503) are retried
+        (only those), up to batch_retries extra rounds; other failures and
+        missing sub-responses are not resent, as the item may exist.
+        """
+        results = [None] * len(entries)
+        pending = list(range(len(entries)))
+
+        for attempt in range(self.batch_retries + 1):
+            payload = {"requests": [
+                {
+                    "id": str(i),
+                    "method": "POST",
+                    "url": self.items_path,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": {"fields": build_fields(entries[i])},
+                }
+                for i in pending
+            ]}
+
+            try:
+                response = self.scheduler.execute(lambda: self.session.post(self.batch_url, json=payload),
+                                                  idempotent=False)
+            except requests.RequestException as e:
+                for i in pending:
+                    results[i] = {"success": False, "error": str(e), "status": None}
+                break
+
+            if response.status_code != 200:
+                # Envelope-level failure - the scheduler already retried 429/503
+                for i in pending:
+                    results[i] = {"success": False, "error": response.text, "status": response.status_code}
+                break
+
+            sub_responses = {r.get("id"): r for r in response.json().get("responses", [])}
+            retry = []
+            retry_after = None
+            for i in pending:
+                sub = sub_responses.get(str(i))
+                if sub is None:
+                    results[i] = {"success": False, "error": "Missing $batch sub-response", "status": None}
+                    continue
+
+                status = sub.get("status")
+                sub_retry_after = parse_retry_after((sub.get("headers") or {}).get("Retry-After"))
+                self.scheduler.record_response(status, sub_retry_after)
+                if status == 201:
+                    results[i] = {"success": True, "data": sub.get("body")}
+                else:
+                    results[i] = {"success": False, "error": json.dumps(sub.get("body")), "status": status}
+                    if status in NOT_PROCESSED_STATUSES:
+                        retry.append(i)
+                        if sub_retry_after is not None:
+                            retry_after = max(retry_after or 0.0, sub_retry_after)
+
+            pending = retry
+            if not pending or attempt == self.batch_retries:
+                break
+            self.scheduler.stats.record(retries=1)
+            self.scheduler.sleep(self.scheduler.backoff(attempt + 1, retry_after))
+
+        return results
+
+    def _iter_batched(self, entries: list[dict]):
+        chunks = [entries[i:i + GRAPH_BATCH_LIMIT] for i in range(0, len(entries), GRAPH_BATCH_LIMIT)]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks)), thread_name_prefix="upload") as executor:
+            for chunk_results in executor.map(self._send_batch, chunks):
+                yield from chunk_results
+
+    def _iter_results(self, entries: list[dict]):
+        """Yield results in input order as soon as they are available."""
+        if self.batch:
+            yield from self._iter_batched(entries)
+        elif self.concurrency == 1 or len(entries) == 1:
+            for entry in entries:
+                yield self.post(entry)
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="upload") as executor:
+                yield from executor.map(self.post, entries)
+
+    def post_many(self, entries: list[dict], on_result=None) -> list[dict]:
+        """Post entries concurrently; on_result(entry, result) is called in input order."""
+        if not entries:
+            return []
+
+        results = []
+        for entry, result in zip(entries, self._iter_results(entries)):
+            if on_result:
+                on_result(entry, result)
+            results.append(result)
+        return results
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _week_rows(df, week: str) -> list[dict]:
+    """Return entry rows of a week (without WEEK TOTAL) as dicts."""
     week_data = df[
         (df["week_beginning"] == week) &
         (df["category"] != ">>> WEEK TOTAL")
     ]
+    return week_data.to_dict("records")
 
-    results = []
-    for _, row in week_data.iterrows():
-        result = post_time_entry(row.to_dict(), access_token)
-        results.append({
-            "category": row["category"],
-            "hours": row["hours"],
-            "success": result["success"],
-            "error": result.get("error")
-        })
-        print(f"  {'OK' if result['success'] else 'FAIL'} {row['category']}: {row['hours']}h")
 
-    return results
+def _print_result(entry: dict, result: dict) -> None:
+    label = "SKIP" if result.get("skipped") else "OK" if result["success"] else "FAIL"
+    print(f"  {label} {entry['category']}: {entry['hours']}h")
 
 
-def post_all_weeks(df, access_token: str = None) -> dict:
+def _summarize(entry: dict, result: dict) -> dict:
+    return {
+        "category": entry["category"],
+        "hours": entry["hours"],
+        "success": result["success"],
+        "error": result.get("error"),
+        "skipped": result.get("skipped", False)
+    }
+
+
+def _upload_rows(entries: list[dict], access_token: str = None, concurrency: int | None = None,
+                 batch: bool | None = None, on_result=None, force: bool = False) -> tuple[list[dict], dict]:
+    """
+    Upload rows, skipping those the upload ledger already confirms.
+
+    Every successful upload is recorded in the ledger right away, so an
+    interrupted run resumes from the first unconfirmed row.
+
+    Returns:
+        (results in input order, throttle statistics)
+    """
+    from src.upload_ledger import get_upload_ledger, entry_fingerprints
+
+    ledger = get_upload_ledger()
+    fingerprints = entry_fingerprints(entries)
+    confirmed = {} if ledger is None or force else ledger.confirmed(fingerprints)
+
+    results = [None] * len(entries)
+    pending = []
+    for i, fingerprint in enumerate(fingerprints):
+        if fingerprint in confirmed:
+            results[i] = {"success": True, "skipped": True, "data": {"id": confirmed[fingerprint]}}
+        else:
+            pending.append(i)
+
+    def on_posted(entry, result, i):
+        if result["success"] and ledger is not None:
+            ledger.record(fingerprints[i], entry, (result.get("data") or {}).get("id"))
+        results[i] = result
+
+    # Report skipped rows and new results in row order
+    next_index = [0]
+
+    def report_until(stop):
+        while next_index[0] < stop:
+            i = next_index[0]
+            if on_result:
+                on_result(entries[i], results[i])
+            next_index[0] += 1
+
+    throttle_stats = {}
+    if pending:
+        with Uploader(access_token, concurrency, batch) as uploader:
+            pending_iter = iter(pending)
+
+            def on_pending_result(entry, result):
+                i = next(pending_iter)
+                on_posted(entry, result, i)
+                report_until(i + 1)
+
+            uploader.post_many([entries[i] for i in pending], on_result=on_pending_result)
+            throttle_stats = uploader.stats
+    report_until(len(entries))
+
+    return results, throttle_stats
+
+
+def post_week_entries(df, week: str, access_token: str = None, concurrency: int | None = None,
+                      batch: bool | None = None, force: bool = False) -> list:
+    """Post all entries for a specific week (rows already in the upload ledger are skipped)."""
+    rows = _week_rows(df, week)
+    results, _ = _upload_rows(rows, access_token, concurrency, batch, on_result=_print_result, force=force)
+    return [_summarize(entry, result) for entry, result in zip(rows, results)]
+
+
+def post_all_weeks(df, access_token: str = None, concurrency: int | None = None, batch: bool | None = None,
+                   force: bool = False) -> dict:
     """Post all weeks from DataFrame to SharePoint.
 
+    Rows of all weeks share one worker pool, so uploads keep going across
+    week boundaries; results are still grouped and ordered per week. Rows
+    already confirmed in the upload ledger are skipped unless force=True.
+
     Returns:
-        dict with 'by_week' (results per week) and 'totals' (success/fail counts)
+        dict with 'by_week' (results per week), 'totals' (success/fail/skipped
+        counts) and 'throttle' (retry/throttling statistics of the run)
     """
     import pandas as pd
 
-    if access_token is None:
-        access_token = get_access_token()
-
     # Get unique weeks (excluding summary rows)
     weeks = df[df["category"] != ">>> WEEK TOTAL"]["week_beginning"].unique()
     weeks = sorted([w for w in weeks if pd.notna(w)])
 
-    all_results = {}
-    total_success = 0
-    total_failed = 0
-
+    rows = []
     for week in weeks:
-        print(f"\n[{week}]")
-        results = post_week_entries(df, week, access_token)
-        all_results[week] = results
+        rows.extend((week, entry) for entry in _week_rows(df, week))
 
-        week_success = sum(1 for r in results if r["success"])
-        week_failed = len(results) - week_success
-        total_success += week_success
-        total_failed += week_failed
+    all_results = {week: [] for week in weeks}
+    current_week = [None]
+
+    def on_result(entry, result):
+        week = entry["week_beginning"]
+        if week != current_week[0]:
+            print(f"\n[{week}]")
+            current_week[0] = week
+        _print_result(entry, result)
+
+    results, throttle_stats = _upload_rows([entry for _, entry in rows], access_token, concurrency, batch,
+                                           on_result=on_result, force=force)
+
+    for (week, entry), result in zip(rows, results):
+        all_results[week].append(_summarize(entry, result))
+
+    total_skipped = sum(1 for r in results if r.get("skipped"))
+    total_success = sum(1 for r in results if r["success"]) - total_skipped
+    total_failed = len(results) - total_success - total_skipped
 
     return {
         "by_week": all_results,
-        "totals": {"success": total_success, "failed": total_failed},
-        "weeks": weeks
-    }
\ No newline at end of file
+        "totals": {"success": total_success, "failed": total_failed, "skipped": total_skipped},
+        "weeks": weeks,
+        "throttle": throttle_stats
+    }
+
+
+def _item_key(category: str, client: str, opportunity_id: str) -> tuple:
+    return category, client, opportunity_id
+
+
+def _entry_item(entry: dict) -> dict:
+    """Preview row in mirror-row shape (SharePoint field values)."""
+    from src.list_mirror import field_text
+
+    fields = build_fields(entry)
+    return {
+        "category": fields["Category"],
+        "hours": round(fields["Hours"], 2),
+        "comments": field_text(fields.get("Comments")),
+        "opportunity_id": field_text(fields.get("OpportunityID")),
+        "account_name": field_text(fields.get("AccountName")),
+    }
+
+
+def plan_week_operations(rows: list[dict], items: list[dict], owner: str) -> dict:
+    """
+    Diff the preview rows of a week against the list items of that week.
+
+    Rows equal to an item need nothing; rows whose category/client/
+    opportunity match a leftover item become updates; the rest are
+    creates, and leftover items are deletes. Items not created by owner
+    are ignored, so they are never updated or deleted.
+
+    Returns:
+        dict with 'create' (rows), 'update' ((item_id, row) pairs),
+        'delete' (item ids), 'unchanged' (count) and 'matched'
+        ((item_id, row) pairs of the unchanged rows)
+    """
+    if not owner:
+        raise ValueError("plan_week_operations needs the id of the signed-in user")
+
+    def full_key(x):
+        return _item_key(x["category"], x["account_name"], x["opportunity_id"]) + (round(x["hours"], 2), x["comments"])
+
+    remaining = {}
+    for item in items:
+        if item.get("created_by") == owner:
+            remaining.setdefault(full_key(item), []).append(item)
+
+    unmatched = []
+    matched = []
+    for row in rows:
+        bucket = remaining.get(full_key(_entry_item(row)))
+        if bucket:
+            matched.append((bucket.pop(0)["id"], row))
+        else:
+            unmatched.append(row)
+
+    by_key = {}
+    for bucket in remaining.values():
+        for item in bucket:
+            by_key.setdefault(_item_key(item["category"], item["account_name"], item["opportunity_id"]), []).append(item)
+
+    create, update = [], []
+    for row in unmatched:
+        converted = _entry_item(row)
+        bucket = by_key.get(_item_key(converted["category"], converted["account_name"], converted["opportunity_id"]))
+        if bucket:
+            update.append((bucket.pop(0)["id"], row))
+        else:
+            create.append(row)
+
+    delete = [item["id"] for bucket in by_key.values() for item in bucket]
+    return {"create": create, "update": update, "delete": delete, "unchanged": len(matched), "matched": matched}
+
+
+def sync_weeks(df, weeks: list[str], access_token: str = None, concurrency: int | None = None,
+               dry_run: bool = False) -> dict:
+    """
+    Make the list match the preview for the given weeks.
+
+    The local list mirror is delta-synced first, then only the create/
+    update/delete operations needed per week are sent. Only items created
+    by the signed-in user are considered.
+
+    Returns:
+        dict with per-week 'plans', operation 'totals', 'failed' results and 'throttle'
+
+    Raises:
+        RuntimeError: If the signed-in user cannot be determined
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from src.list_mirror import get_list_mirror, resolve_owner, sync_mirror
+    from src.upload_ledger import get_upload_ledger, entry_fingerprints
+
+    mirror = get_list_mirror()
+    ledger = get_upload_ledger()
+    totals = {"create": 0, "update": 0, "delete": 0, "unchanged": 0}
+    failed = []
+    plans = {}
+
+    with Uploader(access_token, concurrency, batch=False) as uploader:
+        sync_mirror(mirror, uploader)
+        owner = resolve_owner(mirror, uploader)
+
+        for week in weeks:
+            rows = _week_rows(df, week)
+            plan = plan_week_operations(rows, mirror.items([week], owner=owner), owner)
+            plans[week] = plan
+            for op in totals:
+                totals[op] += plan[op] if op == "unchanged" else len(plan[op])
+            if dry_run:
+                continue
+
+            created = uploader.post_many(plan["create"])
+            with ThreadPoolExecutor(max_workers=uploader.concurrency, thread_name_prefix="upload") as executor:
+                updated = list(executor.map(lambda op: uploader.update(*op), plan["update"]))
+                deleted = list(executor.map(uploader.delete, plan["delete"]))
+
+            week_failed = []
+            for row, result in zip(plan["create"] + [row for _, row in plan["update"]], created + updated):
+                if not result["success"]:
+                    week_failed.append(_summarize(row, result))
+            for item_id, result in zip(plan["delete"], deleted):
+                if result["success"]:
+                    mirror.remove(item_id)
+                else:
+                    week_failed.append({"category": f"delete item {item_id}", "hours": None,
+                                        "success": False, "error": result.get("error"), "skipped": False})
+            failed.extend(week_failed)
+
+            if ledger is not None and not week_failed:
+                # Every row now has a list item: matched, updated or just created
+                item_ids = {id(row): item_id for item_id, row in plan["matched"] + plan["update"]}
+                for row, result in zip(plan["create"], created):
+                    item_ids[id(row)] = (result.get("data") or {}).get("id")
+                for fingerprint, row in zip(entry_fingerprints(rows), rows):
+                    ledger.record(fingerprint, row, item_ids.get(id(row)))
+
+        if not dry_run and (totals["create"] or totals["update"]):
+            # Pick up item ids / modified times of the changes just made
+            sync_mirror(mirror, uploader)
+        throttle_stats = uploader.stats
+
+    return {"plans": plans, "totals": totals, "failed": failed, "throttle": throttle_stats}
@@ -22,4 +22,69 @@ def normalize_text(text: str) -> str:
     text = text.lower()
     for umlaut, replacement in UMLAUT_MAP.items():
         text = text.replace(umlaut, replacement)
-    return text
\ No newline at end of file
+    return text
+
+
+class PatternAutomaton:
+    """
+    Aho-Corasick automaton for multi-pattern substring search.
+
+    Each pattern carries a payload; search() returns the payloads of every
+    pattern occurring in the text in a single linear pass.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._built = False
+
+    def add(self, pattern: str, payload) -> None:
+        """Add a pattern (must be called before search)."""
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._out[state].append(payload)
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links (breadth-first)."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+        self._built = True
+
+    def search(self, text: str) -> set:
+        """Return payloads of all patterns found in text."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
@@ -0,0 +1,222 @@
+"""
+Throttling-aware request scheduling for Graph uploads.
+
+- Retry-After (seconds or HTTP date) is honored and pauses all workers
+- Other transient errors use exponential backoff with full jitter
+- Concurrency adapts AIMD-style: +1 after a window of successes, halved
+  at most once per window of throttle responses
+- Requests that create items (POST) are only retried when the server did
+  not process them (429/503, connect timeout), so they never run twice
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Statuses that signal throttling / overload (halve concurrency)
+THROTTLE_STATUSES = {429, 503}
+
+# Statuses worth retrying
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+# Statuses after which a non-idempotent request may be sent again: the
+# server rejected it without processing. 500/502/504 may have created the item.
+NOT_PROCESSED_STATUSES = THROTTLE_STATUSES
+
+
+def parse_retry_after(value) -> float | None:
+    """Parse a Retry-After header value into seconds."""
+    if value is None or value == "":
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class ThrottleStats:
+    """Per-run counters reported after an upload."""
+
+    def __init__(self):
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.network_errors = 0
+        self.retries = 0
+        self.wait_seconds = 0.0
+        self.min_concurrency = None
+        self.max_concurrency = 0
+        self._lock = threading.Lock()
+
+    def record(self, **increments) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def observe_concurrency(self, limit: int) -> None:
+        with self._lock:
+            self.min_concurrency = limit if self.min_concurrency is None else min(self.min_concurrency, limit)
+            self.max_concurrency = max(self.max_concurrency, limit)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "server_errors": self.server_errors,
+                "network_errors": self.network_errors,
+                "retries": self.retries,
+                "wait_seconds": round(self.wait_seconds, 1),
+                "min_concurrency": self.min_concurrency,
+                "max_concurrency": self.max_concurrency,
+            }
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit shared by worker threads.
+
+    acquire() blocks while `limit` requests are in flight or while a
+    Retry-After pause is active. It returns the current epoch; the limit is
+    only halved by throttle responses to requests sent after the previous
+    decrease, so a burst of concurrent 429s halves it once.
+    """
+
+    def __init__(self, max_limit: int, initial: int | None = None, stats: ThrottleStats | None = None):
+        self.max_limit = max(1, max_limit)
+        self.limit = min(self.max_limit, initial or self.max_limit)
+        self.stats = stats or ThrottleStats()
+        self._in_flight = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._epoch = 0
+        self._cond = threading.Condition()
+        self.stats.observe_concurrency(self.limit)
+
+    def acquire(self) -> int:
+        with self._cond:
+            while True:
+                wait = self._resume_at - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return self._epoch
+                self._cond.wait()
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self) -> None:
+        """Additive increase: +1 after `limit` consecutive successes."""
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self._successes = 0
+                self.stats.observe_concurrency(self.limit)
+                self._cond.notify_all()
+
+    def on_throttle(self, retry_after: float | None = None, epoch: int | None = None) -> None:
+        """
+        Multiplicative decrease, plus a shared pause for Retry-After.
+
+        Args:
+            retry_after: Seconds all workers pause
+            epoch: acquire() result of the throttled request; responses to
+                requests sent before the last decrease do not decrease again
+        """
+        with self._cond:
+            if epoch is None or epoch == self._epoch:
+                self.limit = max(1, self.limit // 2)
+                self._epoch += 1
+                self.stats.observe_concurrency(self.limit)
+            self._successes = 0
+            if retry_after:
+                self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+            self._cond.notify_all()
+
+
+class UploadScheduler:
+    """Runs HTTP requests through an AdaptiveLimiter with retries."""
+
+    def __init__(self, max_concurrency: int, max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.stats = ThrottleStats()
+        self.limiter = AdaptiveLimiter(max_concurrency, stats=self.stats)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # Epoch of the last request sent by each thread (see AdaptiveLimiter)
+        self._local = threading.local()
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Delay before retry `attempt` (1-based): Retry-After or jittered exponential."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.stats.record(wait_seconds=seconds)
+            time.sleep(seconds)
+
+    def record_response(self, status: int | None, retry_after: float | None = None) -> None:
+        """Update AIMD state and counters for a (sub-)response of this thread's last request."""
+        if status in THROTTLE_STATUSES:
+            self.stats.record(throttled=1)
+            self.limiter.on_throttle(retry_after, getattr(self._local, "epoch", None))
+        elif status is not None and status >= 500:
+            self.stats.record(server_errors=1)
+        elif status is not None and status < 400:
+            self.limiter.on_success()
+
+    def execute(self, request_fn, idempotent: bool = True) -> requests.Response:
+        """
+        Call request_fn() until it returns a non-transient response or
+        retries are exhausted. Network errors are retried too and re-raised
+        after the last attempt.
+
+        Args:
+            request_fn: Sends the request and returns the response
+            idempotent: False for requests that must not run twice (item
+                creation): they are only retried on NOT_PROCESSED_STATUSES and
+                connect timeouts, any other network error is re-raised at once
+        """
+        retry_statuses = TRANSIENT_STATUSES if idempotent else NOT_PROCESSED_STATUSES
+        attempt = 0
+        while True:
+            self._local.epoch = self.limiter.acquire()
+            try:
+                self.stats.record(requests=1)
+                response = request_fn()
+            except requests.RequestException as e:
+                self.stats.record(network_errors=1)
+                # A read timeout or dropped connection may come after the server acted
+                if attempt >= self.max_retries or not (idempotent or isinstance(e, requests.ConnectTimeout)):
+                    raise
+                response = None
+            finally:
+                self.limiter.release()
+
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                self.record_response(response.status_code, retry_after)
+                if response.status_code not in retry_statuses or attempt >= self.max_retries:
+                    return response
+            else:
+                retry_after = None
+
+            attempt += 1
+            self.stats.record(retries=1)
+            self.sleep(self.backoff(attempt, retry_after))
@@ -0,0 +1,133 @@
+"""
+Local SQLite ledger of time entries uploaded to SharePoint.
+
+Each uploaded row is recorded under a content fingerprint (week, category,
+client, hours, opportunity id, comments) together with the SharePoint item
+id. Re-running an upload skips confirmed rows, so an interrupted
+`upload --all` resumes without creating duplicates.
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.config import get_settings, get_project_root
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploaded_entries (
+    fingerprint TEXT PRIMARY KEY,
+    week TEXT NOT NULL,
+    category TEXT NOT NULL,
+    hours REAL NOT NULL,
+    item_id TEXT,
+    uploaded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uploaded_entries_week ON uploaded_entries (week);
+"""
+
+FINGERPRINT_FIELDS = ("week_beginning", "category", "client", "hours", "opportunity_id", "comments")
+
+
+def _normalize(field: str, value) -> str:
+    """Stable string form of a preview value (NaN/None -> '', 12345.0 -> '12345')."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if field == "hours":
+        return f"{float(value):.2f}"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def entry_fingerprint(entry: dict) -> str:
+    """Content fingerprint of a preview row."""
+    payload = json.dumps([_normalize(f, entry.get(f)) for f in FINGERPRINT_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def entry_fingerprints(entries: list[dict]) -> list[str]:
+    """
+    Fingerprints for a list of rows.
+
+    Identical rows get an occurrence suffix (#2, #3, ...), so two equal
+    entries in the same week are tracked as two uploads.
+    """
+    seen = {}
+    fingerprints = []
+    for entry in entries:
+        fingerprint = entry_fingerprint(entry)
+        seen[fingerprint] = seen.get(fingerprint, 0) + 1
+        if seen[fingerprint] > 1:
+            fingerprint = f"{fingerprint}#{seen[fingerprint]}"
+        fingerprints.append(fingerprint)
+    return fingerprints
+
+
+class UploadLedger:
+    """SQLite-backed record of confirmed uploads."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def confirmed(self, fingerprints: list[str]) -> dict[str, str | None]:
+        """Return {fingerprint: item_id} for fingerprints already uploaded."""
+        found = {}
+        with self._lock:
+            for fingerprint in dict.fromkeys(fingerprints):
+                row = self._conn.execute(
+                    "SELECT item_id FROM uploaded_entries WHERE fingerprint = ?", (fingerprint,)
+                ).fetchone()
+                if row is not None:
+                    found[fingerprint] = row[0]
+        return found
+
+    def record(self, fingerprint: str, entry: dict, item_id: str | None) -> None:
+        """Record a confirmed upload (committed immediately); item_id None keeps a known id."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO uploaded_entries "
+                "(fingerprint, week, category, hours, item_id, uploaded_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (fingerprint) DO UPDATE SET week = excluded.week, category = excluded.category, "
+                "hours = excluded.hours, item_id = COALESCE(excluded.item_id, item_id), "
+                "uploaded_at = excluded.uploaded_at",
+                (fingerprint, _normalize("week_beginning", entry.get("week_beginning")),
+                 _normalize("category", entry.get("category")), float(entry.get("hours") or 0),
+                 item_id, time.time())
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_ledger = {"instance": None, "path": None}
+
+
+def get_ledger_path() -> Path:
+    """Ledger location from config (relative paths are resolved against the project root)."""
+    path = Path(get_settings()["paths"].get("upload_ledger", "data/output/upload_ledger.sqlite"))
+    if not path.is_absolute():
+        path = get_project_root() / path
+    return path
+
+
+def get_upload_ledger() -> UploadLedger | None:
+    """Return process-wide upload ledger, or None if disabled in settings."""
+    if not get_settings()["sharepoint"].get("ledger_enabled", True):
+        return None
+    path = get_ledger_path()
+    if _ledger["instance"] is None or _ledger["path"] != path:
+        _ledger["instance"] = UploadLedger(path)
+        _ledger["path"] = path
+    return _ledger["instance"]
@@ -0,0 +1,67 @@
+"""
+Shared fixtures: a calendar export the pipeline loaders are patched to read.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from src import loader, project_codes
+from src.project_codes import normalize_project_codes
+
+PROJECT_CODES = normalize_project_codes(pd.DataFrame({
+    "JDA OpptyID": ["OP-1", "OP-2"],
+    "Account Name": ["Michelin", "Acme"],
+    "Opportunity Name": ["Tyre planning", "Rollout"],
+}))
+
+
+class CalendarExport:
+    """Calendar export JSON; patch() points load_and_filter and load_project_codes at it."""
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = {"calendar": 0, "codes": 0}
+
+    @staticmethod
+    def event(start, end, category, title, domains="", all_day=False):
+        return {"start": start, "end": end, "category": category, "title": title, "minutes": 60,
+                "all_day": all_day, "external_domains": domains, "location": "", "recipients": 2, "busy_status": 2}
+
+    @staticmethod
+    def monday(weeks_ago):
+        """Monday of the week weeks_ago weeks before this one."""
+        return datetime.now() - timedelta(days=datetime.now().weekday() + 7 * weeks_ago)
+
+    @staticmethod
+    def day(monday, offset):
+        return (monday + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+    def write(self, events):
+        self.path.write_text(json.dumps({"events": events}), encoding="utf-8")
+
+    def patch(self, setattr=setattr):
+        """Patch the loaders (monkeypatch.setattr in tests, plain setattr in a subprocess)."""
+        real_load = loader.load_and_filter
+
+        def load_calendar(path=None, weeks_back=None, since=None):
+            self.calls["calendar"] += 1
+            return real_load(self.path, weeks_back=weeks_back, since=since)
+
+        def load_codes(path=None):
+            self.calls["codes"] += 1
+            return PROJECT_CODES
+
+        setattr(loader, "load_and_filter", load_calendar)
+        setattr(project_codes, "load_project_codes", load_codes)
+
+
+@pytest.fixture
+def calendar_export(monkeypatch, tmp_path):
+    """Empty calendar export in tmp_path, with the pipeline loaders patched to read it."""
+    export = CalendarExport(tmp_path / "calendar.json")
+    export.write([])
+    export.patch(monkeypatch.setattr)
+    return export
@@ -0,0 +1,70 @@
+"""
+Test the persistent AI client-detection cache.
+"""
+
+from src.ai_cache import DetectionCache, cache_key
+
+
+def test_cache_roundtrip_and_key_normalization(tmp_path):
+    """Same title (case/spacing) and domains (order) hit the same entry."""
+    cache = DetectionCache(tmp_path / "ai.sqlite")
+    companies = ["Michelin", "Wurth"]
+
+    key = cache_key("Michelin  Demo", "michelin.com, partner.com", "m1")
+    cache.put_many({key: "Michelin"}, companies)
+
+    same = cache_key("michelin demo", "Partner.com,michelin.com", "m1")
+    other_model = cache_key("michelin demo", "partner.com,michelin.com", "m2")
+    assert cache.get_many([same, other_model], companies) == {same: "Michelin"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_company_list_change_invalidates_only_affected(tmp_path):
+    """Removed clients and 'no client' answers after additions are invalidated."""
+    cache = DetectionCache(tmp_path / "ai.sqlite")
+    old = ["Michelin", "Wurth", "Veronesi"]
+    michelin = cache_key("Tyre demo", "", "m")
+    wurth = cache_key("Wurth call", "", "m")
+    unknown = cache_key("Team sync", "", "m")
+    cache.put_many({michelin: "Michelin", wurth: "Wurth", unknown: ""}, old)
+
+    removed = ["Michelin", "Veronesi"]
+    assert cache.get_many([michelin, wurth, unknown], removed) == {michelin: "Michelin", unknown: ""}
+
+    added = ["Michelin", "Veronesi", "Merz"]
+    assert cache.get_many([michelin, unknown], added) == {michelin: "Michelin"}
+
+
+def test_lru_eviction_and_ttl(tmp_path):
+    """Entries beyond max_entries are evicted oldest-used first; TTL expires."""
+    cache = DetectionCache(tmp_path / "ai.sqlite", max_entries=2)
+    companies = ["Michelin"]
+    keys = [cache_key(f"meeting {i}", "", "m") for i in range(3)]
+    for key in keys:
+        cache.put_many({key: ""}, companies)
+
+    assert cache.stats()["entries"] == 2
+    assert keys[0] not in cache.get_many(keys, companies)
+
+    expired = DetectionCache(tmp_path / "ai.sqlite", ttl_days=-1)
+    assert expired.get_many(keys, companies) == {}
+    assert expired.prune() == 2
+
+
+def test_put_many_prunes_only_over_max_entries(tmp_path, monkeypatch):
+    cache = DetectionCache(tmp_path / "ai.sqlite", max_entries=3)
+    calls = []
+    real_prune = cache.prune
+    monkeypatch.setattr(cache, "prune", lambda expired_only=False: calls.append(1) or real_prune(expired_only))
+    companies = ["Michelin"]
+
+    cache.put_many({cache_key("a", "", "m"): "", cache_key("b", "", "m"): ""}, companies)
+    cache.put_many({cache_key("c", "", "m"): ""}, companies)
+    assert calls == []
+
+    cache.put_many({cache_key("d", "", "m"): ""}, companies)
+    assert calls == [1]
+    assert cache.stats()["entries"] == 3
+    cache.put_many({cache_key("e", "", "m"): ""}, companies)
+    assert calls == [1, 1]
@@ -0,0 +1,54 @@
+"""
+Test batched Gemini client classification (no network - Gemini calls patched).
+"""
+
+import json
+
+from src import gemini_client
+from src.gemini_client import detect_clients_batch, _chunk_items
+
+COMPANIES = ["Michelin", "Wurth", "Veronesi"]
+
+
+def test_batch_validates_items_and_falls_back(monkeypatch):
+    """Valid answers are used; missing/invalid ids go to single-event calls."""
+    batch_prompts = []
+    single_calls = []
+
+    def fake_json(prompt):
+        batch_prompts.append(prompt)
+        return [
+            {"id": "a", "client": "michelin"},
+            {"id": "b", "client": "Unknown"},
+            {"id": "c", "client": "Not A Client"},
+            {"id": "zzz", "client": "Wurth"},
+        ]
+
+    def fake_single(title, external_domains, company_names):
+        single_calls.append(title)
+        return "Veronesi" if title == "Riunione" else None
+
+    monkeypatch.setattr(gemini_client, "call_gemini_json", fake_json)
+    monkeypatch.setattr(gemini_client, "classify_client", fake_single)
+
+    items = [
+        {"id": "a", "title": "Tyre demo", "external_domains": "michelin.com"},
+        {"id": "b", "title": "Team sync", "external_domains": ""},
+        {"id": "c", "title": "Riunione", "external_domains": "veronesi.it"},
+        {"id": "d", "title": "Wurth call", "external_domains": ""},
+    ]
+    results = detect_clients_batch(items, COMPANIES)
+
+    assert len(batch_prompts) == 1
+    # "d" failed in the single-event fallback too, so it is left out
+    assert results == {"a": "Michelin", "b": "", "c": "Veronesi"}
+    assert single_calls == ["Riunione", "Wurth call"]
+    assert json.loads(batch_prompts[0].split("Meetings (JSON): ")[1].split("\n")[0])[0]["id"] == "a"
+
+
+def test_chunking_respects_size_and_token_budget():
+    """Batches are bounded by batch_size and estimated prompt tokens."""
+    items = [{"id": str(i), "title": "x" * 400, "external_domains": ""} for i in range(10)]
+
+    assert [len(c) for c in _chunk_items(items, COMPANIES, batch_size=4, max_prompt_tokens=100000)] == [4, 4, 2]
+    assert all(len(c) <= 2 for c in _chunk_items(items, COMPANIES, batch_size=40, max_prompt_tokens=400))
@@ -0,0 +1,59 @@
+"""
+Test the compiled keyword client matcher against the original nested loop.
+"""
+
+import random
+
+from src.mapper import ClientMatcher, extract_client_from_title_keywords, get_client_matcher
+from src.text_utils import normalize_text
+
+
+def _reference_match(title: str, company_names: list[str]) -> str | None:
+    """Original O(companies x words) implementation."""
+    title_normalized = normalize_text(title)
+    for company in company_names:
+        company_normalized = normalize_text(company)
+        if company_normalized in title_normalized:
+            return company
+        for word in company_normalized.split():
+            if len(word) > 3 and word in title_normalized:
+                return company
+    return None
+
+
+COMPANIES = ["IBM", "Würth Industry", "Michelin", "Veronesi Holding", "Merz Pharma", "Sun", "Industry Partners"]
+
+
+def test_precedence_matches_original():
+    """First company in list wins, full names and significant words both count."""
+    cases = [
+        "Wurthindustry demo",
+        "IBM sync",
+        "Michelin / Merz joint session",
+        "Industry day",
+        "Sunday planning",
+        "Internal alignment call",
+        "Veronesi workshop",
+    ]
+    for title in cases:
+        assert extract_client_from_title_keywords(title, COMPANIES) == _reference_match(title, COMPANIES), title
+
+
+def test_randomized_equivalence():
+    """Random titles built from company fragments give identical results."""
+    rng = random.Random(7)
+    fragments = [w for c in COMPANIES for w in normalize_text(c).split()] + ["call", "demo", "prep", "ibmx", "pharm"]
+    for _ in range(500):
+        title = " ".join(rng.choice(fragments) for _ in range(rng.randint(1, 4)))
+        assert ClientMatcher(COMPANIES).match(title) == _reference_match(title, COMPANIES), title
+
+
+def test_candidates_and_rebuild():
+    """All candidates are returned in precedence order; matcher is reused."""
+    matcher = ClientMatcher(COMPANIES)
+    assert matcher.candidates("Michelin and Merz and Wurth") == ["Würth Industry", "Michelin", "Merz Pharma"]
+
+    names = list(COMPANIES)
+    assert get_client_matcher(names) is get_client_matcher(names)
+    assert get_client_matcher(names) is get_client_matcher(list(COMPANIES))
+    assert get_client_matcher(names + ["Acme"]) is not get_client_matcher(names)
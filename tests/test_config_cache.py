@@ -0,0 +1,52 @@
+"""
+Test the memoized, mtime-invalidated config registry.
+"""
+
+import os
+
+import pytest
+
+from src.config import ConfigRegistry, FrozenDict, get_settings
+
+
+def test_config_parsed_once_until_file_changes(tmp_path):
+    """Repeated loads hit the cache; a modified file is re-parsed."""
+    config_file = tmp_path / "sample.yaml"
+    config_file.write_text("ai:\n  enabled: true\n", encoding="utf-8")
+
+    registry = ConfigRegistry(tmp_path)
+    first = registry.load("sample.yaml")
+    second = registry.load("sample.yaml")
+
+    assert first is second
+    assert registry.stats()["misses"] == 1
+    assert registry.stats()["hits"] == 1
+
+    config_file.write_text("ai:\n  enabled: false\n  model: x\n", encoding="utf-8")
+    stat = config_file.stat()
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    third = registry.load("sample.yaml")
+    assert third["ai"]["enabled"] is False
+    assert registry.stats()["misses"] == 2
+
+
+def test_config_objects_are_read_only(tmp_path):
+    """Cached config cannot be mutated by callers."""
+    (tmp_path / "sample.yaml").write_text("categories:\n  - PERSONAL\nnested:\n  key: 1\n", encoding="utf-8")
+
+    config = ConfigRegistry(tmp_path).load("sample.yaml")
+
+    assert isinstance(config, FrozenDict)
+    assert config["categories"] == ("PERSONAL",)
+    with pytest.raises(TypeError):
+        config["nested"]["key"] = 2
+    with pytest.raises(TypeError):
+        config.update({"other": 1})
+
+
+def test_settings_paths_expanded():
+    """get_settings() still expands environment variables in paths."""
+    settings = get_settings()
+    assert "${" not in settings["paths"]["calendar_input"]
+    assert settings is get_settings()
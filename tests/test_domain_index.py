@@ -0,0 +1,51 @@
+"""
+Test the learned external-domain -> client index.
+"""
+
+from src.domain_index import DomainIndex
+
+COMPANIES = ["Michelin", "Wurth", "Veronesi"]
+
+
+def test_confident_single_client_domain_resolves():
+    """Domains seen often enough with one client resolve without AI."""
+    index = DomainIndex(min_support=2, min_confidence=0.9)
+    index.add("michelin.com", "Michelin")
+    index.add("michelin.com, partner.com", "Michelin")
+    index.add("partner.com", "Wurth")
+
+    assert index.lookup("MICHELIN.COM") == ("Michelin", 2, 1.0)
+    assert index.lookup("partner.com") is None  # 50/50 - not confident
+    assert index.resolve("michelin.com,unknown.org", COMPANIES) == "Michelin"
+    assert index.resolve("partner.com", COMPANIES) is None
+    assert index.resolve("", COMPANIES) is None
+
+
+def test_disputed_domain_falls_back_to_ai():
+    """A meeting with any domain seen for several clients is left to AI."""
+    index = DomainIndex(min_support=2, min_confidence=0.9)
+    index.add("michelin.com, partner.com", "Michelin")
+    index.add("michelin.com", "Michelin")
+    index.add("partner.com", "Wurth")
+    index.add("gmail.com", "")
+
+    assert index.disputed("partner.com")
+    assert not index.disputed("michelin.com")
+    assert not index.disputed("gmail.com")
+    assert index.resolve("partner.com,michelin.com", COMPANIES) is None
+    assert index.resolve("gmail.com,michelin.com", COMPANIES) == "Michelin"
+
+
+def test_low_support_conflicts_and_removed_clients_fall_back():
+    """Insufficient support, conflicting domains or unknown clients give None."""
+    index = DomainIndex(min_support=2, min_confidence=0.9)
+    index.add("wurth.de", "Wurth")
+    assert index.resolve("wurth.de", COMPANIES) is None
+
+    index.add("wurth.de", "Wurth")
+    index.add_seed("veronesi.it", "Veronesi")
+    index.add_seed("acme.com", "Acme")
+    assert index.resolve("wurth.de", COMPANIES) == "Wurth"
+    assert index.resolve("veronesi.it", COMPANIES) == "Veronesi"
+    assert index.resolve("wurth.de,veronesi.it", COMPANIES) is None
+    assert index.resolve("acme.com", COMPANIES) is None
@@ -0,0 +1,64 @@
+"""
+Test the compact Event representation and the stages consuming it.
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+from src.events import Event, as_event, parse_minutes, format_minutes, week_key, weekday
+from src.excel_preview import get_week_beginning, split_multiday_events
+from src.gap_filler import find_empty_slots
+from src.overlap import resolve_overlaps_by_hour
+
+
+def _event(start, end, category="ADMIN", **extra):
+    return {"start": start, "end": end, "category": category, "title": "t", "minutes": 60, **extra}
+
+
+def test_minutes_round_trip_and_week_key():
+    for value in ["1970-01-01 00:00", "2025-12-07 09:15", "2024-02-29 23:59"]:
+        assert format_minutes(parse_minutes(value)) == value
+
+    for offset in range(-400, 400, 13):
+        day = datetime(2025, 12, 10) + timedelta(days=offset)
+        sunday = day - timedelta(days=(day.weekday() + 1) % 7)
+        number = parse_minutes(day.strftime("%Y-%m-%d")) // 1440
+        assert weekday(number) == day.weekday()
+        assert week_key(number) == sunday.strftime("%Y-%m-%d")
+        assert get_week_beginning(day.strftime("%Y-%m-%d %H:%M")) == sunday.strftime("%Y-%m-%d")
+
+
+def test_event_fields_and_dict_access():
+    event = Event.from_dict(_event("2025-12-10 09:00", "2025-12-10 10:30", external_domains="Acme.com; b.de"))
+    assert event.week == "2025-12-07"
+    assert event.domains == ("acme.com", "b.de")
+    assert event.category is sys.intern("ADMIN")
+    assert event["start"] == "2025-12-10 09:00"
+    assert event.get("external_domains") == "Acme.com; b.de"
+    assert event.get("unknown", "x") == "x"
+    assert not hasattr(event, "__dict__")
+    assert as_event(event) is event
+
+
+def test_overlap_uses_absolute_hours():
+    events = [
+        _event("2025-12-16 15:30", "2025-12-16 17:00", "Training"),
+        _event("2025-12-16 16:00", "2025-12-16 17:00", "Discovery"),
+        _event("2025-12-16 23:00", "2025-12-17 01:00", "Training"),
+    ]
+    resolved = resolve_overlaps_by_hour(events, lambda e: e["category"])
+    assert [(e.category, e.minutes) for e in resolved] == [("Training", 60), ("Discovery", 60), ("Training", 120)]
+
+
+def test_split_multiday_recomputes_week():
+    event = _event("2025-12-12", "2025-12-16", "TIME OFF", all_day=True, minutes=4 * 1440)
+    days = split_multiday_events([event])
+    assert [(e.start, e.end, e.week) for e in days] == [
+        ("2025-12-12 09:00", "2025-12-12 17:00", "2025-12-07"),
+        ("2025-12-15 09:00", "2025-12-15 17:00", "2025-12-14"),
+    ]
+
+
+def test_find_empty_slots():
+    events = [_event("2025-12-10 09:00", "2025-12-10 10:30"), _event("2025-12-11 09:00", "2025-12-11 17:00")]
+    assert find_empty_slots(events, datetime(2025, 12, 10)) == [(11, 17)]
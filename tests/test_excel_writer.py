@@ -0,0 +1,50 @@
+"""
+Test the single-pass formatted Excel writer.
+"""
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from src.excel_writer import write_excel_with_formatting
+
+
+def _preview():
+    return pd.DataFrame([
+        {"week_beginning": "2025-12-14", "category": "Admin", "client": "", "hours": 2.0,
+         "opportunity_id": "", "comments": "Expenses", "needs_review": False, "is_autofilled": False},
+        {"week_beginning": "2025-12-14", "category": "Training", "client": None, "hours": 1.5,
+         "opportunity_id": "", "comments": "A rather long autofilled comment " * 3, "needs_review": True,
+         "is_autofilled": True},
+        {"week_beginning": "2025-12-14", "category": ">>> WEEK TOTAL", "client": "", "hours": 3.5,
+         "opportunity_id": "", "comments": "Total: 3.5h / 40h = 9%", "needs_review": False,
+         "is_autofilled": False},
+    ])
+
+
+def test_round_trip_and_formatting(tmp_path):
+    df = _preview()
+    path = tmp_path / "preview.xlsx"
+    write_excel_with_formatting(df, path)
+
+    expected = df.copy()
+    # Empty strings and None come back as empty cells
+    expected["client"] = [float("nan")] * 3
+    expected["opportunity_id"] = float("nan")
+    pd.testing.assert_frame_equal(pd.read_excel(path), expected, check_dtype=False)
+
+    ws = load_workbook(path)["Time Entries"]
+    table = ws.tables["TimeEntries"]
+    assert table.ref == "A1:H4"
+    assert [column.name for column in table.tableColumns] == list(df.columns)
+    assert ws["A1"].font.b
+
+    # Widths: longest non-empty value (or header) + 2, capped at 50
+    assert ws.column_dimensions["A"].width == len("week_beginning") + 2
+    assert ws.column_dimensions["B"].width == len(">>> WEEK TOTAL") + 2
+    assert ws.column_dimensions["F"].width == 50
+
+    # Row colors are conditional formats on the data range, WEEK TOTAL first
+    (cf_range, rules), = [(str(cf.sqref), cf.rules) for cf in ws.conditional_formatting]
+    assert cf_range == "A2:H4"
+    assert [rule.formula for rule in rules] == [['$B2=">>> WEEK TOTAL"'], ["$H2=TRUE"], ["TRUE"]]
+    assert [rule.dxf.fill.bgColor.rgb[-6:] for rule in rules] == ["FF6B6B", "FFFF00", "90EE90"]
@@ -0,0 +1,46 @@
+"""
+Test vectorized gap detection on the occupancy matrix.
+"""
+
+from datetime import datetime
+
+from src import gap_filler
+from src.events import Event, parse_minutes
+from src.gap_filler import build_occupancy, empty_hours_per_day, weekly_empty_hours
+
+
+def _event(start, end):
+    return Event(parse_minutes(start), parse_minutes(end), "ADMIN")
+
+
+def test_occupancy_paints_intervals_at_slot_resolution():
+    first_day = parse_minutes("2025-12-15") // 1440
+    events = [
+        _event("2025-12-15 09:00", "2025-12-15 09:20"),   # partial slot counts as busy
+        _event("2025-12-15 23:30", "2025-12-16 10:00"),   # crosses midnight
+        _event("2025-12-10 09:00", "2025-12-10 17:00"),   # before horizon
+    ]
+    occupancy = build_occupancy(events, first_day, 2, slot_minutes=15)
+
+    assert occupancy.shape == (2, 96)
+    assert occupancy[0, 36:38].tolist() == [True, True]
+    assert not occupancy[0, 38]
+    assert occupancy[0, 94:].all() and occupancy[1, :40].all() and not occupancy[1, 40]
+    assert empty_hours_per_day(occupancy, 9, 17, 15).tolist() == [7.5, 7.0]
+
+
+def test_weekly_empty_hours_counts_workdays_only(monkeypatch):
+    monkeypatch.setattr(gap_filler, "get_work_hours", lambda: (9, 17))
+    events = [
+        _event("2025-12-15 09:00", "2025-12-15 12:15"),
+        _event("2025-12-20 09:00", "2025-12-20 17:00"),   # Saturday
+        _event("2025-12-22 09:00", "2025-12-26 17:00"),   # whole next week
+    ]
+    result = weekly_empty_hours(events, ["2025-12-14", "2025-12-21"], slot_minutes=15)
+    assert result == {"2025-12-14": 40 - 3.25, "2025-12-21": 0.0}
+
+
+def test_find_empty_slots_uses_configured_work_hours(monkeypatch):
+    monkeypatch.setattr(gap_filler, "get_work_hours", lambda: (8, 18))
+    slots = gap_filler.find_empty_slots([_event("2025-12-15 10:30", "2025-12-15 12:00")], datetime(2025, 12, 15))
+    assert slots == [(8, 10), (12, 18)]
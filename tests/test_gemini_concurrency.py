@@ -0,0 +1,72 @@
+"""
+Test concurrent Gemini dispatch: ordering, in-flight bound and rate limit.
+"""
+
+import threading
+import time
+
+from src.gemini_client import RateLimiter, run_concurrently
+
+
+def test_results_in_order_with_bounded_concurrency():
+    """Results follow input order; never more than max_in_flight at once."""
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(i):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01 * (5 - i % 5))
+        with lock:
+            in_flight -= 1
+        return i * 10
+
+    assert run_concurrently(work, range(12), max_in_flight=3, limiter=RateLimiter(0)) == [i * 10 for i in range(12)]
+    assert 1 < peak <= 3
+
+
+def test_rate_limiter_spaces_requests_after_burst():
+    """After the burst, tokens refill at requests_per_minute / 60 per second."""
+    limiter = RateLimiter(requests_per_minute=600, burst=2)  # 10/s
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.15 <= elapsed < 1.0
+
+
+def test_client_created_once_and_shared_across_threads(monkeypatch):
+    """All threads get the same pooled client until close_client()."""
+    from src import gemini_client
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    gemini_client.close_client()
+
+    clients = run_concurrently(lambda _: gemini_client.get_client(), range(8), max_in_flight=4, limiter=RateLimiter(0))
+    assert len({id(c) for c in clients}) == 1
+
+    gemini_client.close_client()
+    assert gemini_client.get_client() is not clients[0]
+    gemini_client.close_client()
+
+
+def test_budgets_split_across_worker_processes(monkeypatch):
+    """Pool workers each get their share of requests per minute and in-flight requests."""
+    from src import gemini_client
+
+    monkeypatch.setattr(gemini_client, "get_settings",
+                        lambda: {"ai": {"requests_per_minute": 60, "max_concurrency": 4}})
+    monkeypatch.setattr(gemini_client, "_process_share", {"workers": 1})
+    monkeypatch.setattr(gemini_client, "_limiter", {"instance": None, "key": None})
+    assert gemini_client.get_ai_limits() == (60.0, 4)
+
+    gemini_client.reset_after_fork(3)
+    assert gemini_client.get_ai_limits() == (20.0, 1)
+    assert gemini_client.get_rate_limiter().capacity == 1
+
+    gemini_client.reset_after_fork(100)
+    assert gemini_client.get_ai_limits() == (1.0, 1)
+    gemini_client.close_client()
@@ -0,0 +1,109 @@
+"""
+Test incremental preview regeneration (only weeks with changed input are recomputed).
+"""
+
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from src.excel_preview import generate_final_preview
+
+
+@pytest.fixture
+def calendar(calendar_export):
+    """Three weeks of events; returns (export, events, monday)."""
+    monday, event = calendar_export.monday(3), calendar_export.event
+    events = []
+    for week in range(3):
+        day = calendar_export.day(monday, week * 7)
+        events.append(event(f"{day} 09:00", f"{day} 10:00", "CUSTOMER PRES/DEMO", "Michelin demo", "michelin.com"))
+        events.append(event(f"{day} 10:00", f"{day} 12:00", "ADMIN", f"Expenses {week}"))
+    calendar_export.write(events)
+    return calendar_export, events, monday
+
+
+def _run(path, **kwargs):
+    return generate_final_preview(path, fill=True, weeks_back=5, use_ai=False, **kwargs)
+
+
+def test_unchanged_input_reuses_every_week(calendar, tmp_path):
+    path = tmp_path / "preview.xlsx"
+    first = _run(path)
+    assert first.attrs["reused_weeks"] == []
+    written = pd.read_excel(path)
+
+    second = _run(path)
+    assert second.attrs["recomputed_weeks"] == []
+    assert second.attrs["reused_weeks"] == first.attrs["recomputed_weeks"]
+    pd.testing.assert_frame_equal(pd.read_excel(path), written)
+
+
+def test_changed_week_matches_full_rebuild(calendar, tmp_path):
+    export, events, monday = calendar
+    path = tmp_path / "preview.xlsx"
+    weeks = _run(path).attrs["recomputed_weeks"]
+
+    day = export.day(monday, 8)
+    export.write(events + [export.event(f"{day} 13:00", f"{day} 15:00", "INTERNAL", "Planning")])
+    result = _run(path)
+
+    assert result.attrs["recomputed_weeks"] == [weeks[1]]
+    incremental = pd.read_excel(path)
+    _run(tmp_path / "full.xlsx", incremental=False)
+    pd.testing.assert_frame_equal(incremental, pd.read_excel(tmp_path / "full.xlsx"))
+
+
+def test_event_crossing_into_changed_week_recomputes_its_own_week(calendar, tmp_path):
+    export, events, monday = calendar
+    saturday, sunday = export.day(monday, 5), export.day(monday, 6)
+    events = events + [export.event(f"{saturday} 23:00", f"{sunday} 01:00", "ADMIN", "Late call")]
+    export.write(events)
+    path = tmp_path / "preview.xlsx"
+    weeks = _run(path).attrs["recomputed_weeks"]
+
+    # New event overlaps the first week's late call on Sunday (second week)
+    export.write(events + [export.event(f"{sunday} 00:00", f"{sunday} 01:00", "CUSTOMER PRES/DEMO", "Michelin call", "michelin.com")])
+    assert _run(path).attrs["recomputed_weeks"] == weeks[:2]
+    _run(tmp_path / "full.xlsx", incremental=False)
+    pd.testing.assert_frame_equal(pd.read_excel(path), pd.read_excel(tmp_path / "full.xlsx"))
+
+
+def test_edited_crossing_event_recomputes_both_weeks(calendar, tmp_path):
+    export, events, monday = calendar
+    saturday, sunday = export.day(monday, 5), export.day(monday, 6)
+    call = export.event(f"{sunday} 00:00", f"{sunday} 01:00", "CUSTOMER PRES/DEMO", "Michelin call", "michelin.com")
+    export.write(events + [export.event(f"{saturday} 23:00", f"{sunday} 01:00", "ADMIN", "Late call"), call])
+    path = tmp_path / "preview.xlsx"
+    weeks = _run(path).attrs["recomputed_weeks"]
+
+    # Late call now ends later on Sunday, where it no longer loses to the Michelin call
+    export.write(events + [export.event(f"{saturday} 23:00", f"{sunday} 03:00", "ADMIN", "Late call"), call])
+    assert _run(path).attrs["recomputed_weeks"] == weeks[:2]
+    _run(tmp_path / "full.xlsx", incremental=False)
+    pd.testing.assert_frame_equal(pd.read_excel(path), pd.read_excel(tmp_path / "full.xlsx"))
+
+
+def test_manual_edits_of_unchanged_weeks_are_kept(calendar, tmp_path):
+    export, events, monday = calendar
+    path = tmp_path / "preview.xlsx"
+    _run(path)
+
+    wb = load_workbook(path)
+    ws = wb.active
+    ws["F2"] = "Edited by hand"
+    wb.save(path)
+
+    day = export.day(monday, 15)
+    export.write(events + [export.event(f"{day} 13:00", f"{day} 15:00", "INTERNAL", "Planning")])
+    result = _run(path)
+
+    assert len(result.attrs["reused_weeks"]) == 2
+    assert pd.read_excel(path)["comments"].iloc[0] == "Edited by hand"
+
+
+def test_option_change_recomputes_everything(calendar, tmp_path):
+    path = tmp_path / "preview.xlsx"
+    _run(path)
+    result = generate_final_preview(path, fill=False, weeks_back=5, use_ai=False)
+    assert result.attrs["reused_weeks"] == []
+    assert not result["is_autofilled"].any()
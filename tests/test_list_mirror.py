@@ -0,0 +1,214 @@
+"""
+Test the SharePoint list mirror (delta sync) and diff-based week sync.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+import pytest
+
+from src import sharepoint, list_mirror, upload_ledger
+from src.list_mirror import ListMirror, sync_mirror
+
+ME = "user-1"
+
+
+class FakeListHandler(BaseHTTPRequestHandler):
+    """List items with a change log; delta pages hold 2 changes each."""
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, result=None):
+        payload = json.dumps(result).encode() if result is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        return json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+    def _change(self, item_id):
+        self.server.log.append(item_id)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        base = f"http://127.0.0.1:{self.server.server_port}/items/delta"
+        if url.path == "/me":
+            return self._send(self.server.me_status, {"id": ME} if self.server.me_status == 200 else {})
+        if url.path != "/items/delta":
+            return self._send(404, {})
+        self.server.delta_calls.append(self.path)
+
+        start = int(query.get("token", ["0"])[0]) + int(query.get("skip", ["0"])[0])
+        changes = list(dict.fromkeys(self.server.log[start:]))
+        page = changes[:2]
+        values = []
+        for item_id in page:
+            item = self.server.items.get(item_id)
+            if item is None:
+                values.append({"id": item_id, "@removed": {"reason": "deleted"}})
+            else:
+                values.append({"id": item_id, "fields": item["fields"], "createdBy": {"user": {"id": item["owner"]}}})
+        result = {"value": values}
+        token = int(query.get("token", ["0"])[0])
+        skip = int(query.get("skip", ["0"])[0]) + len(page)
+        if len(changes) > 2:
+            result["@odata.nextLink"] = f"{base}?token={token}&skip={skip}"
+        else:
+            result["@odata.deltaLink"] = f"{base}?token={len(self.server.log)}"
+        self._send(200, result)
+
+    def do_POST(self):
+        fields = self._body()["fields"]
+        self.server.next_id += 1
+        item_id = str(self.server.next_id)
+        self.server.items[item_id] = {"fields": fields, "owner": ME}
+        self.server.ops.append(("create", item_id))
+        self._change(item_id)
+        self._send(201, {"id": item_id, "fields": fields})
+
+    def do_PATCH(self):
+        item_id = self.path.split("/")[-2]
+        self.server.items[item_id]["fields"].update(self._body())
+        self.server.ops.append(("update", item_id))
+        self._change(item_id)
+        self._send(200, self.server.items[item_id]["fields"])
+
+    def do_DELETE(self):
+        item_id = self.path.split("/")[-1]
+        self.server.items.pop(item_id, None)
+        self.server.ops.append(("delete", item_id))
+        self._change(item_id)
+        self._send(204)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_list(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeListHandler)
+    server.items, server.log, server.ops, server.delta_calls, server.next_id = {}, [], [], [], 0
+    server.me_status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(sharepoint, "get_graph_url", lambda: f"{base}/items")
+    monkeypatch.setattr(sharepoint, "get_graph_me_url", lambda: f"{base}/me")
+    monkeypatch.setattr(upload_ledger, "get_ledger_path", lambda: tmp_path / "upload_ledger.sqlite")
+    monkeypatch.setattr(list_mirror, "get_mirror_path", lambda: tmp_path / "list_mirror.sqlite")
+    yield server
+    server.shutdown()
+
+
+def _seed(server, item_id, owner=ME, **fields):
+    server.items[item_id] = {"fields": {"WeekBeginning": "2025-12-07", **fields}, "owner": owner}
+    server.log.append(item_id)
+
+
+def test_delta_sync_pages_and_applies_changes(fake_list, tmp_path):
+    for i in range(5):
+        _seed(fake_list, f"s{i}", Category="Admin", Hours=1)
+    mirror = ListMirror(tmp_path / "mirror.sqlite")
+
+    with sharepoint.Uploader("token", concurrency=2) as uploader:
+        first = sync_mirror(mirror, uploader)
+        assert (first["pages"], first["upserted"], first["full"]) == (3, 5, True)
+
+        fake_list.items.pop("s1")
+        fake_list.log.append("s1")
+        _seed(fake_list, "s9", Category="Support", Hours=2)
+        second = sync_mirror(mirror, uploader)
+
+    assert (second["upserted"], second["deleted"], second["full"]) == (1, 1, False)
+    assert sorted(i["id"] for i in mirror.items()) == ["s0", "s2", "s3", "s4", "s9"]
+    assert mirror.week_summary(owner=ME)["2025-12-07"] == {"items": 5, "hours": 6.0}
+
+
+def test_plan_week_operations():
+    items = [
+        {"id": "1", "category": "Admin", "hours": 2.0, "comments": "", "opportunity_id": "", "account_name": "",
+         "created_by": ME},
+        {"id": "2", "category": "POC", "hours": 3.0, "comments": "old", "opportunity_id": "42", "account_name": "Acme",
+         "created_by": ME},
+        {"id": "3", "category": "Travel", "hours": 1.0, "comments": "", "opportunity_id": "", "account_name": "",
+         "created_by": ME},
+        {"id": "4", "category": "Training", "hours": 8.0, "comments": "", "opportunity_id": "", "account_name": "",
+         "created_by": "someone-else"},
+    ]
+    rows = [
+        {"week_beginning": "2025-12-07", "category": "Admin", "hours": 2, "comments": None},
+        {"week_beginning": "2025-12-07", "category": "POC", "hours": 4.0, "comments": "new",
+         "opportunity_id": 42.0, "client": "Acme"},
+        {"week_beginning": "2025-12-07", "category": "Training", "hours": 1.0},
+    ]
+    plan = sharepoint.plan_week_operations(rows, items, ME)
+
+    assert plan["unchanged"] == 1
+    assert [item_id for item_id, _ in plan["matched"]] == ["1"]
+    assert [(item_id, row["category"]) for item_id, row in plan["update"]] == [("2", "POC")]
+    # Someone else's Training item is neither updated nor deleted
+    assert [row["category"] for row in plan["create"]] == ["Training"]
+    assert plan["delete"] == ["3"]
+
+    with pytest.raises(ValueError):
+        sharepoint.plan_week_operations(rows, items, "")
+
+
+def test_sync_weeks_sends_only_needed_operations(fake_list):
+    _seed(fake_list, "a", Category="Admin", Hours=2.0)
+    _seed(fake_list, "b", Category="Travel", Hours=1.0)
+    _seed(fake_list, "x", owner="someone-else", Category="Travel", Hours=5.0)
+    df = pd.DataFrame([
+        {"week_beginning": "2025-12-07", "category": "Admin", "hours": 2.0, "comments": "", "client": "", "opportunity_id": ""},
+        {"week_beginning": "2025-12-07", "category": "Training", "hours": 3.0, "comments": "", "client": "", "opportunity_id": ""},
+        {"week_beginning": "2025-12-07", "category": ">>> WEEK TOTAL", "hours": 5.0, "comments": "", "client": "", "opportunity_id": ""},
+    ])
+
+    dry = sharepoint.sync_weeks(df, ["2025-12-07"], access_token="token", dry_run=True)
+    assert dry["totals"] == {"create": 1, "update": 0, "delete": 1, "unchanged": 1}
+    assert fake_list.ops == []
+
+    result = sharepoint.sync_weeks(df, ["2025-12-07"], access_token="token")
+    assert result["failed"] == []
+    assert sorted(op for op, _ in fake_list.ops) == ["create", "delete"]
+    assert "x" in fake_list.items
+
+    again = sharepoint.sync_weeks(df, ["2025-12-07"], access_token="token")
+    assert again["totals"] == {"create": 0, "update": 0, "delete": 0, "unchanged": 2}
+    assert len(fake_list.ops) == 2
+
+
+def test_sync_weeks_stops_when_signed_in_user_is_unknown(fake_list):
+    fake_list.me_status = 403
+    _seed(fake_list, "x", owner="someone-else", Category="Travel", Hours=5.0)
+    df = pd.DataFrame([
+        {"week_beginning": "2025-12-07", "category": "Admin", "hours": 2.0, "comments": "", "client": "", "opportunity_id": ""},
+    ])
+
+    with pytest.raises(RuntimeError, match="signed-in user"):
+        sharepoint.sync_weeks(df, ["2025-12-07"], access_token="token")
+    assert fake_list.ops == []
+    assert "x" in fake_list.items
+
+
+def test_sync_weeks_keeps_item_ids_in_ledger(fake_list):
+    _seed(fake_list, "a", Category="Admin", Hours=2.0)
+    df = pd.DataFrame([
+        {"week_beginning": "2025-12-07", "category": "Admin", "hours": 2.0, "comments": "", "client": "", "opportunity_id": ""},
+        {"week_beginning": "2025-12-07", "category": "Training", "hours": 3.0, "comments": "", "client": "", "opportunity_id": ""},
+    ])
+    rows = df.to_dict("records")
+    ledger = upload_ledger.get_upload_ledger()
+    fingerprints = upload_ledger.entry_fingerprints(rows)
+    ledger.record(fingerprints[0], rows[0], "a")
+
+    sharepoint.sync_weeks(df, ["2025-12-07"], access_token="token")
+
+    created = [item_id for op, item_id in fake_list.ops if op == "create"]
+    assert ledger.confirmed(fingerprints) == {fingerprints[0]: "a", fingerprints[1]: created[0]}
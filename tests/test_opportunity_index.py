@@ -0,0 +1,56 @@
+"""
+Test OpportunityIndex returns the same (code, needs_review) as the original scan.
+"""
+
+import random
+
+import pandas as pd
+
+from src.project_codes import normalize_project_codes, match_opportunity_id, OpportunityIndex
+
+
+def _reference_match(client, event_title, project_codes):
+    """Original str.contains + iterrows implementation."""
+    if not client:
+        return "", False
+    client_lower = client.lower().strip()
+    matches = project_codes[project_codes["company_lower"].str.contains(client_lower, case=False, na=False)]
+    if matches.empty:
+        return "", False
+    if len(matches) == 1:
+        return matches.iloc[0]["code"], False
+    if event_title:
+        title_lower = event_title.lower()
+        for _, row in matches.iterrows():
+            for word in [w for w in row["description_lower"].split() if len(w) > 3]:
+                if word in title_lower:
+                    return row["code"], False
+    return matches.iloc[0]["code"], True
+
+
+PROJECT_CODES = normalize_project_codes(pd.DataFrame({
+    "JDA OpptyID": ["OP-1", "OP-2", "OP-3", "OP-4", "OP-5", "OP-6"],
+    "Account Name": ["Michelin", "Wurth Industry", "Michelin", "Wurth", "Merz Pharma", "Michelin Italia"],
+    "Opportunity Name": ["Tyre planning", "Inventory optimization", "Demand sensing", "Warehouse", "S&OP", "Demand Planning Italy"],
+}))
+
+
+def test_known_cases():
+    """Single match, description hit, and ambiguous fallback."""
+    assert match_opportunity_id("Merz Pharma", "Kickoff", PROJECT_CODES) == ("OP-5", False)
+    assert match_opportunity_id("Michelin", "Demand review", PROJECT_CODES) == ("OP-3", False)
+    assert match_opportunity_id("Michelin", "Weekly call", PROJECT_CODES) == ("OP-1", True)
+    assert match_opportunity_id("Acme", "Weekly call", PROJECT_CODES) == ("", False)
+    assert match_opportunity_id("", "Weekly call", PROJECT_CODES) == ("", False)
+
+
+def test_randomized_equivalence():
+    """Random clients/titles give identical results to the original."""
+    rng = random.Random(11)
+    clients = ["Michelin", "michelin ", "Wurth", "Industry", "Merz", "Pharma", "Ital", "mi", "Acme", ""]
+    words = ["demand", "tyre", "inventory", "warehouse", "planning", "call", "italy", "review"]
+    index = OpportunityIndex(PROJECT_CODES)
+    for _ in range(300):
+        client = rng.choice(clients)
+        title = " ".join(rng.choice(words) for _ in range(rng.randint(0, 3)))
+        assert index.match(client, title) == _reference_match(client, title, PROJECT_CODES), (client, title)
@@ -0,0 +1,50 @@
+"""
+Test the sweep-line overlap resolver.
+"""
+
+import pytest
+
+from src.overlap import resolve_overlaps, resolve_overlaps_by_hour
+
+
+def _event(title, start, end, category):
+    return {"title": title, "category": category, "start": start, "end": end, "minutes": 0}
+
+
+def _minutes(events):
+    return {e.title: e.minutes for e in events}
+
+
+CATEGORY = lambda e: e["category"]  # noqa: E731
+
+
+def test_short_overlap_only_costs_its_minutes_at_fine_granularity():
+    events = [
+        _event("workshop", "2025-12-16 09:00", "2025-12-16 11:00", "Training"),
+        _event("customer call", "2025-12-16 10:45", "2025-12-16 11:00", "Discovery"),
+    ]
+    assert _minutes(resolve_overlaps_by_hour(events, CATEGORY)) == {"workshop": 60, "customer call": 60}
+    assert _minutes(resolve_overlaps(events, CATEGORY, 15)) == {"workshop": 105, "customer call": 15}
+    assert _minutes(resolve_overlaps(events, CATEGORY, 1)) == {"workshop": 105, "customer call": 15}
+
+
+def test_equal_priority_goes_to_earlier_event():
+    events = [
+        _event("first", "2025-12-16 15:00", "2025-12-16 16:00", "Internal Meeting"),
+        _event("second", "2025-12-16 15:00", "2025-12-16 16:30", "Internal Meeting"),
+    ]
+    assert _minutes(resolve_overlaps(events, CATEGORY, 1)) == {"first": 60, "second": 30}
+
+
+def test_long_block_is_split_around_higher_priority_events():
+    events = [
+        _event("offsite", "2025-12-15 00:00", "2025-12-20 00:00", "Travel"),
+        _event("demo", "2025-12-17 13:00", "2025-12-17 14:30", "Customer - Demo/ Presentation"),
+        _event("private", "2025-12-17 08:00", "2025-12-17 09:00", None),
+    ]
+    assert _minutes(resolve_overlaps(events, CATEGORY, 15)) == {"offsite": 5 * 1440 - 90, "demo": 90}
+
+
+def test_invalid_granularity():
+    with pytest.raises(ValueError):
+        resolve_overlaps([], CATEGORY, 0)
@@ -0,0 +1,65 @@
+"""
+Test that computing weeks in a process pool gives the same preview as a serial run.
+"""
+
+import pandas as pd
+
+from src.excel_preview import generate_final_preview
+
+
+def test_workers_match_serial_run(calendar_export, tmp_path):
+    monday, day_of, event = calendar_export.monday(4), calendar_export.day, calendar_export.event
+    events = []
+    for week in range(4):
+        day, saturday, sunday = (day_of(monday, week * 7 + offset) for offset in (0, 5, 6))
+        events += [
+            event(f"{day} 09:00", f"{day} 11:00", "CUSTOMER PRES/DEMO", "Michelin demo", "michelin.com"),
+            event(f"{day} 10:00", f"{day} 12:00", "INTERNAL", f"Team sync {week}"),
+            event(f"{day} 13:00", f"{day} 14:00", "ADMIN", "Expenses"),
+            event(f"{saturday} 23:00", f"{sunday} 01:00", "CUSTOMER PRES/DEMO", "Acme go-live", "acme.com"),
+            # Crosses into the next week, where a higher-priority event takes one of its hours
+            event(f"{saturday} 22:00", f"{sunday} 03:00", "ADMIN", f"Late admin {week}"),
+            event(f"{sunday} 02:00", f"{sunday} 03:00", "CUSTOMER PRES/DEMO", "Michelin call", "michelin.com"),
+        ]
+    calendar_export.write(events)
+
+    serial = generate_final_preview(tmp_path / "serial.xlsx", weeks_back=6, use_ai=False, incremental=False, workers=1)
+    parallel = generate_final_preview(tmp_path / "parallel.xlsx", weeks_back=6, use_ai=False, incremental=False, workers=3)
+
+    assert serial["week_beginning"].nunique() >= 4
+    pd.testing.assert_frame_equal(parallel, serial)
+    pd.testing.assert_frame_equal(pd.read_excel(tmp_path / "parallel.xlsx"), pd.read_excel(tmp_path / "serial.xlsx"))
+
+
+def test_pool_budget_uses_started_processes(calendar_export, monkeypatch):
+    """With more workers than weeks, Gemini budgets are split by the processes started."""
+    import concurrent.futures
+
+    from src import excel_preview
+    from src.pipeline import PipelineContext
+
+    started = {}
+
+    class InlinePool:
+        def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+            started.update(max_workers=max_workers, initargs=initargs)
+            initializer(*initargs)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def map(self, fn, *iterables):
+            return map(fn, *iterables)
+
+    day = calendar_export.day(calendar_export.monday(1), 0)
+    calendar_export.write([calendar_export.event(f"{day} 09:00", f"{day} 10:00", "ADMIN", "Expenses")])
+    monkeypatch.setattr(concurrent.futures, "ProcessPoolExecutor", InlinePool)
+
+    context = PipelineContext(weeks_back=4, use_ai=False)
+    weeks = sorted(context.events_by_week)
+    excel_preview._compute_weeks_in_pool(context, weeks, False, workers=8)
+    assert started["max_workers"] == len(weeks)
+    assert started["initargs"][1] == len(weeks)
@@ -0,0 +1,170 @@
+"""
+Test parallel SharePoint uploads against a local fake Graph endpoint.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+import requests
+
+from src import sharepoint, throttle, upload_ledger
+
+
+class FakeGraphHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _create(self, fields):
+        """Fake list item creation: 'bad' -> 400, 'flaky' -> 503 and 'throttled' -> 429 on first try."""
+        comments = fields.get("Comments")
+        if comments == "bad":
+            return 400, {"error": {"message": "invalid"}}
+        if comments == "flaky" and comments not in self.server.seen:
+            self.server.seen.add(comments)
+            return 503, {"error": {"message": "busy"}}
+        if comments == "throttled" and comments not in self.server.seen:
+            self.server.seen.add(comments)
+            return 429, {"error": {"message": "too many requests"}}
+        self.server.posted.append(fields)
+        return 201, {"id": str(len(self.server.posted)), "fields": fields}
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path.endswith("$batch"):
+            self.server.batch_calls.append(len(body["requests"]))
+            responses = []
+            for sub in reversed(body["requests"]):
+                status, sub_body = self._create(sub["body"]["fields"])
+                responses.append({"id": sub["id"], "status": status, "body": sub_body})
+            status, result = 200, {"responses": responses}
+        else:
+            status, result = self._create(body["fields"])
+        payload = json.dumps(result).encode()
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_graph(monkeypatch, tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGraphHandler)
+    server.posted = []
+    server.seen = set()
+    server.batch_calls = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(sharepoint, "get_graph_url", lambda: f"http://127.0.0.1:{server.server_port}/items")
+    monkeypatch.setattr(sharepoint, "get_graph_batch_url", lambda: f"http://127.0.0.1:{server.server_port}/$batch")
+    monkeypatch.setattr(upload_ledger, "get_ledger_path", lambda: tmp_path / "upload_ledger.sqlite")
+    yield server
+    server.shutdown()
+
+
+PREVIEW = pd.DataFrame([
+    {"week_beginning": "2025-12-14", "category": "Admin", "hours": 2.0, "comments": "a", "client": "", "opportunity_id": ""},
+    {"week_beginning": "2025-12-07", "category": "Training", "hours": 1.0, "comments": "b", "client": "", "opportunity_id": ""},
+    {"week_beginning": "2025-12-07", "category": "Admin", "hours": 3.0, "comments": "bad", "client": "", "opportunity_id": ""},
+    {"week_beginning": "2025-12-07", "category": ">>> WEEK TOTAL", "hours": 4.0, "comments": "", "client": "", "opportunity_id": ""},
+    {"week_beginning": "2025-12-14", "category": "Support", "hours": 0.5, "comments": "c", "client": "", "opportunity_id": ""},
+])
+
+
+def test_post_all_weeks_keeps_order_and_shape(fake_graph):
+    """Results are grouped per week in row order with the usual totals."""
+    result = sharepoint.post_all_weeks(PREVIEW, access_token="token", concurrency=4)
+
+    assert result["weeks"] == ["2025-12-07", "2025-12-14"]
+    assert [r["category"] for r in result["by_week"]["2025-12-07"]] == ["Training", "Admin"]
+    assert [r["category"] for r in result["by_week"]["2025-12-14"]] == ["Admin", "Support"]
+    assert result["by_week"]["2025-12-07"][1]["success"] is False
+    assert result["totals"] == {"success": 3, "failed": 1, "skipped": 0}
+    assert len(fake_graph.posted) == 3
+
+
+def test_post_week_entries_single_week(fake_graph):
+    """Single-week upload skips the WEEK TOTAL row."""
+    results = sharepoint.post_week_entries(PREVIEW, "2025-12-14", access_token="token", concurrency=2)
+    assert [(r["category"], r["success"]) for r in results] == [("Admin", True), ("Support", True)]
+
+
+def test_batch_upload_maps_sub_responses_and_retries_failed_only(fake_graph, monkeypatch):
+    """$batch packs 20 rows per call; only transient failures are resent."""
+    monkeypatch.setattr(throttle.time, "sleep", lambda _: None)
+    rows = [
+        {"week_beginning": "2025-12-07", "category": "Admin", "hours": 1.0, "comments": f"row {i}"}
+        for i in range(23)
+    ]
+    rows[3]["comments"] = "flaky"
+    rows[21]["comments"] = "bad"
+    df = pd.DataFrame(rows)
+
+    results = sharepoint.post_week_entries(df, "2025-12-07", access_token="token", concurrency=2, batch=True)
+
+    assert [r["success"] for r in results] == [i != 21 for i in range(23)]
+    assert sorted(fake_graph.batch_calls) == [1, 3, 20]
+    assert len(fake_graph.posted) == 22
+
+
+def test_upload_retries_throttled_rows(fake_graph):
+    """429 rows are retried and succeed; throttle stats are reported."""
+    rows = [
+        {"week_beginning": "2025-12-07", "category": "Admin", "hours": 1.0, "comments": c}
+        for c in ["a", "throttled", "b", "flaky"]
+    ]
+    result = sharepoint.post_all_weeks(pd.DataFrame(rows), access_token="token", concurrency=4)
+
+    assert result["totals"] == {"success": 4, "failed": 0, "skipped": 0}
+    assert result["throttle"]["throttled"] == 2
+    assert result["throttle"]["retries"] == 2
+    assert result["throttle"]["min_concurrency"] < 4
+    assert len(fake_graph.posted) == 4
+
+
+def test_rerun_skips_rows_confirmed_in_ledger(fake_graph):
+    """A second run only posts rows that failed before; identical rows count separately."""
+    rows = PREVIEW.to_dict("records") + [
+        {"week_beginning": "2025-12-14", "category": "Support", "hours": 0.5, "comments": "c", "client": "", "opportunity_id": ""},
+    ]
+    df = pd.DataFrame(rows)
+
+    first = sharepoint.post_all_weeks(df, access_token="token", concurrency=2)
+    assert first["totals"] == {"success": 4, "failed": 1, "skipped": 0}
+
+    second = sharepoint.post_all_weeks(df, access_token="token", concurrency=2)
+    assert second["totals"] == {"success": 0, "failed": 1, "skipped": 4}
+    assert [r["skipped"] for r in second["by_week"]["2025-12-14"]] == [True, True, True]
+    assert len(fake_graph.posted) == 4
+
+    forced = sharepoint.post_week_entries(df, "2025-12-14", access_token="token", force=True)
+    assert not any(r["skipped"] for r in forced)
+    assert len(fake_graph.posted) == 7
+
+
+def test_entry_fingerprint_normalizes_excel_values():
+    a = {"week_beginning": "2025-12-07", "category": "POC", "hours": 1, "opportunity_id": 12345.0, "client": float("nan")}
+    b = {"week_beginning": "2025-12-07", "category": "POC", "hours": 1.0, "opportunity_id": "12345", "client": None}
+    assert upload_ledger.entry_fingerprint(a) == upload_ledger.entry_fingerprint(b)
+    assert upload_ledger.entry_fingerprints([a, b])[1].endswith("#2")
+
+
+def test_session_applies_request_timeout(monkeypatch):
+    sent = {}
+
+    def send(self, request, **kwargs):
+        sent.update(kwargs)
+        raise requests.ConnectionError("offline")
+
+    monkeypatch.setattr(sharepoint.HTTPAdapter, "send", send)
+    session = sharepoint.create_session("token", timeout=7)
+    with pytest.raises(requests.ConnectionError):
+        session.get("https://graph.example/me")
+    assert sent["timeout"] == 7
@@ -0,0 +1,23 @@
+"""
+Test that one preview run reads each input once via PipelineContext.
+"""
+
+from src.excel_preview import generate_final_preview
+
+
+def test_final_preview_loads_calendar_and_project_codes_once(calendar_export, tmp_path):
+    day = calendar_export.day(calendar_export.monday(1), 0)
+    event = calendar_export.event
+    calendar_export.write([
+        event(f"{day} 09:00", f"{day} 10:00", "CUSTOMER PRES/DEMO", "Michelin demo", "michelin.com"),
+        event(f"{day} 10:00", f"{day} 12:00", "ADMIN", "Expenses"),
+    ])
+
+    df = generate_final_preview(tmp_path / "preview.xlsx", fill=True, weeks_back=4, use_ai=False)
+
+    assert calendar_export.calls == {"calendar": 1, "codes": 1}
+    rows = df[df["category"] != ">>> WEEK TOTAL"]
+    demo = rows[rows["category"] == "Customer - Demo/ Presentation"].iloc[0]
+    assert (demo["client"], demo["opportunity_id"]) == ("Michelin", "OP-1")
+    assert rows["is_autofilled"].any()
+    assert (tmp_path / "preview.xlsx").exists()
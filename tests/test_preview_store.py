@@ -0,0 +1,74 @@
+"""
+Test the binary sidecar snapshot of the Excel preview.
+"""
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from src import preview_store
+from src.aggregator import add_week_summaries
+from src.config import write_snapshot
+from src.excel_writer import write_excel_with_formatting
+from src.preview_store import get_snapshot_path, load_preview, save_preview_snapshot
+
+
+def _preview():
+    df = pd.DataFrame([
+        {"week_beginning": "2025-12-14", "category": "Admin", "client": "", "hours": 2.0,
+         "opportunity_id": "", "comments": "Expenses", "external_domains": "",
+         "needs_review": False, "is_autofilled": False, "status": "NEW"},
+        {"week_beginning": "2025-12-14", "category": "Discovery", "client": "Acme", "hours": 1.5,
+         "opportunity_id": "12345", "comments": "Kickoff", "external_domains": "acme.com",
+         "needs_review": True, "is_autofilled": False, "status": "NEW"},
+        {"week_beginning": "2025-12-21", "category": "Training", "client": "", "hours": 4.0,
+         "opportunity_id": "", "comments": "Course", "external_domains": "",
+         "needs_review": True, "is_autofilled": True, "status": "NEW"},
+    ])
+    return add_week_summaries(df)
+
+
+def _write(df, path):
+    write_excel_with_formatting(df, path)
+    save_preview_snapshot(df, path)
+
+
+def test_snapshot_matches_workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(preview_store, "stats", {"snapshot_hits": 0, "workbook_reads": 0})
+    path = tmp_path / "preview.xlsx"
+    _write(_preview(), path)
+
+    assert get_snapshot_path(path).exists()
+    result = load_preview(path)
+    pd.testing.assert_frame_equal(result, pd.read_excel(path))
+    assert preview_store.stats == {"snapshot_hits": 1, "workbook_reads": 0}
+
+
+def test_edited_workbook_is_reparsed_and_snapshot_refreshed(tmp_path, monkeypatch):
+    monkeypatch.setattr(preview_store, "stats", {"snapshot_hits": 0, "workbook_reads": 0})
+    path = tmp_path / "preview.xlsx"
+    _write(_preview(), path)
+
+    # Manual edit in Excel: change hours of the first entry
+    wb = load_workbook(path)
+    wb.active["D2"] = 3
+    wb.save(path)
+
+    writes = []
+    monkeypatch.setattr(preview_store, "write_snapshot", lambda *args: writes.append(args) or write_snapshot(*args))
+    assert load_preview(path)["hours"].iloc[0] == 3
+    assert preview_store.stats == {"snapshot_hits": 0, "workbook_reads": 1}
+    # Cells and frame go into the sidecar in one write
+    assert len(writes) == 1 and writes[0][1]["frame"] is not None
+
+    pd.testing.assert_frame_equal(load_preview(path), pd.read_excel(path))
+    assert preview_store.stats == {"snapshot_hits": 1, "workbook_reads": 1}
+
+
+def test_missing_or_corrupt_snapshot_falls_back(tmp_path):
+    path = tmp_path / "preview.xlsx"
+    write_excel_with_formatting(_preview(), path)
+    expected = pd.read_excel(path)
+
+    pd.testing.assert_frame_equal(load_preview(path), expected)
+    get_snapshot_path(path).write_bytes(b"not a pickle")
+    pd.testing.assert_frame_equal(load_preview(path), expected)
@@ -0,0 +1,55 @@
+"""
+Test the project codes repository (in-memory + on-disk snapshot).
+"""
+
+import os
+
+import pandas as pd
+
+from src.project_codes import ProjectCodesRepository
+
+
+def _write_codes(path, companies):
+    pd.DataFrame({
+        "JDA OpptyID": [f"OP-{i}" for i in range(len(companies))],
+        "Account Name": companies,
+        "Opportunity Name": ["Planning" for _ in companies],
+    }).to_excel(path, index=False)
+
+
+def test_workbook_read_once_then_snapshot(tmp_path):
+    """Second process (new repository) loads from snapshot, not openpyxl."""
+    workbook = tmp_path / "codes.xlsx"
+    _write_codes(workbook, ["Michelin", "Wurth"])
+
+    repo = ProjectCodesRepository(cache_dir=tmp_path / "cache")
+    first = repo.normalized(workbook)
+    assert repo.normalized(workbook) is first
+    assert repo.stats["workbook_reads"] == 1
+    assert repo.stats["memory_hits"] == 1
+    assert list(first["company_lower"]) == ["michelin", "wurth"]
+
+    warm_repo = ProjectCodesRepository(cache_dir=tmp_path / "cache")
+    warm = warm_repo.normalized(workbook)
+    assert warm_repo.stats == {"memory_hits": 0, "snapshot_hits": 1, "workbook_reads": 0}
+    pd.testing.assert_frame_equal(warm, first)
+
+
+def test_touched_file_reuses_snapshot_changed_file_rereads(tmp_path):
+    """mtime change with same content keeps snapshot; new content re-reads."""
+    workbook = tmp_path / "codes.xlsx"
+    _write_codes(workbook, ["Michelin"])
+    cache_dir = tmp_path / "cache"
+    version = ProjectCodesRepository(cache_dir=cache_dir).version(workbook)
+
+    stat = workbook.stat()
+    os.utime(workbook, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    repo = ProjectCodesRepository(cache_dir=cache_dir)
+    assert repo.version(workbook) == version
+    assert repo.stats["snapshot_hits"] == 1
+
+    _write_codes(workbook, ["Michelin", "Veronesi"])
+    repo = ProjectCodesRepository(cache_dir=cache_dir)
+    assert repo.version(workbook) != version
+    assert repo.stats["workbook_reads"] == 1
+    assert len(repo.normalized(workbook)) == 2
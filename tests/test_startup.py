@@ -0,0 +1,83 @@
+"""
+Test that run.py starts fast and commands import only what they need.
+
+Each check runs in a fresh interpreter, since the test process itself has
+long since imported pandas and friends.
+"""
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cold `import run` (measured inside the interpreter, not process startup)
+IMPORT_BUDGET_SECONDS = 0.5
+
+HEAVY_MODULES = ("pandas", "numpy", "requests", "openpyxl", "google.genai")
+
+
+def _run(code: str) -> dict:
+    """Run code in a fresh interpreter at the repo root; it prints one JSON line."""
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_run_is_light_and_within_budget():
+    result = _run(f"""
+        import json, sys, time
+        start = time.perf_counter()
+        import run
+        elapsed = time.perf_counter() - start
+        print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+    """)
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_preview_rows_without_pandas(tmp_path):
+    import pandas as pd
+    from src.excel_writer import write_excel_with_formatting
+    from src.preview_store import save_preview_snapshot
+
+    df = pd.DataFrame([
+        {"week_beginning": "2025-12-14", "category": "Admin", "client": "", "hours": 2.0,
+         "opportunity_id": 12345, "comments": "Expenses"},
+        {"week_beginning": "2025-12-14", "category": ">>> WEEK TOTAL", "client": "", "hours": 2.0,
+         "opportunity_id": "", "comments": "Total: 2.0h / 40h = 5%"},
+    ])
+    path = tmp_path / "preview.xlsx"
+    write_excel_with_formatting(df, path)
+    save_preview_snapshot(df, path)
+
+    result = _run(f"""
+        import json, sys
+        from src.preview_store import load_preview_rows
+        rows = load_preview_rows({str(path)!r})
+        print(json.dumps({{"rows": rows, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+    """)
+    assert result["loaded"] == []
+    assert result["rows"][0] == {"week_beginning": "2025-12-14", "category": "Admin", "client": None,
+                                 "hours": 2, "opportunity_id": 12345, "comments": "Expenses"}
+    assert result["rows"][1]["category"] == ">>> WEEK TOTAL"
+
+
+def test_preview_without_ai_never_imports_genai(calendar_export, tmp_path):
+    day = calendar_export.day(calendar_export.monday(1), 0)
+    calendar_export.write([calendar_export.event(f"{day} 09:00", f"{day} 10:00", "ADMIN", "Expenses")])
+
+    result = _run(f"""
+        import json, sys
+        from pathlib import Path
+        from src.excel_preview import generate_final_preview
+        from tests.conftest import CalendarExport
+
+        CalendarExport(Path({str(calendar_export.path)!r})).patch()
+        df = generate_final_preview({str(tmp_path / "preview.xlsx")!r}, fill=True, use_ai=False, workers=1)
+        print(json.dumps({{"rows": len(df), "loaded": [m for m in ("google.genai", "requests") if m in sys.modules]}}))
+    """)
+    assert result["rows"] > 0
+    assert result["loaded"] == []
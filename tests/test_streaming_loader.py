@@ -0,0 +1,100 @@
+"""
+Test the incremental calendar loader.
+"""
+
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src import loader
+
+
+def _event(start: str, category: str = "ADMIN") -> dict:
+    return {"start": start, "end": start, "category": category, "title": "t", "minutes": 60, "all_day": False,
+            "external_domains": "", "location": "", "recipients": 1, "busy_status": 2}
+
+
+def _export(tmp_path, events, name="export.json", compress=False):
+    payload = json.dumps({"exported": "2026-01-01", "count": 12345, "events": events}, indent=1)
+    path = tmp_path / name
+    if compress:
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(payload)
+    else:
+        path.write_text("﻿" + payload, encoding="utf-8")
+    return path
+
+
+def test_stream_matches_json_load_across_chunk_boundaries(tmp_path):
+    events = [_event(f"2026-01-{d:02d} 09:00") for d in range(1, 29)]
+    events[3]["title"] = 'tricky "}] title'
+    path = _export(tmp_path, events)
+
+    for chunk_size in (1, 7, 64, 1 << 16):
+        with loader._open_text(path) as f:
+            stream = loader._JsonStream(f, chunk_size)
+            stream.expect("{")
+            keys = []
+            while stream.peek() != "}":
+                keys.append(stream.value())
+                stream.expect(":")
+                value = list(stream.iter_array()) if keys[-1] == "events" else stream.value()
+                if stream.peek() == ",":
+                    stream.pos += 1
+        assert keys == ["exported", "count", "events"]
+        assert value == events
+
+
+def test_gzip_export_is_read_transparently(tmp_path):
+    events = [_event("2026-01-05 09:00"), _event("2026-01-06 09:00")]
+    loaded = loader.load_calendar(_export(tmp_path, events, "export.json.gz", compress=True))
+    assert [e.to_dict() for e in loaded] == events
+
+
+def test_window_and_exclusions_applied_while_parsing(tmp_path):
+    today = datetime.now()
+    events = [
+        _event((today - timedelta(weeks=10)).strftime("%Y-%m-%d 09:00")),
+        _event((today - timedelta(days=3)).strftime("%Y-%m-%d 09:00")),
+        _event((today - timedelta(days=2)).strftime("%Y-%m-%d 09:00"), category="personal"),
+        _event(today.strftime("%Y-%m-%d 09:00")),
+    ]
+    path = _export(tmp_path, events)
+
+    assert [e.to_dict() for e in loader.load_and_filter(path, weeks_back=2)] == [events[1], events[3]]
+    assert loader.filter_by_weeks(events, 2) == events[1:]
+    assert [e.to_dict() for e in loader.load_and_filter(path, since=today.strftime("%Y-%m-%d"))] == [events[3]]
+
+
+def test_events_are_yielded_lazily(tmp_path):
+    path = _export(tmp_path, [_event("2026-01-05 09:00")] * 3)
+    events = loader.iter_events(path)
+    assert next(events)["start"] == "2026-01-05 09:00"
+    events.close()
+
+
+def test_invalid_export_raises(tmp_path):
+    path = tmp_path / "bad.json"
+    path.write_text("[]", encoding="utf-8")
+    with pytest.raises(ValueError, match="expected '{'"):
+        loader.load_calendar(path)
+
+
+def test_stream_reads_bounded_chunks():
+    class CountingReader(io.StringIO):
+        sizes = []
+
+        def read(self, size=-1):
+            self.sizes.append(size)
+            return super().read(size)
+
+    f = CountingReader(json.dumps({"events": [_event("2026-01-05 09:00")] * 50}))
+    stream = loader._JsonStream(f, 256)
+    stream.expect("{")
+    stream.value()
+    stream.expect(":")
+    assert len(list(stream.iter_array())) == 50
+    assert max(f.sizes) == 256
@@ -0,0 +1,89 @@
+"""
+Test throttling-aware upload scheduling.
+"""
+
+import pytest
+import requests
+
+from src import throttle
+from src.throttle import AdaptiveLimiter, UploadScheduler, parse_retry_after
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_adaptive_limiter_aimd():
+    """Limit halves on throttle and grows by one after a window of successes."""
+    limiter = AdaptiveLimiter(8)
+    limiter.on_throttle()
+    assert limiter.limit == 4
+    limiter.on_throttle()
+    assert limiter.limit == 2
+    for _ in range(2):
+        limiter.on_success()
+    assert limiter.limit == 3
+    assert limiter.stats.min_concurrency == 2
+    assert limiter.stats.max_concurrency == 8
+
+
+def test_execute_honors_retry_after(monkeypatch):
+    slept = []
+    monkeypatch.setattr(throttle.time, "sleep", slept.append)
+    responses = iter([FakeResponse(429, "2"), FakeResponse(500), FakeResponse(201)])
+    scheduler = UploadScheduler(4, base_delay=0.5)
+
+    response = scheduler.execute(lambda: next(responses))
+
+    assert response.status_code == 201
+    assert slept[0] == 2.0
+    assert 0 <= slept[1] <= 1.0
+    stats = scheduler.stats.as_dict()
+    assert (stats["requests"], stats["throttled"], stats["server_errors"], stats["retries"]) == (3, 1, 1, 2)
+    assert scheduler.limiter.limit == 2
+
+
+def test_execute_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(throttle.time, "sleep", lambda _: None)
+    scheduler = UploadScheduler(2, max_retries=2)
+    response = scheduler.execute(lambda: FakeResponse(503))
+    assert response.status_code == 503
+    assert scheduler.stats.requests == 3
+
+
+def test_concurrent_throttles_halve_limit_once():
+    """429s to requests sent before the last decrease do not decrease again."""
+    limiter = AdaptiveLimiter(8)
+    epochs = [limiter.acquire() for _ in range(4)]
+    for epoch in epochs:
+        limiter.release()
+        limiter.on_throttle(epoch=epoch)
+    assert limiter.limit == 4
+
+    limiter.on_throttle(epoch=limiter.acquire())
+    assert limiter.limit == 2
+
+
+def test_non_idempotent_requests_retry_only_unprocessed(monkeypatch):
+    monkeypatch.setattr(throttle.time, "sleep", lambda _: None)
+    scheduler = UploadScheduler(2)
+    responses = iter([FakeResponse(429), FakeResponse(500), FakeResponse(201)])
+    assert scheduler.execute(lambda: next(responses), idempotent=False).status_code == 500
+    assert scheduler.stats.requests == 2
+
+    def read_timeout():
+        raise requests.ReadTimeout("no answer")
+
+    with pytest.raises(requests.ReadTimeout):
+        scheduler.execute(read_timeout, idempotent=False)
+    assert scheduler.stats.requests == 3
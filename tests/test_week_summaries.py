@@ -0,0 +1,110 @@
+"""
+Test the groupby-based week summaries and autofill distribution against
+the previous row-by-row implementations.
+"""
+
+import random
+
+import pandas as pd
+
+from src.aggregator import add_week_summaries
+from src.gap_filler import AUTOFILL_CATEGORIES, calculate_category_distribution, category_distributions, week_contexts
+
+COLUMNS = [
+    "week_beginning", "category", "client", "hours", "opportunity_id",
+    "comments", "external_domains", "needs_review", "is_autofilled", "status",
+]
+
+
+def _reference_summaries(df):
+    rows = []
+    for week in sorted(df["week_beginning"].unique()):
+        week_data = df[df["week_beginning"] == week]
+        for _, row in week_data.iterrows():
+            rows.append(row.to_dict())
+        total_hours = week_data["hours"].sum()
+        rows.append({
+            "week_beginning": week, "category": ">>> WEEK TOTAL", "client": "", "hours": total_hours,
+            "opportunity_id": "", "comments": f"Total: {total_hours}h / 40h = {total_hours/40*100:.0f}%",
+            "external_domains": "", "needs_review": False, "is_autofilled": False, "status": "---",
+        })
+    result = pd.DataFrame(rows)
+    return result[[c for c in COLUMNS if c in result.columns]]
+
+
+def _reference_distribution(df, week):
+    week_data = df[
+        (df["week_beginning"] == week) &
+        (df["category"].isin(AUTOFILL_CATEGORIES)) &
+        (df["is_autofilled"] == False)
+    ]
+    if week_data.empty or week_data["hours"].sum() == 0:
+        return {("Prep - Demo/ Presentation", "", ""): 1.0}
+    total = week_data["hours"].sum()
+    distribution = {}
+    for _, row in week_data.iterrows():
+        key = (row["category"], row.get("client", ""), row.get("opportunity_id", ""))
+        distribution[key] = distribution.get(key, 0) + row["hours"] / total
+    return distribution
+
+
+def _frame(n, seed=7):
+    rng = random.Random(seed)
+    categories = sorted(AUTOFILL_CATEGORIES) + ["Discovery", "POC", "Time Off"]
+    weeks = [f"2025-{month:02d}-{day:02d}" for month, day in ((9, 7), (9, 14), (9, 21), (9, 28), (10, 5))]
+    return pd.DataFrame([
+        {
+            "week_beginning": rng.choice(weeks),
+            "category": rng.choice(categories),
+            "client": rng.choice(["", "Acme", "Globex"]),
+            "hours": rng.choice([0.0, 0.5, 1.0, 1.5, 2.0, 4.0]),
+            "opportunity_id": rng.choice(["", "1001", "1002"]),
+            "comments": f"Meeting {i}",
+            "external_domains": "",
+            "needs_review": rng.random() < 0.3,
+            "is_autofilled": rng.random() < 0.2,
+            "status": "NEW",
+        }
+        for i in range(n)
+    ])
+
+
+def test_week_summaries_match_row_by_row_version():
+    df = _frame(500)
+    result = add_week_summaries(df)
+
+    pd.testing.assert_frame_equal(result, _reference_summaries(df))
+    totals = result[result["category"] == ">>> WEEK TOTAL"]
+    assert totals["week_beginning"].tolist() == sorted(df["week_beginning"].unique())
+    assert result.iloc[-1]["category"] == ">>> WEEK TOTAL"
+
+
+def test_week_summaries_without_optional_columns():
+    df = _frame(40)[["week_beginning", "category", "client", "hours", "comments"]]
+    pd.testing.assert_frame_equal(add_week_summaries(df), _reference_summaries(df))
+
+
+def test_distributions_match_per_week_version():
+    df = _frame(500, seed=3)
+    distributions = category_distributions(df)
+    for week in df["week_beginning"].unique():
+        expected = _reference_distribution(df, week)
+        actual = calculate_category_distribution(df, week)
+        assert list(actual) == list(expected)
+        assert all(abs(actual[key] - expected[key]) < 1e-12 for key in expected)
+        assert distributions.get(week, actual) == actual
+
+
+def test_distribution_defaults_for_weeks_without_hours():
+    df = _frame(5)
+    df["hours"] = 0.0
+    assert calculate_category_distribution(df, df["week_beginning"].iloc[0]) == {("Prep - Demo/ Presentation", "", ""): 1.0}
+    assert category_distributions(df) == {}
+
+
+def test_week_contexts_take_first_three_comments():
+    df = add_week_summaries(_frame(60))
+    contexts = week_contexts(df)
+    for week in df["week_beginning"].unique():
+        week_data = df[(df["week_beginning"] == week) & (df["category"] != ">>> WEEK TOTAL")]
+        assert contexts[week] == "; ".join(week_data["comments"].head(3).tolist())